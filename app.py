@@ -1,18 +1,36 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session, g, flash
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+from flask import Flask, Response, render_template, request, redirect, url_for, jsonify, session, g, flash
+from datetime import datetime, timezone
 import os
+import json
+import logging
 import time # time 모듈 추가
 import hashlib
-import bleach
+import base64
+import click
 
 import config
 import database
 import neis
 import crypto_utils
+import prefetch
+import search
+import post_render
+import user_cache
+import invite_codes
+import passwords
+import assets
+import metrics
+import post_events
+import class_access
+
+log = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config.from_object(config) # config.py에서 설정 로드
+# 요청/SQL/NEIS 계측, /metrics 경로, 구조화 로그 (다른 before_request보다 먼저 등록)
+metrics.init_app(app)
+# g.user는 처음 사용할 때 (캐시된) 사용자 정보를 불러옴
+app.app_ctx_globals_class = user_cache.LazyUserGlobals
 
 # 캐시 디렉토리가 없으면 생성 (PythonAnywhere 같은 WSGI 서버 환경을 위함)
 if not os.path.exists(config.CACHE_DIR):
@@ -21,22 +39,126 @@ if not os.path.exists(config.CACHE_DIR):
 # 데이터베이스 초기화 및 teardown 등록
 database.init_app(app)
 
+# 정적 파일 지문 빌드 및 /assets 경로 등록
+assets.init_app(app)
+
+# 초대 코드 색인을 미리 계산
+invite_codes.registry.load()
+
+@app.cli.command("prefetch")
+@click.option("--days", default=config.PREFETCH_DAYS, help="가져올 주중 일수")
+@click.option("--workers", default=config.PREFETCH_WORKERS, help="동시 NEIS 호출 수")
+@click.option("--force", is_flag=True, help="캐시가 유효해도 모두 새로 가져오기")
+@click.option("--every", type=int, help="이 간격(초)마다 계속 반복 실행 (예약 작업 프로세스 하나에서만)")
+def prefetch_command(days, workers, force, every):
+    """모든 학급 시간표와 앞으로의 급식 중 캐시에 없거나 만료된 것을 NEIS에서 가져와 채웁니다."""
+    if every:
+        prefetch.run_forever(every, days=days, workers=workers, force=force)
+    summary = prefetch.warm_cache(days=days, workers=workers, force=force)
+    click.echo(f"완료: 성공 {summary['ok']}건, 실패 {summary['failed']}건")
+
+@app.cli.command("migrate-cache")
+@click.option("--delete", is_flag=True, help="옮긴 JSON 파일을 삭제")
+def migrate_cache_command(delete):
+    """이전 날짜별 급식 JSON 파일(CACHE_DIR/get_meal_*.json)을 달별 급식 캐시로 옮깁니다."""
+    migrated, skipped = neis.migrate_legacy_cache(delete=delete)
+    click.echo(f"완료: {migrated}건 이전, {skipped}건 건너뜀")
+
+@app.cli.command("build-assets")
+@click.option("--clean", is_flag=True, help="이전 버전의 빌드 파일 삭제")
+def build_assets_command(clean):
+    """static/ 파일에 내용 해시를 붙여 빌드하고 gzip/brotli 압축본을 만듭니다."""
+    manifest = assets.build()
+    click.echo(f"완료: 정적 파일 {len(manifest)}개")
+    if clean:
+        click.echo(f"이전 빌드 파일 {assets.clean()}개 삭제")
+
+@app.cli.command("render-posts")
+@click.option("--all", "rebuild_all", is_flag=True, help="소독 규칙 버전과 관계없이 모든 게시글을 다시 렌더링")
+@click.option("--batch-size", default=500, help="한 번에 갱신할 게시글 수")
+def render_posts_command(rebuild_all, batch_size):
+    """렌더링된 HTML이 없거나 소독 규칙이 바뀐 게시글의 content_html을 채웁니다."""
+    db = database.connect()
+    try:
+        updated = post_render.backfill(db, batch_size=batch_size, rebuild_all=rebuild_all)
+    finally:
+        db.close()
+    click.echo(f"완료: {updated}건 렌더링 (소독 규칙 {post_render.SANITIZER_VERSION})")
+
+@app.cli.command("rotate-invite")
+@click.argument("classes", nargs=-1)
+@click.option("--all", "rotate_all", is_flag=True, help="모든 학급의 코드를 교체")
+@click.option("--lifetime", type=int, default=None, help="새 코드의 유효 시간 (초, 기본값 INVITE_CODE_LIFETIME)")
+def rotate_invite_command(classes, rotate_all, lifetime):
+    """학급(예: 2-5)의 초대 코드를 새 코드로 교체합니다. 다른 워커에는 INVITE_REGISTRY_REFRESH 초 안에 반영됩니다."""
+    targets = class_access.all_classes() if rotate_all else [tuple(c.split("-", 1)) for c in classes]
+    valid = set(class_access.all_classes())
+    for grade, classroom in targets:
+        if (grade, classroom) not in valid:
+            click.echo(f"존재하지 않는 학급입니다: {grade}-{classroom}")
+            continue
+        code = invite_codes.registry.rotate(grade, classroom, lifetime)
+        click.echo(f"{grade}학년 {classroom}반: {code}")
+
+@app.cli.command("reencrypt-student-no")
+@click.option("--batch-size", default=500, help="한 번에 읽고 갱신할 사용자 수")
+def reencrypt_student_no_command(batch_size):
+    """현재 암호화 키(APP_AES_ACTIVE_KID)가 아닌 키로 암호화된 학번을 새 키로 다시 암호화합니다.
+
+    users.id 순서로 batch_size개씩 읽고 갱신하므로 전체 테이블을 메모리에 올리지 않습니다.
+    """
+    keyring = crypto_utils.get_keyring()
+    db = database.connect()
+    rotated = failed = 0
+    last_id = 0
+    try:
+        while True:
+            rows = db.execute(
+                "SELECT id, student_no FROM users WHERE id > ? AND student_no IS NOT NULL ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            stale = [row for row in rows if keyring.needs_rotation(row["student_no"])]
+            updates = []
+            for row in stale:
+                try:
+                    plain = keyring.decrypt(row["student_no"])
+                except Exception as e:
+                    click.echo(f"학번 복호화 실패 (users.id={row['id']}): {e}")
+                    failed += 1
+                    continue
+                updates.append((row["id"], row["student_no"], plain))
+            tokens = keyring.encrypt_many(plain for _, _, plain in updates)
+            # 그 사이 값이 바뀐 행은 덮어쓰지 않음
+            db.executemany(
+                "UPDATE users SET student_no = ? WHERE id = ? AND student_no = ?",
+                [(token, user_id, old) for token, (user_id, old, _) in zip(tokens, updates)]
+            )
+            db.commit()
+            rotated += len(updates)
+    finally:
+        db.close()
+    click.echo(f"완료: {rotated}건 재암호화 (키 {keyring.active_kid}), {failed}건 실패")
+
 @app.before_request
 def load_logged_in_user_and_session():
     # 세션 ID 관리 (로그인 여부와 관계없이)
     if 'session_id' not in session:
         session['session_id'] = os.urandom(24).hex() # 고유한 세션 ID 생성
     g.session_id = session['session_id']
-
-    # 로그인된 사용자 정보 로드
-    user_id = session.get("user")
-    if user_id is None:
-        g.user = None
-    else:
-        db = database.get_db()
-        g.user = db.execute(
-            "SELECT id, userid, password, name, grade, classroom, student_no FROM users WHERE userid = ?", (user_id,)
-        ).fetchone()
+    # 로그인된 사용자 정보(g.user)는 user_cache.LazyUserGlobals가 필요할 때 불러옴
+
+@app.errorhandler(passwords.PasswordBusyError)
+def password_busy(e):
+    """비밀번호 해시 대기열이 가득 차면 기다리게 하지 않고 바로 503으로 응답합니다."""
+    template = "register.html" if request.endpoint == "register" else "login.html"
+    return (
+        render_template(template, error="접속자가 많습니다. 잠시 후 다시 시도해주세요."),
+        503,
+        {"Retry-After": str(e.retry_after)}
+    )
 
 # --- 헬퍼 함수 ---
 def pw_class_count(password):
@@ -48,14 +170,48 @@ def pw_class_count(password):
     if any(not c.isalnum() for c in password): count += 1 # 특수문자
     return count
 
-def generate_invite_code(grade, classroom):
-    """학년, 반, 비밀키를 조합하여 고유한 초대 코드를 생성합니다."""
-    secret = app.config.get("SECRET_KEY", "default-secret")
-    # SECRET_KEY가 None일 경우를 대비하여 기본값 제공
-    if not secret:
-        secret = "default-secret-for-testing"
-    data = f"{secret}-{grade}-{classroom}"
-    return hashlib.sha256(data.encode()).hexdigest()[:6].upper()
+def encode_board_cursor(created_at, post_id):
+    """게시판 keyset 커서(created_at, id)를 URL에 쓸 수 있는 문자열로 만듭니다."""
+    return base64.urlsafe_b64encode(f"{created_at}|{post_id}".encode()).decode().rstrip("=")
+
+def decode_board_cursor(cursor):
+    """커서 문자열을 (created_at, id)로 되돌립니다. 잘못된 커서면 ValueError를 던집니다."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, post_id = raw.rsplit("|", 1)
+        return created_at, int(post_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("잘못된 커서입니다.") from e
+
+def fetch_board_page(grade, classroom, cursor=None, limit=None):
+    """학급 게시판의 한 페이지(최신순)와 다음 페이지 커서를 반환합니다.
+
+    (created_at, id) keyset으로 이어서 읽으므로 게시글 수와 상관없이 페이지 비용이 일정합니다.
+    """
+    limit = limit or config.POSTS_PER_PAGE
+    params = [grade, classroom]
+    keyset = ""
+    if cursor:
+        keyset = "AND (p.created_at, p.id) < (?, ?) "
+        params.extend(decode_board_cursor(cursor))
+    params.append(limit + 1)  # 다음 페이지 존재 여부 확인용으로 하나 더 읽음
+
+    db = database.get_db()
+    rows = db.execute(
+        "SELECT p.id, p.title, p.created_at, u.name as author_name "
+        "FROM posts p JOIN users u ON p.author_id = u.id "
+        "WHERE p.grade = ? AND p.classroom = ? "
+        + keyset +
+        "ORDER BY p.created_at DESC, p.id DESC LIMIT ?",
+        params
+    ).fetchall()
+
+    posts = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = posts[-1]
+        next_cursor = encode_board_cursor(last["created_at"], last["id"])
+    return posts, next_cursor
 
 # --- 라우트 정의 ---
 
@@ -106,11 +262,12 @@ def register():
         try:
             db.execute(
                 "INSERT INTO users (userid, name, password, grade, classroom, student_no, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (userid, name, generate_password_hash(password), grade, classroom, enc_sn, datetime.now().isoformat())
+                (userid, name, passwords.hash_password(password), grade, classroom, enc_sn, datetime.now().isoformat())
             )
             db.commit()
         except database.sqlite3.IntegrityError:
             return render_template("register.html", error="이미 사용 중인 아이디입니다.")
+        user_cache.invalidate(userid)
 
         return redirect(url_for("login"))
 
@@ -125,7 +282,10 @@ def login():
 
         db = database.get_db()
         user = db.execute("SELECT * FROM users WHERE userid = ?", (userid,)).fetchone()
-        if user and check_password_hash(user["password"], password):
+        if user and passwords.verify_password(user["password"], password):
+            # 해시 방식·비용 설정이 바뀌었으면 백그라운드에서 다시 해시
+            if passwords.needs_rehash(user["password"]):
+                passwords.rehash_in_background(userid, user["password"], password)
             # 로그인 성공시 세션에 필요한 정보 저장
             session["user"] = userid
             # 학생번호 복호화
@@ -155,20 +315,16 @@ def main():
     # URL 인자로 특정 학급이 명시된 경우, 권한 검사를 수행
     if grade and classroom:
         try:
-            grade_num, class_num = int(grade), int(classroom)
-            if not (1 <= grade_num <= 3 and 1 <= class_num <= 10):
-                flash("존재하지 않는 학급입니다.")
-                return redirect(url_for("main")) # 인자 없이 메인으로
+            parsed = class_access.parse_class(grade, classroom)
         except ValueError:
             flash("유효하지 않은 학급 정보입니다.")
             return redirect(url_for("main"))
+        if parsed is None:
+            flash("존재하지 않는 학급입니다.")
+            return redirect(url_for("main")) # 인자 없이 메인으로
 
         # 초대 코드 검사
-        unlocked_classes = session.get('unlocked_classes', [])
-        class_identifier = f"{grade}-{classroom}"
-        is_admin = g.user and g.user['userid'] == 'admin'
-
-        if not is_admin and class_identifier not in unlocked_classes:
+        if not class_access.has_access(*parsed):
             return redirect(url_for('unlock_class', grade=grade, classroom=classroom))
         # 권한이 있으면, 해당 학급으로 페이지를 렌더링
 
@@ -188,8 +344,7 @@ def main():
         "main.html",
         grade=grade,
         classroom=classroom,
-        date=date_str,
-        cache_buster=int(time.time()) # cache_buster 추가
+        date=date_str
     )
 
 # 로그아웃 라우트
@@ -200,74 +355,33 @@ def logout():
 
 # 📌 클래스 상세 페이지
 @app.route("/class/<grade>-<classroom>")
+@class_access.require_class()
 def class_detail(grade, classroom):
-    try:
-        grade_num = int(grade)
-        class_num = int(classroom)
-        if not (1 <= grade_num <= 3 and 1 <= class_num <= 10):
-            flash("존재하지 않는 학급입니다.")
-            return redirect(url_for("main"))
-    except ValueError:
-        flash("유효하지 않은 학급 경로입니다.")
-        return redirect(url_for("main"))
-
-    # 초대 코드 검사
-    unlocked_classes = session.get('unlocked_classes', [])
-    class_identifier = f"{grade}-{classroom}"
-
-    # 관리자가 아니고, 아직 잠금 해제되지 않은 클래스인 경우
-    if g.user and g.user['userid'] != 'admin' and class_identifier not in unlocked_classes:
-        return redirect(url_for('unlock_class', grade=grade, classroom=classroom))
-    # 비로그인 사용자는 무조건 잠금 해제 페이지로
-    elif not g.user and class_identifier not in unlocked_classes:
-        return redirect(url_for('unlock_class', grade=grade, classroom=classroom))
-
     # 관리자에게는 현재 클래스의 초대 코드를 항상 보여줌
-    if g.user and g.user['userid'] == 'admin':
-        correct_code = generate_invite_code(grade, classroom)
+    if class_access.is_admin():
+        correct_code = invite_codes.registry.code_for(grade, classroom)
         flash(f'{grade}학년 {classroom}반의 초대 코드는 \'{correct_code}\'입니다. 학생들에게 이 코드를 알려주세요.', 'info')
 
-    db = database.get_db()
-
-    db = database.get_db()
-    posts = db.execute(
-        "SELECT p.id, p.title, p.created_at, u.name as author_name "
-        "FROM posts p JOIN users u ON p.author_id = u.id "
-        "WHERE p.grade = ? AND p.classroom = ? "
-        "ORDER BY p.created_at DESC",
-        (grade, classroom)
-    ).fetchall()
+    cursor = request.args.get("cursor")
+    try:
+        posts, next_cursor = fetch_board_page(grade, classroom, cursor)
+    except ValueError:
+        return redirect(url_for("class_detail", grade=grade, classroom=classroom))
 
     return render_template(
         "class_detail.html",
         grade=grade,
         classroom=classroom,
         posts=posts, # 게시글 목록 전달
-        cache_buster=int(time.time()) # cache_buster 추가
+        cursor=cursor,
+        next_cursor=next_cursor,
+        sse_enabled=config.SSE_ENABLED
     )
 
 # 📌 글쓰기 페이지
 @app.route("/class/<grade>-<classroom>/write", methods=["GET", "POST"])
+@class_access.require_class()
 def write_post(grade, classroom):
-    try:
-        grade_num = int(grade)
-        class_num = int(classroom)
-        if not (1 <= grade_num <= 3 and 1 <= class_num <= 10):
-            flash("존재하지 않는 학급입니다.")
-            return redirect(url_for("main"))
-    except ValueError:
-        flash("유효하지 않은 학급 경로입니다.")
-        return redirect(url_for("main"))
-
-    # 초대 코드 검사 (class_detail과 동일)
-    unlocked_classes = session.get('unlocked_classes', [])
-    class_identifier = f"{grade}-{classroom}"
-    is_admin = g.user and g.user['userid'] == 'admin'
-
-    if not is_admin and class_identifier not in unlocked_classes:
-        # 글쓰기는 로그인 사용자만 가능하므로, 비로그인 경우는 class_detail에서 이미 처리됨
-        return redirect(url_for('unlock_class', grade=grade, classroom=classroom))
-
     if g.user is None: # 로그인하지 않은 사용자는 글쓰기 불가
         return redirect(url_for("login"))
 
@@ -280,86 +394,100 @@ def write_post(grade, classroom):
             return render_template("write.html", grade=grade, classroom=classroom, error="제목과 내용을 모두 입력해주세요.")
 
         db = database.get_db()
-        db.execute(
-            "INSERT INTO posts (grade, classroom, title, content, author_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-            (grade, classroom, title, content, g.user["id"], datetime.now().isoformat())
+        # 소독과 렌더링은 작성 시 한 번만 하고, 조회 시에는 저장된 HTML을 그대로 사용
+        cur = db.execute(
+            "INSERT INTO posts (grade, classroom, title, content, author_id, created_at, content_html, sanitizer_version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (grade, classroom, title, content, g.user["id"], datetime.now().isoformat(),
+             post_render.render_content(content), post_render.SANITIZER_VERSION)
         )
         db.commit()
+        # 커밋된 뒤에 학급 게시판을 보고 있는 클라이언트에게 새 글 요약을 보냄
+        try:
+            post_events.hub.publish_post(post_events.load_post(db, cur.lastrowid))
+        except Exception as e:
+            log.warning("새 글 알림 실패 (post %s): %s", cur.lastrowid, e)
         return redirect(url_for("class_detail", grade=grade, classroom=classroom))
 
     return render_template(
         "write.html",
         grade=grade,
-        classroom=classroom,
-        cache_buster=int(time.time()) # cache_buster 추가
+        classroom=classroom
+    )
+
+# 📌 학급 게시판 새 글 알림 (Server-Sent Events)
+# (EventSource는 리다이렉트를 따라가지 않으므로 잠긴 학급은 403)
+@app.route("/class/<grade>-<classroom>/events")
+@class_access.require_class("stream")
+def class_events(grade, classroom):
+    if not config.SSE_ENABLED:
+        return Response("새 글 알림이 꺼져 있습니다.\n", status=404, mimetype="text/plain")
+    try:
+        subscription = post_events.hub.subscribe((grade, classroom))
+    except post_events.HubFullError:
+        return Response("접속자가 많습니다.\n", status=503, mimetype="text/plain",
+                        headers={"Retry-After": str(config.SSE_RETRY_MS // 1000)})
+
+    # 구독한 뒤에 놓친 글을 읽어야 사이에 쓰인 글을 빠뜨리지 않음 (중복은 클라이언트가 id로 거름)
+    backlog = []
+    # 탭을 다시 열어 새로 연결할 때는 클라이언트가 마지막 id를 쿼리로 보냄
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id", "")
+    if last_event_id.isdigit():
+        try:
+            backlog = post_events.missed_posts(database.get_db(), grade, classroom, int(last_event_id))
+        except Exception:
+            post_events.hub.unsubscribe(subscription)
+            raise
+
+    return Response(
+        post_events.stream(subscription, backlog),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 # 📌 게시물 상세 페이지
 @app.route("/class/<grade>-<classroom>/post/<int:post_id>")
+@class_access.require_class()
 def post_detail(grade, classroom, post_id):
-    try:
-        grade_num = int(grade)
-        class_num = int(classroom)
-        if not (1 <= grade_num <= 3 and 1 <= class_num <= 10):
-            flash("존재하지 않는 학급입니다.")
-            return redirect(url_for("main"))
-    except ValueError:
-        flash("유효하지 않은 학급 경로입니다.")
-        return redirect(url_for("main"))
-
-    # 초대 코드 검사 (class_detail과 동일)
-    unlocked_classes = session.get('unlocked_classes', [])
-    class_identifier = f"{grade}-{classroom}"
-    is_admin = g.user and g.user['userid'] == 'admin'
-
-    if not is_admin and class_identifier not in unlocked_classes:
-        return redirect(url_for('unlock_class', grade=grade, classroom=classroom))
-
     db = database.get_db()
     post = db.execute(
-        "SELECT p.id, p.title, p.content, p.created_at, u.name as author_name "
+        "SELECT p.id, p.title, p.content, p.content_html, p.sanitizer_version, p.created_at, u.name as author_name "
         "FROM posts p JOIN users u ON p.author_id = u.id "
-        "WHERE p.id = ?",
-        (post_id,)
+        "WHERE p.id = ? AND p.grade = ? AND p.classroom = ?",  # 다른 학급의 글은 열 수 없음
+        (post_id, grade, classroom)
     ).fetchone()
 
     if post is None:
         return "게시물을 찾을 수 없습니다.", 404
 
-    # XSS 방지를 위해 bleach로 content를 소독하고, 줄바꿈을 <br>로 변환
-    sanitized_content = bleach.clean(post['content'])
-    formatted_content = sanitized_content.replace('\n', '<br>')
+    # 작성 시 소독해 둔 HTML 사용 (없거나 소독 규칙이 바뀌었으면 다시 만들어 저장)
+    formatted_content = post_render.post_html(db, post)
 
     return render_template(
         "post_detail.html",
         grade=grade,
         classroom=classroom,
         post=post,
-        formatted_content=formatted_content, # 소독된 내용을 전달
-        cache_buster=int(time.time())
+        formatted_content=formatted_content # 소독된 내용을 전달
     )
 
 # 📌 초대 코드로 클래스 잠금 해제
 @app.route("/class/unlock", methods=["GET", "POST"])
 def unlock_class():
-    grade = request.args.get("grade")
-    classroom = request.args.get("classroom")
-
-    if not grade or not classroom:
+    try:
+        parsed = class_access.parse_class(request.args.get("grade"), request.args.get("classroom"))
+    except (TypeError, ValueError):
+        parsed = None
+    if parsed is None:
         flash("잘못된 접근입니다.")
         return redirect(url_for("main"))
+    grade, classroom = parsed
 
     if request.method == "POST":
-        submitted_code = request.form.get("invite_code", "").upper()
-        correct_code = generate_invite_code(grade, classroom)
-
-        if submitted_code == correct_code:
-            unlocked_classes = session.get('unlocked_classes', [])
-            class_identifier = f"{grade}-{classroom}"
-            if class_identifier not in unlocked_classes:
-                unlocked_classes.append(class_identifier)
-                session['unlocked_classes'] = unlocked_classes
+        submitted_code = request.form.get("invite_code", "").strip().upper()
 
+        if invite_codes.registry.lookup(submitted_code) == (str(grade), str(classroom)):
+            class_access.unlock(grade, classroom)
             return redirect(url_for("class_detail", grade=grade, classroom=classroom))
         else:
             flash("초대 코드가 올바르지 않습니다.")
@@ -367,54 +495,192 @@ def unlock_class():
     # GET 요청이거나 POST에서 코드가 틀렸을 경우
     return render_template("unlock_class.html", grade=grade, classroom=classroom)
 
-# 📌 API 데이터 요청
-@app.route("/api/data", methods=["GET"])
-def api_data(): 
-    date_str = request.args.get("date", datetime.now().strftime("%Y%m%d"))
-    grade = request.args.get("grade", "1")
-    classroom = request.args.get("classroom", "1")
-    
-    response_data = {}
+# --- /api/data 섹션 빌더 ---
+# 각 섹션은 독립적으로 계산되며, 섹션마다 캐시된 NEIS 데이터의 남은 유효 시간을 가집니다.
+API_SECTIONS = ("meal", "timetable")
 
-    # 급식 데이터
-    meal_data = neis.get_meal(date_str)
-    response_data["meal"] = meal_data
+def _meal_section(date_str, grade, classroom):
+    """급식 섹션 데이터를 반환합니다."""
+    return neis.get_meal(date_str)
 
-    # 시간표 데이터
-    try:
-        base_date = datetime.strptime(date_str, "%Y%m%d")
+def _meal_week_section(date_str, grade, classroom):
+    """요청 날짜가 속한 주(월~일)의 날짜별 급식을 반환합니다."""
+    return neis.get_meal_range(*neis.meal_window(date_str, "week"))
 
-        # NEIS API가 주의 시작일(월요일 등)부터 조회하면 데이터를 못가져오는 경우가 있어, 
-        # 요청 날짜로부터 4일 이전부터 조회하여 API 제약을 우회합니다.
-        start_date_for_api = (base_date - timedelta(days=4)).strftime("%Y%m%d")
-        end_date_for_api = (base_date + timedelta(days=13)).strftime("%Y%m%d")
+def _meal_month_section(date_str, grade, classroom):
+    """요청 날짜가 속한 달의 날짜별 급식을 반환합니다."""
+    return neis.get_meal_range(*neis.meal_window(date_str, "month"))
 
+def _timetable_section(date_str, grade, classroom):
+    """요청 날짜부터 주중 최대 10일치의 시간표 섹션 데이터를 반환합니다."""
+    try:
+        start_date_for_api, end_date_for_api = neis.timetable_window(date_str)
         all_timetable_data = neis.get_timetable_range(grade, classroom, start_date_for_api, end_date_for_api)
-        
-        # API로부터 받은 데이터에서, 사용자가 실제로 요청한 날짜부터 10일치(주중)만 필터링합니다.
-        filtered_timetable = []
-        fetched_count = 0
-        for item in all_timetable_data:
-            current_item_date = datetime.strptime(item['date'], "%Y%m%d")
-            # 요청된 날짜(base_date) 이후이고, 주중(weekday < 5)인 경우에만 추가
-            if current_item_date >= base_date and current_item_date.weekday() < 5:
-                filtered_timetable.append(item)
-                fetched_count += 1
-            
-            if fetched_count >= 10: # 최대 10일치만 가져옴
-                break
-
-        response_data["timetable"] = filtered_timetable
+        return upcoming_timetable(date_str, all_timetable_data)
 
     except Exception as e:
-        print(f"시간표 데이터 처리 중 오류 발생 ({date_str}): {e}")
-        response_data["timetable"] = []
+        log.warning("시간표 데이터 처리 중 오류 발생 (%s): %s", date_str, e)
+        return []
+
+def upcoming_timetable(date_str, all_timetable_data):
+    """API로부터 받은 데이터에서, 사용자가 실제로 요청한 날짜부터 10일치(주중)만 필터링합니다."""
+    base_date = datetime.strptime(date_str, "%Y%m%d")
+    filtered_timetable = []
+    for item in all_timetable_data:
+        current_item_date = datetime.strptime(item['date'], "%Y%m%d")
+        # 요청된 날짜(base_date) 이후이고, 주중(weekday < 5)인 경우에만 추가
+        if current_item_date >= base_date and current_item_date.weekday() < 5:
+            filtered_timetable.append(item)
+
+        if len(filtered_timetable) >= 10: # 최대 10일치만 가져옴
+            break
+
+    return filtered_timetable
+
+# 기본(data_type 생략/all) 응답에는 API_SECTIONS만 포함되고, 주간/월간 급식은 요청할 때만 계산됩니다.
+SECTION_BUILDERS = {
+    "meal": _meal_section,
+    "timetable": _timetable_section,
+    "meal_week": _meal_week_section,
+    "meal_month": _meal_month_section,
+}
+
+def _timetable_version(date_str, grade, classroom):
+    return neis.timetable_version(grade, classroom, *neis.timetable_window(date_str))
+
+# 섹션별 캐시된 NEIS 데이터 버전 조회 함수 (ETag/Last-Modified 계산용)
+SECTION_VERSIONS = {
+    "meal": lambda date_str, grade, classroom: neis.meal_version(date_str),
+    "timetable": _timetable_version,
+    "meal_week": lambda date_str, grade, classroom: neis.meal_range_version(*neis.meal_window(date_str, "week")),
+    "meal_month": lambda date_str, grade, classroom: neis.meal_range_version(*neis.meal_window(date_str, "month")),
+}
+
+# 응답 형식이 바뀌면 올려서 이전 ETag를 무효화
+API_DATA_FORMAT = 1
+
+def sections_validator(sections, date_str, grade, classroom):
+    """캐시된 NEIS 데이터 버전으로 (ETag, Last-Modified, 섹션별 남은 유효 시간)을 계산합니다.
+
+    섹션 중 하나라도 캐시에 없거나 만료되었으면 None을 반환합니다.
+    """
+    versions = {}
+    for name in sections:
+        try:
+            version = SECTION_VERSIONS[name](date_str, grade, classroom)
+        except ValueError:  # 잘못된 날짜 형식
+            version = None
+        if version is None:
+            return None
+        versions[name] = version
+
+    now = time.time()
+    payload = json.dumps([API_DATA_FORMAT, date_str, grade, classroom, sorted(versions.items())])
+    etag = hashlib.sha256(payload.encode()).hexdigest()[:32]
+    last_modified = datetime.fromtimestamp(max(stored_at for stored_at, _ in versions.values()), timezone.utc)
+    max_ages = {name: max(0, int(expires_at - now)) for name, (_, expires_at) in versions.items()}
+    return etag, last_modified, max_ages
+
+def _not_modified(etag, last_modified):
+    """조건부 요청(If-None-Match / If-Modified-Since)이 현재 버전과 일치하는지 확인합니다."""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since:
+        return request.if_modified_since >= last_modified.replace(microsecond=0)
+    return False
+
+def _set_cache_headers(response, validator):
+    """ETag, Last-Modified와 남은 유효 시간에 맞춘 Cache-Control을 설정합니다."""
+    response.cache_control.public = True
+    if validator is None:
+        # 캐시에 남지 않은 응답(예: NEIS 오류)은 다음 요청 때 다시 확인
+        response.cache_control.max_age = 0
+        return response
+    etag, last_modified, max_ages = validator
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # 여러 섹션을 묶은 응답은 가장 짧은 섹션의 유효 시간을 따름
+    response.cache_control.max_age = min(max_ages.values())
+    return response
+
+def parse_sections(raw):
+    """data_type 인자("meal", "timetable", "meal,timetable", "all")를 섹션 튜플로 변환합니다."""
+    if not raw or raw == "all":
+        return API_SECTIONS
+    requested = [part.strip() for part in raw.split(",") if part.strip()]
+    if not requested or any(part not in SECTION_BUILDERS for part in requested):
+        return None
+    # 중복 제거 및 순서 고정
+    return tuple(name for name in SECTION_BUILDERS if name in requested)
+
+def parse_class_args(grade, classroom):
+    """grade/classroom 인자를 정규화된 문자열 ("01" -> "1")로 바꿉니다. 숫자가 아니거나 없는 학급이면 None."""
+    try:
+        parsed = class_access.parse_class(grade, classroom)
+    except ValueError:
+        return None
+    return None if parsed is None else (str(parsed[0]), str(parsed[1]))
+
+def _sections_response(sections):
+    """요청된 섹션만 계산하여 JSON 응답을 만듭니다. 섹션별 캐시 정보를 함께 반환합니다.
+
+    캐시된 데이터 버전이 조건부 요청과 일치하면 섹션을 계산하지 않고 바로 304를 반환합니다.
+    """
+    date_str = request.args.get("date", datetime.now().strftime("%Y%m%d"))
+    try:
+        datetime.strptime(date_str, "%Y%m%d")
+    except ValueError:
+        return jsonify({"success": False, "message": "date는 YYYYMMDD 형식이어야 합니다."}), 400
+    # 같은 학급이 "01"과 "1"처럼 다른 시간표 저장소 키나 ETag를 갖지 않도록 정규화
+    parsed_class = parse_class_args(request.args.get("grade", "1"), request.args.get("classroom", "1"))
+    if parsed_class is None:
+        return jsonify({"success": False, "message": "존재하지 않는 학급입니다."}), 400
+    grade, classroom = parsed_class
+
+    validator = sections_validator(sections, date_str, grade, classroom)
+    if validator is not None and _not_modified(validator[0], validator[1]):
+        return _set_cache_headers(app.response_class(status=304), validator)
+
+    response_data = {}
+    for name in sections:
+        response_data[name] = SECTION_BUILDERS[name](date_str, grade, classroom)
+
+    # 방금 NEIS에서 가져와 저장했을 수 있으므로 버전을 다시 계산
+    validator = sections_validator(sections, date_str, grade, classroom)
+    max_ages = validator[2] if validator is not None else {}
 
     response_data["grade"] = grade
     response_data["classroom"] = classroom
     response_data["date"] = date_str
+    response_data["cache"] = {name: {"max_age": max_ages.get(name, 0)} for name in sections}
+
+    return _set_cache_headers(jsonify(response_data), validator)
+
+# 📌 API 데이터 요청 (data_type으로 섹션 선택, 생략 시 전체 섹션을 한 번에 반환)
+@app.route("/api/data", methods=["GET"])
+def api_data(): 
+    sections = parse_sections(request.args.get("data_type"))
+    if sections is None:
+        return jsonify({"success": False, "message": "알 수 없는 data_type 입니다."}), 400
+    return _sections_response(sections)
 
-    return jsonify(response_data)
+# 📌 급식 전용 API
+@app.route("/api/meal", methods=["GET"])
+def api_meal():
+    return _sections_response(("meal",))
+
+# 📌 주간/월간 급식 API (range=week|month, 달마다 NEIS 한 번 조회)
+@app.route("/api/meals", methods=["GET"])
+def api_meals():
+    span = request.args.get("range", "week")
+    if span not in ("week", "month"):
+        return jsonify({"success": False, "message": "range는 week 또는 month여야 합니다."}), 400
+    return _sections_response((f"meal_{span}",))
+
+# 📌 시간표 전용 API
+@app.route("/api/timetable", methods=["GET"])
+def api_timetable():
+    return _sections_response(("timetable",))
 
 
 
@@ -428,22 +694,9 @@ def add_class_by_code():
     if not submitted_code or len(submitted_code) != 6:
         return jsonify({"success": False, "message": "초대 코드는 6자리여야 합니다."}), 400
 
-    # 모든 유효한 학급에 대해 코드를 생성하여 일치하는 것을 찾음
-    found_class = None
-    for grade_num in range(1, 4):
-        for class_num in range(1, 11):
-            # 유효성 검사 (1-3학년, 1-10반)
-            if not (1 <= grade_num <= 3 and 1 <= class_num <= 10):
-                 continue
-
-            grade_str = str(grade_num)
-            class_str = str(class_num)
-            correct_code = generate_invite_code(grade_str, class_str)
-            if correct_code == submitted_code:
-                found_class = {"grade": grade_str, "classroom": class_str}
-                break
-        if found_class:
-            break
+    # 미리 계산된 초대 코드 색인에서 학급을 찾음
+    found = invite_codes.registry.lookup(submitted_code)
+    found_class = {"grade": found[0], "classroom": found[1]} if found else None
 
     if not found_class:
         return jsonify({"success": False, "message": "초대 코드가 올바르지 않습니다."}), 404
@@ -459,24 +712,16 @@ def add_class_by_code():
         db.commit()
 
         # 2. 세션에 "잠금 해제" 상태 추가
-        unlocked_classes = session.get('unlocked_classes', [])
-        class_identifier = f"{found_class['grade']}-{found_class['classroom']}"
-        if class_identifier not in unlocked_classes:
-            unlocked_classes.append(class_identifier)
-            session['unlocked_classes'] = unlocked_classes
+        class_access.unlock(int(found_class["grade"]), int(found_class["classroom"]))
 
         return jsonify({"success": True, "message": "클래스가 성공적으로 추가되었습니다."})
 
     except database.sqlite3.IntegrityError:
         # 이미 "내 클래스"에 있는 경우, 잠금 해제만 처리
-        unlocked_classes = session.get('unlocked_classes', [])
-        class_identifier = f"{found_class['grade']}-{found_class['classroom']}"
-        if class_identifier not in unlocked_classes:
-            unlocked_classes.append(class_identifier)
-            session['unlocked_classes'] = unlocked_classes
+        class_access.unlock(int(found_class["grade"]), int(found_class["classroom"]))
         return jsonify({"success": True, "message": "이미 추가된 클래스입니다."})
     except Exception as e:
-        print(f"클래스 추가 중 오류 발생: {e}")
+        log.exception("클래스 추가 중 오류 발생: %s", e)
         return jsonify({"success": False, "message": "클래스 추가 중 오류가 발생했습니다."}), 500
 
 # 📌 내 클래스 목록 조회 API
@@ -487,10 +732,7 @@ def get_my_classes():
 
     # 관리자에게는 모든 클래스 목록을 반환
     if g.user['userid'] == 'admin':
-        all_classes = []
-        for grade_num in range(1, 4):
-            for class_num in range(1, 11):
-                all_classes.append({"grade": str(grade_num), "classroom": str(class_num)})
+        all_classes = [{"grade": grade, "classroom": classroom} for grade, classroom in class_access.all_classes()]
         return jsonify({"success": True, "classes": all_classes})
 
     # 일반 사용자는 DB에서 조회
@@ -505,5 +747,53 @@ def get_my_classes():
 
     return jsonify({"success": True, "classes": my_classes})
 
+# 📌 학급 게시판 목록 API (keyset 페이지네이션)
+@app.route("/api/class/<grade>-<classroom>/posts", methods=["GET"])
+@class_access.require_class("api")
+def api_class_posts(grade, classroom):
+    limit = request.args.get("limit", config.POSTS_PER_PAGE, type=int)
+    limit = max(1, min(limit, config.POSTS_PER_PAGE_MAX))
+    try:
+        posts, next_cursor = fetch_board_page(grade, classroom, request.args.get("cursor"), limit)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify({
+        "success": True,
+        "posts": [dict(post) for post in posts],
+        "next_cursor": next_cursor,
+    })
+
+def _search_response(grade=None, classroom=None):
+    """q, page 인자로 게시글을 검색하여 JSON 응답을 만듭니다."""
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"success": False, "message": "검색어를 입력하세요."}), 400
+    page = request.args.get("page", 1, type=int)
+    page = max(1, min(page, config.SEARCH_MAX_PAGE))
+
+    results, has_more = search.search_posts(database.get_db(), query, grade, classroom, page)
+    return jsonify({"success": True, "results": results, "page": page, "has_more": has_more})
+
+# 📌 학급 게시글 검색 API
+@app.route("/api/class/<grade>-<classroom>/search", methods=["GET"])
+@class_access.require_class("api")
+def api_class_search(grade, classroom):
+    return _search_response(grade, classroom)
+
+# 📌 전체 학급 게시글 검색 API (관리자 전용)
+@app.route("/api/admin/search", methods=["GET"])
+def admin_search():
+    if g.user is None or g.user['userid'] != 'admin':
+        return jsonify({"success": False, "message": "관리자만 접근할 수 있습니다."}), 403
+    return _search_response()
+
+# 📌 NEIS 캐시 통계 조회 API (관리자 전용)
+@app.route("/api/admin/cache_stats", methods=["GET"])
+def admin_cache_stats():
+    if g.user is None or g.user['userid'] != 'admin':
+        return jsonify({"success": False, "message": "관리자만 접근할 수 있습니다."}), 403
+    return jsonify({"success": True, "stats": neis.cache_stats()})
+
 if __name__ == "__main__":
     app.run(debug=config.DEBUG)
\ No newline at end of file
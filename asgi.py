@@ -0,0 +1,195 @@
+"""NEIS 기반 API의 ASGI 진입점.
+
+/api/data, /api/meal, /api/meals, /api/timetable을 asyncio로 처리합니다. 급식과 시간표는
+동시에 조회하고, NEIS 응답을 기다리는 동안 워커를 잡지 않으므로 한 프로세스가 많은 요청을
+동시에 기다릴 수 있습니다. 캐시와 응답 형식(ETag/Last-Modified/Cache-Control, 304)은 Flask 경로와 같습니다.
+
+그 밖의 경로는 asgiref의 WsgiToAsgi로 Flask 앱에 넘깁니다.
+    uvicorn asgi:application --workers 2
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as flask_app
+import metrics
+import neis
+import neis_async
+
+log = logging.getLogger(__name__)
+
+_fallback = WsgiToAsgi(flask_app.app)
+
+
+# --- 섹션 빌더 (app.SECTION_BUILDERS의 비동기 버전) ---
+
+async def _meal_section(date_str, grade, classroom):
+    return await neis_async.get_meal(date_str)
+
+async def _meal_week_section(date_str, grade, classroom):
+    return await neis_async.get_meal_range(*neis.meal_window(date_str, "week"))
+
+async def _meal_month_section(date_str, grade, classroom):
+    return await neis_async.get_meal_range(*neis.meal_window(date_str, "month"))
+
+async def _timetable_section(date_str, grade, classroom):
+    try:
+        all_timetable_data = await neis_async.get_timetable_range(grade, classroom, *neis.timetable_window(date_str))
+        return flask_app.upcoming_timetable(date_str, all_timetable_data)
+    except Exception as e:
+        log.warning("시간표 데이터 처리 중 오류 발생 (%s): %s", date_str, e)
+        return []
+
+SECTION_BUILDERS = {
+    "meal": _meal_section,
+    "timetable": _timetable_section,
+    "meal_week": _meal_week_section,
+    "meal_month": _meal_month_section,
+}
+
+
+# --- 응답 ---
+
+def _json(status, body, headers=()):
+    return status, json.dumps(body, ensure_ascii=False).encode("utf-8"), list(headers)
+
+def _cache_headers(validator):
+    """app._set_cache_headers와 같은 캐시 헤더 목록을 만듭니다."""
+    if validator is None:
+        return [("Cache-Control", "public, max-age=0")]
+    etag, last_modified, max_ages = validator
+    return [
+        ("Cache-Control", f"public, max-age={min(max_ages.values())}"),
+        ("ETag", f'"{etag}"'),
+        ("Last-Modified", format_datetime(last_modified, usegmt=True)),
+    ]
+
+def _not_modified(headers, etag, last_modified):
+    """조건부 요청(If-None-Match / If-Modified-Since)이 현재 버전과 일치하는지 확인합니다."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= last_modified.replace(microsecond=0)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def _sections_response(sections, query, headers):
+    """app._sections_response의 비동기 버전. 요청된 섹션들을 동시에 계산합니다."""
+    date_str = query.get("date", datetime.now().strftime("%Y%m%d"))
+    try:
+        datetime.strptime(date_str, "%Y%m%d")
+    except ValueError:
+        return _json(400, {"success": False, "message": "date는 YYYYMMDD 형식이어야 합니다."})
+    parsed_class = flask_app.parse_class_args(query.get("grade", "1"), query.get("classroom", "1"))
+    if parsed_class is None:
+        return _json(400, {"success": False, "message": "존재하지 않는 학급입니다."})
+    grade, classroom = parsed_class
+
+    # 버전 확인은 저장소(SQLite)를 읽으므로 스레드에서 실행
+    validator = await asyncio.to_thread(flask_app.sections_validator, sections, date_str, grade, classroom)
+    if validator is not None and _not_modified(headers, validator[0], validator[1]):
+        return 304, b"", _cache_headers(validator)
+
+    results = await asyncio.gather(*(SECTION_BUILDERS[name](date_str, grade, classroom) for name in sections))
+    response_data = dict(zip(sections, results))
+
+    validator = await asyncio.to_thread(flask_app.sections_validator, sections, date_str, grade, classroom)
+    max_ages = validator[2] if validator is not None else {}
+
+    response_data["grade"] = grade
+    response_data["classroom"] = classroom
+    response_data["date"] = date_str
+    response_data["cache"] = {name: {"max_age": max_ages.get(name, 0)} for name in sections}
+    return _json(200, response_data, _cache_headers(validator))
+
+
+# --- 경로 ---
+
+async def api_data(query, headers):
+    sections = flask_app.parse_sections(query.get("data_type"))
+    if sections is None:
+        return _json(400, {"success": False, "message": "알 수 없는 data_type 입니다."})
+    return await _sections_response(sections, query, headers)
+
+async def api_meal(query, headers):
+    return await _sections_response(("meal",), query, headers)
+
+async def api_meals(query, headers):
+    span = query.get("range", "week")
+    if span not in ("week", "month"):
+        return _json(400, {"success": False, "message": "range는 week 또는 month여야 합니다."})
+    return await _sections_response((f"meal_{span}",), query, headers)
+
+async def api_timetable(query, headers):
+    return await _sections_response(("timetable",), query, headers)
+
+ROUTES = {
+    "/api/data": api_data,
+    "/api/meal": api_meal,
+    "/api/meals": api_meals,
+    "/api/timetable": api_timetable,
+}
+
+
+async def _send(send, status, body, headers, include_body=True):
+    raw_headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+    if status != 304:
+        raw_headers.append((b"content-type", b"application/json; charset=utf-8"))
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body if include_body else b""})
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await neis_async.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def application(scope, receive, send):
+    """ASGI 애플리케이션. NEIS 기반 GET 경로는 직접 처리하고 나머지는 Flask 앱으로 넘깁니다."""
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+    handler = ROUTES.get(scope.get("path"))
+    if handler is None or scope["method"] not in ("GET", "HEAD"):
+        return await _fallback(scope, receive, send)
+
+    started = time.perf_counter()
+    query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+    try:
+        status, body, response_headers = await handler(query, headers)
+    except Exception:
+        log.exception("ASGI 요청 처리 오류 (%s)", scope["path"])
+        status, body, response_headers = _json(500, {"success": False, "message": "서버 오류"})
+    await _send(send, status, body, response_headers, include_body=scope["method"] != "HEAD")
+
+    elapsed = time.perf_counter() - started
+    endpoint = f"asgi.{handler.__name__}"
+    metrics.REQUEST_DURATION.observe(elapsed, endpoint=endpoint, method=scope["method"], status=status)
+    log.info(
+        "%s %s %s %.1fms", scope["method"], scope["path"], status, elapsed * 1000,
+        extra={"fields": {
+            "method": scope["method"],
+            "path": scope["path"],
+            "endpoint": endpoint,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 2),
+        }}
+    )
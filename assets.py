@@ -0,0 +1,119 @@
+"""정적 파일 지문(content hash) 빌드와 제공.
+
+static/ 아래 파일마다 내용 해시를 붙인 사본(js/main.<hash>.js)과 gzip/brotli 압축본을
+ASSET_BUILD_DIR에 만들고, /assets/<파일>로 오래 캐시할 수 있게(immutable) 제공합니다.
+템플릿에서는 asset_url('js/main.js')로 주소를 만듭니다.
+    flask --app app build-assets
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import request, send_from_directory, url_for
+
+import config
+
+try:  # brotli는 선택 사항 (없으면 gzip만 만듦)
+    import brotli
+except ImportError:
+    brotli = None
+
+# 미리 압축할 형식 (이미지 등은 이미 압축되어 있음)
+_COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map"}
+
+# {원래 경로: 해시가 붙은 경로}
+_manifest = {}
+
+
+def _hashed_name(rel_path, digest):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:12]}{ext}"
+
+
+def _write_atomic(path, data):
+    """다른 워커가 동시에 빌드해도 반쯤 쓰인 파일을 제공하지 않도록 임시 파일 후 교체합니다."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build(static_dir=None, build_dir=None):
+    """static_dir의 모든 파일에 해시를 붙여 build_dir에 복사하고 압축본을 만든 뒤 목록을 반환합니다.
+
+    이미 같은 해시의 파일이 있으면 다시 쓰지 않으므로 시작할 때마다 실행해도 됩니다.
+    """
+    static_dir = static_dir or config.STATIC_DIR
+    build_dir = build_dir or config.ASSET_BUILD_DIR
+    manifest = {}
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            source = os.path.join(root, name)
+            rel_path = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                data = f.read()
+            hashed = _hashed_name(rel_path, hashlib.sha256(data).hexdigest())
+            manifest[rel_path] = hashed
+
+            target = os.path.join(build_dir, hashed)
+            if os.path.exists(target):
+                continue
+            if os.path.splitext(name)[1] in _COMPRESSIBLE and len(data) >= config.ASSET_COMPRESS_MIN_BYTES:
+                _write_atomic(target + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    _write_atomic(target + ".br", brotli.compress(data, quality=11))
+            _write_atomic(target, data)  # 원본을 마지막에 써서, 원본이 있으면 압축본도 있음을 보장
+    _manifest.clear()
+    _manifest.update(manifest)
+    return manifest
+
+
+def clean(build_dir=None):
+    """현재 목록에 없는 (이전 버전의) 빌드 파일을 지우고 지운 수를 반환합니다."""
+    build_dir = build_dir or config.ASSET_BUILD_DIR
+    current = set(_manifest.values())
+    removed = 0
+    for root, _, files in os.walk(build_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, build_dir).replace(os.sep, "/")
+            for suffix in (".gz", ".br"):
+                if rel_path.endswith(suffix):
+                    rel_path = rel_path[:-len(suffix)]
+            if rel_path not in current:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def asset_url(filename):
+    """정적 파일의 해시가 붙은 주소를 반환합니다. 빌드 목록에 없으면 일반 static 주소를 씁니다."""
+    hashed = _manifest.get(filename)
+    if hashed is None:
+        return url_for("static", filename=filename)
+    return url_for("asset", filename=hashed)
+
+
+def serve(filename):
+    """빌드된 파일을 immutable 캐시 헤더와 함께 보냅니다. 클라이언트가 받으면 br/gzip 압축본을 보냅니다."""
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    encoding = None
+    for name, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if request.accept_encodings[name] > 0 and os.path.isfile(os.path.join(config.ASSET_BUILD_DIR, filename + suffix)):
+            encoding, filename = name, filename + suffix
+            break
+    response = send_from_directory(config.ASSET_BUILD_DIR, filename, mimetype=mimetype, max_age=config.ASSET_MAX_AGE)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Cache-Control"] = f"public, max-age={config.ASSET_MAX_AGE}, immutable"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_app(app):
+    """시작할 때 정적 파일을 빌드하고 /assets 경로와 템플릿 함수 asset_url을 등록합니다."""
+    build()
+    app.add_url_rule("/assets/<path:filename>", "asset", serve)
+    app.jinja_env.globals["asset_url"] = asset_url
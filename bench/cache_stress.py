@@ -0,0 +1,118 @@
+"""여러 프로세스에서 동시에 캐시 저장소를 두드려 원자성과 lease 동작을 확인합니다.
+
+각 워커 프로세스는 임의의 키를 읽고, 만료되었으면 neis.file_cache와 같은 순서
+(lease 획득 -> 저장소 재확인 -> 가져오기 -> 저장 -> lease 해제)로 갱신합니다.
+다음을 검사하며, 하나라도 어긋나면 0이 아닌 값으로 종료합니다.
+  - 읽기 중 잘리거나 깨진 항목을 보지 않을 것
+  - 키마다 유효 시간 한 주기에 한 프로세스만 갱신할 것
+
+    python bench/cache_stress.py --backend sqlite --procs 8 --seconds 5
+    python bench/cache_stress.py --backend files
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache  # noqa: E402
+
+TTL = 0.5
+LEASE_TIMEOUT = 5
+PAYLOAD_ITEMS = 200  # 항목을 충분히 크게 만들어 쓰기 도중 읽기가 일어나도록 함
+
+
+def _make_backend(kind, path):
+    if kind == "sqlite":
+        return cache.SQLiteBackend(os.path.join(path, "stress.db"), max_entries=100000)
+    return cache.JsonDirBackend(path)
+
+
+def _payload(key, generation):
+    return [{"key": key, "generation": generation, "i": i, "menu": "잡곡밥\n미역국\n" * 3} for i in range(PAYLOAD_ITEMS)]
+
+
+def _valid(entry, key):
+    data = entry.get("data") if isinstance(entry, dict) else None
+    return (
+        isinstance(data, list) and len(data) == PAYLOAD_ITEMS
+        and all(item["key"] == key and item["generation"] == data[0]["generation"] for item in data)
+    )
+
+
+def _worker(args):
+    kind, path, keys, seconds, seed = args
+    random.seed(seed)
+    backend = _make_backend(kind, path)
+    reads = corrupt = refreshes = 0
+    generations = []
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        key = random.choice(keys)
+        entry = backend.get(key)
+        reads += 1
+        if entry is not None and not _valid(entry, key):
+            corrupt += 1
+        if entry is not None and time.time() - entry["timestamp"] < entry["ttl"]:
+            continue
+
+        owner = uuid.uuid4().hex
+        if not backend.acquire_lease(key, owner, LEASE_TIMEOUT):
+            continue
+        try:
+            stored = backend.get(key)
+            if stored is not None and time.time() - stored["timestamp"] < stored["ttl"]:
+                continue
+            now = time.time()
+            # 유효 시간 주기 번호: 같은 주기에 두 번 갱신되면 lease가 실패한 것
+            generation = int(now // TTL)
+            time.sleep(0.01)  # NEIS 호출 대신
+            backend.set(key, {"timestamp": now, "ttl": TTL, "data": _payload(key, generation)})
+            generations.append((key, generation))
+            refreshes += 1
+        finally:
+            backend.release_lease(key, owner)
+    return reads, corrupt, refreshes, generations
+
+
+def run(kind, procs=8, seconds=5, keys=20):
+    """procs개 프로세스로 seconds초 동안 검사하고 읽기/갱신/깨진 읽기/중복 갱신 횟수를 반환합니다."""
+    path = tempfile.mkdtemp(prefix="cache-stress-")
+    key_names = [f"get_meal|2026{1000 + i}" for i in range(keys)]
+    jobs = [(kind, path, key_names, seconds, seed) for seed in range(procs)]
+    with Pool(procs) as pool:
+        results = pool.map(_worker, jobs)
+
+    generations = [g for r in results for g in r[3]]
+    return {
+        "reads": sum(r[0] for r in results),
+        "refreshes": sum(r[2] for r in results),
+        "corrupt_reads": sum(r[1] for r in results),
+        "duplicate_refreshes": len(generations) - len(set(generations)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="캐시 저장소 다중 프로세스 부하 검사")
+    parser.add_argument("--backend", choices=("sqlite", "files"), default="sqlite")
+    parser.add_argument("--procs", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--keys", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    result = run(args.backend, args.procs, args.seconds, args.keys)
+    print(f"backend={args.backend} procs={args.procs} seconds={args.seconds}")
+    print(
+        f"reads={result['reads']} ({result['reads'] / args.seconds:.0f}/s) refreshes={result['refreshes']} "
+        f"corrupt_reads={result['corrupt_reads']} duplicate_refreshes={result['duplicate_refreshes']}"
+    )
+    return 1 if result["corrupt_reads"] or result["duplicate_refreshes"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
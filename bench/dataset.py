@@ -0,0 +1,106 @@
+"""부하 테스트용 SQLite 데이터셋 생성기.
+
+학생 사용자(학번 암호화 포함)와 학급 게시글을 채운 DB 파일을 만듭니다. 비밀번호는 모두
+PASSWORD로 같고, 해시는 한 번만 계산하여 재사용합니다. (PASSWORD_HASH_METHOD 방식)
+학번은 앱과 같은 키(config.py가 설정하는 APP_AES_KEY)로 암호화되므로 --db로 재사용할 수 있습니다.
+
+    python bench/dataset.py --path /tmp/bench.db --users 3000 --posts 100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+PASSWORD = "Bench!pass1"
+WORDS = ["수행평가", "체육대회", "준비물", "시험범위", "방과후", "동아리", "봉사활동", "현장체험학습",
+         "가정통신문", "공지", "안내", "제출", "일정", "변경", "상담", "청소", "당번", "급식"]
+
+
+def userid(index):
+    return f"student{index}"
+
+
+def user_class(index):
+    """index번째 사용자의 (학년, 반)."""
+    return index % config.GRADE_COUNT + 1, (index // config.GRADE_COUNT) % config.CLASS_COUNT + 1
+
+
+def generate(path, users=3000, posts=100000, seed=0):
+    """path에 스키마를 만들고 사용자 users명, 게시글 posts개를 채웁니다."""
+    # 앱 모듈은 config 경로를 바꾼 뒤에 불러옴
+    config.DATABASE_PATH = path
+    import crypto_utils
+    import database
+    import post_render
+    import search
+    from werkzeug.security import generate_password_hash
+
+    started = time.perf_counter()
+    database.init_db()
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(PASSWORD, config.PASSWORD_HASH_METHOD)
+    now = datetime.now()
+
+    classes = [user_class(i) for i in range(users)]
+    student_numbers = [f"{grade}{classroom:02d}{i % 40 + 1:02d}".encode() for i, (grade, classroom) in enumerate(classes)]
+    encrypted = crypto_utils.get_keyring().encrypt_many(student_numbers)
+
+    conn = sqlite3.connect(path)
+    search.register_functions(conn)  # posts_bigram 트리거용
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (userid, name, password, grade, classroom, student_no, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (userid(i), f"학생{i}", password_hash, str(grade), str(classroom), token, now.isoformat())
+                for i, ((grade, classroom), token) in enumerate(zip(classes, encrypted))
+            ]
+        )
+    first_id = conn.execute("SELECT MIN(id) FROM users WHERE userid LIKE 'student%'").fetchone()[0]
+
+    base = now - timedelta(minutes=posts)
+    batch = []
+    for i in range(posts):
+        author = rng.randrange(users)
+        grade, classroom = classes[author]
+        title = " ".join(rng.choices(WORDS, k=3))
+        content = "\n".join(" ".join(rng.choices(WORDS, k=12)) for _ in range(rng.randint(1, 6)))
+        batch.append((grade, classroom, title, content, first_id + author, (base + timedelta(minutes=i)).isoformat()))
+        if len(batch) == 5000 or i == posts - 1:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO posts (grade, classroom, title, content, author_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    batch
+                )
+            batch = []
+    conn.close()
+
+    db = database.connect(path)
+    post_render.backfill(db)
+    db.execute("ANALYZE")
+    db.commit()
+    db.close()
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="부하 테스트용 DB 생성")
+    parser.add_argument("--path", required=True)
+    parser.add_argument("--users", type=int, default=3000)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if os.path.exists(args.path):
+        os.remove(args.path)
+    elapsed = generate(args.path, args.users, args.posts, args.seed)
+    print(f"{args.path}: 사용자 {args.users}명, 게시글 {args.posts}개 ({elapsed:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
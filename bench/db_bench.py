@@ -0,0 +1,159 @@
+"""SQLite 연결 방식 비교 벤치마크.
+
+legacy: 요청마다 sqlite3.connect(PARSE_DECLTYPES) 후 close, 롤백 저널 (이전 get_db 동작)
+tuned : 스레드마다 database.connect() 연결 하나를 재사용, WAL 및 pragma 적용 (현재 get_db 동작)
+
+여러 스레드가 읽기(학급 게시판 목록, 사용자 조회)와 쓰기(글 작성)를 섞어 실행하고
+처리량, 지연 시간 백분위수, "database is locked" 오류 수를 출력합니다.
+
+    python bench/db_bench.py --threads 8 --seconds 5 --write-ratio 0.2
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import database  # noqa: E402
+import search  # noqa: E402
+
+SEED_USERS = 500
+SEED_POSTS = 20000
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(path):
+    """스키마를 만들고 사용자와 게시글을 채운 DB 파일을 만듭니다."""
+    config.DATABASE_PATH = path
+    database.init_db()
+    conn = sqlite3.connect(path)
+    search.register_functions(conn)  # posts_bigram 트리거용
+    now = datetime.now().isoformat()
+    conn.executemany(
+        "INSERT INTO users (userid, name, password, grade, classroom, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [(f"user{i}", f"학생{i}", "x", str(i % 3 + 1), str(i % 10 + 1), now) for i in range(SEED_USERS)]
+    )
+    conn.executemany(
+        "INSERT INTO posts (grade, classroom, title, content, author_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [(i % 3 + 1, i % 10 + 1, f"공지 {i}", "내용 " * 50, i % SEED_USERS + 2, now) for i in range(SEED_POSTS)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_connection(path):
+    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.row_factory = sqlite3.Row
+    search.register_functions(conn)
+    return conn
+
+
+def run(mode, path, threads, seconds, write_ratio):
+    read_lat, write_lat = [], []
+    errors = {"locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        local_reads, local_writes, locked = [], [], 0
+        conn = database.connect(path) if mode == "tuned" else None
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            db = conn if conn is not None else legacy_connection(path)
+            is_write = rng.random() < write_ratio
+            try:
+                if is_write:
+                    db.execute(
+                        "INSERT INTO posts (grade, classroom, title, content, author_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                        (rng.randint(1, 3), rng.randint(1, 10), "새 글", "내용", rng.randint(2, SEED_USERS), datetime.now().isoformat())
+                    )
+                    db.commit()
+                else:
+                    db.execute(
+                        "SELECT id, userid, name, grade, classroom, student_no FROM users WHERE userid = ?",
+                        (f"user{rng.randrange(SEED_USERS)}",)
+                    ).fetchone()
+                    db.execute(
+                        "SELECT p.id, p.title, p.created_at, u.name as author_name "
+                        "FROM posts p JOIN users u ON p.author_id = u.id "
+                        "WHERE p.grade = ? AND p.classroom = ? "
+                        "ORDER BY p.created_at DESC LIMIT 50",
+                        (rng.randint(1, 3), rng.randint(1, 10))
+                    ).fetchall()
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                locked += 1
+                if db.in_transaction:
+                    db.rollback()
+            finally:
+                if conn is None:
+                    db.close()
+            (local_writes if is_write else local_reads).append(time.perf_counter() - started)
+        with lock:
+            read_lat.extend(local_reads)
+            write_lat.extend(local_writes)
+            errors["locked"] += locked
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    total = len(read_lat) + len(write_lat)
+    print(f"[{mode}] {total / seconds:.0f} ops/s, locked errors: {errors['locked']}")
+    for name, values in (("read", read_lat), ("write", write_lat)):
+        print(
+            f"  {name:5s} n={len(values):6d} "
+            f"p50={percentile(values, 50) * 1000:.2f}ms "
+            f"p95={percentile(values, 95) * 1000:.2f}ms "
+            f"p99={percentile(values, 99) * 1000:.2f}ms"
+        )
+    return {"ops_per_sec": total / seconds, "locked": errors["locked"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite 연결 방식 비교 벤치마크")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="db-bench-")
+    try:
+        template = os.path.join(workdir, "template.db")
+        seed(template)
+        results = {}
+        for mode in ("legacy", "tuned"):
+            path = os.path.join(workdir, f"{mode}.db")
+            shutil.copy(template, path)
+            conn = sqlite3.connect(path)
+            # legacy는 이전 기본값인 롤백 저널로 되돌림
+            conn.execute("PRAGMA journal_mode = %s" % ("DELETE" if mode == "legacy" else "WAL"))
+            conn.close()
+            results[mode] = run(mode, path, args.threads, args.seconds, args.write_ratio)
+        speedup = results["tuned"]["ops_per_sec"] / max(results["legacy"]["ops_per_sec"], 1)
+        print(f"tuned / legacy throughput: {speedup:.2f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""앱 전체 부하 테스트.
+
+생성한 데이터셋(bench/dataset.py)과 로컬 NEIS stub(bench/neis_stub.py)으로 앱을 별도 프로세스에서
+띄운 뒤, 가상 사용자 스레드들이 로그인·학급 잠금 해제 후 섞인 요청을 보냅니다.
+    /api/data 50, /main 20, /class/<g>-<c> 20, /login 1 비율  (--mix로 변경)
+로그인 비율은 세션이 유지되는 실제 사용에 맞춰 낮게 둡니다. (scrypt 검증 한 번이 코어 하나에서 약 150ms라
+10%면 PASSWORD_HASH_WORKERS 풀이 포화되어 대부분 503으로 거절됨)
+경로별 요청 수, 초당 처리량, p50/p95/p99, 오류·503 수와 NEIS 호출 수를 출력합니다.
+--save로 결과를 저장하고, --baseline과 비교하여 p95가 --tolerance 배 이상 느려지면 1로 종료합니다.
+
+    python bench/load_test.py --users 3000 --posts 100000 --clients 32 --seconds 30 \\
+        --neis-latency-ms 80 --neis-error-rate 0.02 --save bench/baselines/load.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config  # noqa: E402
+import dataset  # noqa: E402
+import neis_stub  # noqa: E402
+
+SECRET_KEY = "bench-secret"
+DEFAULT_MIX = {"api_data": 50, "main": 20, "class": 20, "login": 1}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} 이(가) 응답하지 않습니다.")
+
+
+def _configure(workdir, db_path, neis_url):
+    """앱 모듈을 불러오기 전에 경로와 NEIS 주소를 테스트용으로 바꿉니다."""
+    config.SECRET_KEY = SECRET_KEY
+    config.DATABASE_PATH = db_path
+    config.CACHE_DIR = os.path.join(workdir, "cache")
+    config.CACHE_DB_PATH = os.path.join(config.CACHE_DIR, "neis_cache.db")
+    config.TIMETABLE_DB_PATH = os.path.join(config.CACHE_DIR, "timetable.db")
+    config.ASSET_BUILD_DIR = os.path.join(config.CACHE_DIR, "assets")
+    config.PROFILE_DIR = os.path.join(config.CACHE_DIR, "profiles")
+    config.NEIS_BASE_URL = neis_url
+    config.API_KEY = config.API_KEY or "bench"
+    config.ATPT_OFCDC_SC_CODE = config.ATPT_OFCDC_SC_CODE or "B10"
+    config.SD_SCHUL_CODE = config.SD_SCHUL_CODE or "7010000"
+    config.LOG_LEVEL = "WARNING"
+
+
+def _run_app(port, workdir, db_path, neis_url):
+    _configure(workdir, db_path, neis_url)
+    import app as webapp
+    from werkzeug.serving import make_server
+    make_server("127.0.0.1", port, webapp.app, threaded=True).serve_forever()
+
+
+def _school_days(count=10):
+    days, current = [], datetime.now()
+    while len(days) < count:
+        if current.weekday() < 5:
+            days.append(current.strftime("%Y%m%d"))
+        current += timedelta(days=1)
+    return days
+
+
+class VirtualUser:
+    """로그인하고 자기 학급을 잠금 해제한 뒤 가중치에 따라 요청을 보내는 가상 사용자입니다."""
+
+    def __init__(self, base_url, index, mix, rng):
+        import invite_codes  # config.SECRET_KEY를 바꾼 뒤에 불러옴
+        self.base = base_url
+        self.userid = dataset.userid(index)
+        self.grade, self.classroom = dataset.user_class(index)
+        self.invite_code = invite_codes.derive_code(self.grade, self.classroom)
+        self.session = requests.Session()
+        self.rng = rng
+        self.routes = list(mix)
+        self.weights = [mix[name] for name in self.routes]
+        self.days = _school_days()
+
+    def setup(self):
+        self.login()
+        self.session.post(
+            f"{self.base}/class/unlock", params={"grade": self.grade, "classroom": self.classroom},
+            data={"invite_code": self.invite_code}, allow_redirects=False, timeout=30
+        )
+
+    def login(self):
+        return self.session.post(
+            f"{self.base}/login", data={"userid": self.userid, "password": dataset.PASSWORD},
+            allow_redirects=False, timeout=30
+        )
+
+    def request(self, route):
+        if route == "login":
+            return self.login()
+        if route == "api_data":
+            return self.session.get(f"{self.base}/api/data", params={
+                "date": self.rng.choice(self.days), "grade": self.grade, "classroom": self.classroom
+            }, timeout=30)
+        if route == "main":
+            return self.session.get(f"{self.base}/main", timeout=30)
+        return self.session.get(f"{self.base}/class/{self.grade}-{self.classroom}", timeout=30)
+
+    def run(self, deadline, measure_from, results):
+        while time.time() < deadline:
+            route = self.rng.choices(self.routes, self.weights)[0]
+            started = time.perf_counter()
+            try:
+                status = self.request(route).status_code
+            except requests.RequestException:
+                status = -1
+            elapsed = time.perf_counter() - started
+            if time.time() >= measure_from:
+                results.append((route, status, elapsed))
+
+
+def summarize(results, seconds):
+    report = {"total": {"requests": len(results), "rps": round(len(results) / seconds, 1)}, "routes": {}}
+    for route in sorted({r for r, _, _ in results}):
+        latencies = [e for r, _, e in results if r == route]
+        statuses = [s for r, s, _ in results if r == route]
+        report["routes"][route] = {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / seconds, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "errors": sum(1 for s in statuses if s == -1 or (s >= 500 and s != 503)),
+            "shed_503": statuses.count(503),
+        }
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """기준 결과보다 p95가 tolerance배 넘게 느려진 경로 목록을 반환합니다."""
+    regressions = []
+    for route, current in report["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if before and before["p95_ms"] > 0 and current["p95_ms"] > before["p95_ms"] * tolerance:
+            regressions.append(f"{route}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="앱 부하 테스트 (로컬 NEIS stub 사용)")
+    parser.add_argument("--users", type=int, default=3000)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--db", help="이미 생성한 데이터셋 DB (생략하면 새로 생성)")
+    parser.add_argument("--clients", type=int, default=32, help="동시 가상 사용자 수")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3, help="측정에서 제외할 처음 시간 (초)")
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX, help='경로별 가중치 JSON, 예: {"api_data": 80, "main": 20}')
+    parser.add_argument("--neis-latency-ms", type=float, default=80)
+    parser.add_argument("--neis-jitter-ms", type=float, default=40)
+    parser.add_argument("--neis-error-rate", type=float, default=0.0)
+    parser.add_argument("--neis-timeout-rate", type=float, default=0.0)
+    parser.add_argument("--save", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="허용하는 p95 증가 배수")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    processes = []
+    try:
+        db_path = args.db
+        if not db_path:
+            db_path = os.path.join(workdir, "bench.db")
+            config.SECRET_KEY = SECRET_KEY
+            print(f"데이터셋 생성 중... (사용자 {args.users}명, 게시글 {args.posts}개)")
+            print(f"  {dataset.generate(db_path, args.users, args.posts):.1f}초")
+
+        stub_port, app_port = _free_port(), _free_port()
+        stub = multiprocessing.Process(target=neis_stub.serve, daemon=True, args=(
+            stub_port, args.neis_latency_ms, args.neis_jitter_ms, args.neis_error_rate, args.neis_timeout_rate
+        ))
+        neis_url = f"http://127.0.0.1:{stub_port}/hub"
+        server = multiprocessing.Process(target=_run_app, args=(app_port, workdir, db_path, neis_url), daemon=True)
+        processes = [stub, server]
+        for process in processes:
+            process.start()
+        base_url = f"http://127.0.0.1:{app_port}"
+        _wait_for(f"http://127.0.0.1:{stub_port}/_stats")
+        _wait_for(f"{base_url}/login")
+
+        config.SECRET_KEY = SECRET_KEY
+        users = [
+            VirtualUser(base_url, random.randrange(args.users), args.mix, random.Random(i))
+            for i in range(args.clients)
+        ]
+        for user in users:
+            user.setup()
+
+        results = []
+        measure_from = time.time() + args.warmup
+        deadline = measure_from + args.seconds
+        threads = [threading.Thread(target=user.run, args=(deadline, measure_from, results)) for user in users]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        report = summarize(results, args.seconds)
+        report["neis_calls"] = requests.get(f"http://127.0.0.1:{stub_port}/_stats", timeout=5).json()
+        report["settings"] = {k: v for k, v in vars(args).items() if k not in ("save", "baseline", "db")}
+
+        print(f"전체: {report['total']['requests']}건, {report['total']['rps']} req/s")
+        for route, stats in report["routes"].items():
+            print(
+                f"  {route:9s} n={stats['requests']:6d} {stats['rps']:7.1f}/s "
+                f"p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms "
+                f"errors={stats['errors']} 503={stats['shed_503']}"
+            )
+        print(f"NEIS 호출: {report['neis_calls']}")
+
+        if args.save:
+            os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                regressions = compare(report, json.load(f), args.tolerance)
+            for line in regressions:
+                print(f"성능 저하: {line}")
+            return 1 if regressions else 0
+        return 0
+    finally:
+        for process in processes:
+            process.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
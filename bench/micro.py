@@ -0,0 +1,156 @@
+"""핵심 경로 마이크로 벤치마크와 기준값 비교.
+
+    file_cache_memory_hit  : neis.file_cache 메모리(LRU) 적중
+    file_cache_store_hit   : 메모리를 비운 뒤 영구 저장소에서 읽기
+    timetable_parse        : 한 달치 시간표 row를 날짜별 교시 목록으로 조합 (NEIS 호출 없이 가짜 row 사용)
+    timetable_range_hit    : 저장소에 있는 한 달 기간의 get_timetable_range
+    render_content         : 게시글 bleach 소독 + 줄바꿈 변환
+    encrypt_many / decrypt_many : 학번 1000개 AES-GCM 일괄 암복호화
+
+--save로 결과(연산당 초)를 저장하고, --baseline과 비교하여 --tolerance 배 넘게 느려진
+항목이 있으면 1로 종료합니다. 기준값은 같은 기기에서 만든 것과 비교해야 의미가 있습니다.
+
+    python bench/micro.py --save bench/baselines/micro.json
+    python bench/micro.py --baseline bench/baselines/micro.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402  (APP_AES_KEY도 config.py가 설정)
+
+POST_CONTENT = "\n".join([
+    "내일 수행평가 준비물: 색연필, 자 <b>꼭</b> 챙겨오세요!",
+    "<script>alert('x')</script> 제출 기한은 금요일까지입니다.",
+    "자세한 내용은 https://example.com/notice 를 참고하세요.",
+] * 4)
+
+
+def measure(fn, repeat=5, min_time=0.2):
+    """fn을 min_time 이상 걸리도록 여러 번 실행하는 측정을 repeat번 하여 가장 빠른 연산당 시간(초)을 반환합니다."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def _month_rows(start, days=31, periods=7):
+    first = datetime.strptime(start, "%Y%m%d")
+    return [
+        {"ALL_TI_YMD": (first + timedelta(days=d)).strftime("%Y%m%d"), "PERIO": str(p), "ITRT_CNTNT": f"과목{p}"}
+        for d in range(days) for p in range(periods, 0, -1)  # 교시가 뒤섞여 와도 순서대로 채우는지 포함
+    ]
+
+
+def build_benchmarks(workdir):
+    """{이름: 인자 없는 함수}를 반환합니다. 앱 모듈은 캐시 경로를 workdir로 바꾼 뒤에 불러옵니다."""
+    config.CACHE_DIR = workdir
+    config.CACHE_DB_PATH = os.path.join(workdir, "neis_cache.db")
+    config.TIMETABLE_DB_PATH = os.path.join(workdir, "timetable.db")
+    import crypto_utils
+    import neis
+    import post_render
+
+    @neis.file_cache(lifetime=3600)
+    def cached_meal(date):
+        return [{"type": "중식", "menu": ["잡곡밥", "미역국", "제육볶음", "배추김치"]}]
+
+    cached_meal("20240304")
+
+    def store_hit():
+        neis._memory_cache.clear()
+        cached_meal("20240304")
+
+    rows = _month_rows("20240301")
+
+    def timetable_parse():
+        return neis._timetable_days(iter(rows))
+
+    neis.store_timetable_rows(1, 1, rows, "20240301", "20240331")
+
+    keyring = crypto_utils.get_keyring()
+    plaintexts = [f"1{c:02d}{n:02d}".encode() for c in range(1, 26) for n in range(1, 41)]
+    tokens = keyring.encrypt_many(plaintexts)
+
+    return {
+        "file_cache_memory_hit": lambda: cached_meal("20240304"),
+        "file_cache_store_hit": store_hit,
+        "timetable_parse": timetable_parse,
+        "timetable_range_hit": lambda: neis.get_timetable_range(1, 1, "20240301", "20240331"),
+        "render_content": lambda: post_render.render_content(POST_CONTENT),
+        "encrypt_many": lambda: keyring.encrypt_many(plaintexts),
+        "decrypt_many": lambda: keyring.decrypt_many(tokens),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """기준값보다 tolerance배 넘게 느려진 항목 목록을 반환합니다."""
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before and seconds > before * tolerance:
+            regressions.append(f"{name}: {before * 1e6:.2f}µs -> {seconds * 1e6:.2f}µs ({seconds / before:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="마이크로 벤치마크")
+    parser.add_argument("--only", nargs="*", help="실행할 벤치마크 이름")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="허용하는 느려짐 배수")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="micro-bench-")
+    try:
+        benchmarks = build_benchmarks(workdir)
+        results = {}
+        for name, fn in benchmarks.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = measure(fn, repeat=args.repeat)
+            print(f"{name:24s} {results[name] * 1e6:12.2f}µs/op")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"성능 저하: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+"""부하 테스트용 로컬 NEIS API 대역(stub) 서버.
+
+mealServiceDietInfo(급식)와 hisTimetable(시간표)를 NEIS와 같은 JSON 형식과 pIndex/pSize
+페이지 규칙으로 응답합니다. 응답 지연과 오류 비율을 설정할 수 있고, 서비스별 호출 수를
+/_stats에서 JSON으로 돌려줍니다. 앱은 NEIS_BASE_URL=http://127.0.0.1:<port>/hub 로 연결합니다.
+
+    python bench/neis_stub.py --port 8765 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SUBJECTS = ["국어", "수학", "영어", "과학", "사회", "체육", "음악", "미술", "정보", "한국사", "기술가정", "진로"]
+MENUS = ["잡곡밥", "현미밥", "미역국", "된장찌개", "김치찌개", "제육볶음", "닭갈비", "계란말이", "배추김치", "깍두기", "요구르트", "과일"]
+MEALS = [("1", "조식"), ("2", "중식"), ("3", "석식")]
+
+
+def _dates(start, end):
+    current = datetime.strptime(start, "%Y%m%d")
+    last = datetime.strptime(end, "%Y%m%d")
+    while current <= last:
+        if current.weekday() < 5:
+            yield current.strftime("%Y%m%d")
+        current += timedelta(days=1)
+
+
+def meal_rows(params):
+    start = params.get("MLSV_FROM_YMD") or params.get("MLSV_YMD")
+    end = params.get("MLSV_TO_YMD") or start
+    rows = []
+    for date in _dates(start, end):
+        rng = random.Random(date)
+        for code, name in MEALS:
+            rows.append({
+                "MLSV_YMD": date, "MMEAL_SC_CODE": code, "MMEAL_SC_NM": name,
+                "DDISH_NM": "<br/>".join(rng.sample(MENUS, 5)),
+            })
+    return rows
+
+
+def timetable_rows(params):
+    rows = []
+    for date in _dates(params["TI_FROM_YMD"], params["TI_TO_YMD"]):
+        rng = random.Random(f"{date}-{params.get('GRADE')}-{params.get('CLASS_NM')}")
+        for period in range(1, 8):
+            rows.append({
+                "ALL_TI_YMD": date, "GRADE": params.get("GRADE"), "CLASS_NM": params.get("CLASS_NM"),
+                "PERIO": str(period), "ITRT_CNTNT": rng.choice(SUBJECTS),
+            })
+    return rows
+
+
+SERVICES = {"mealServiceDietInfo": meal_rows, "hisTimetable": timetable_rows}
+
+
+class StubState:
+    def __init__(self, latency_ms, jitter_ms, error_rate, timeout_rate, hang_seconds):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def count(self, service, outcome):
+        with self.lock:
+            key = f"{service}:{outcome}"
+            self.calls[key] = self.calls.get(key, 0) + 1
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/_stats":
+                with state.lock:
+                    return self._send(200, dict(state.calls))
+            service = url.path.rsplit("/", 1)[-1]
+            builder = SERVICES.get(service)
+            if builder is None:
+                return self._send(404, {"error": "unknown service"})
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+            time.sleep(max(0.0, state.latency_ms + random.uniform(-state.jitter_ms, state.jitter_ms)) / 1000)
+            roll = random.random()
+            if roll < state.timeout_rate:
+                state.count(service, "timeout")
+                time.sleep(state.hang_seconds)  # 앱의 NEIS_TIMEOUT보다 길게 멈춤
+                return self._send(504, {"error": "timeout"})
+            if roll < state.timeout_rate + state.error_rate:
+                state.count(service, "error")
+                return self._send(500, {"error": "stub error"})
+
+            rows = builder(params)
+            page, size = int(params.get("pIndex", 1)), int(params.get("pSize", 100))
+            page_rows = rows[(page - 1) * size: page * size]
+            state.count(service, "ok")
+            if not page_rows:
+                return self._send(200, {"RESULT": {"CODE": "INFO-200", "MESSAGE": "해당하는 데이터가 없습니다."}})
+            return self._send(200, {service: [
+                {"head": [{"list_total_count": len(rows)}, {"RESULT": {"CODE": "INFO-000", "MESSAGE": "정상 처리되었습니다."}}]},
+                {"row": page_rows},
+            ]})
+
+    return Handler
+
+
+def serve(port=8765, latency_ms=80.0, jitter_ms=40.0, error_rate=0.0, timeout_rate=0.0, hang_seconds=10.0):
+    """stub 서버를 실행합니다. (종료될 때까지 반환하지 않음)"""
+    state = StubState(latency_ms, jitter_ms, error_rate, timeout_rate, hang_seconds)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 NEIS API stub 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="평균 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=40.0, help="지연의 ± 변동 폭")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 500을 돌려줄 비율")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="응답하지 않고 멈출 비율")
+    args = parser.parse_args(argv)
+    print(f"NEIS stub: http://127.0.0.1:{args.port}/hub")
+    serve(args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.timeout_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""게시글 검색 벤치마크: FTS5 색인 검색 대 LIKE 전체 스캔.
+
+임의로 만든 게시글 --posts개(기본 10만)를 채운 DB에서 같은 검색어들로
+search.search_posts(FTS)와 이전 방식인 LIKE '%검색어%' 스캔을 각각 실행하여
+지연 시간 백분위수를 출력합니다.
+
+    python bench/search_bench.py --posts 100000 --queries 200
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+import database  # noqa: E402
+import search  # noqa: E402
+
+# 검색 대상 키워드. 실제 게시판처럼 일부 글에만 등장하도록 드물게 섞습니다.
+KEYWORDS = [
+    "수행평가", "체육대회", "준비물", "시험범위", "방과후", "동아리", "봉사활동",
+    "현장체험학습", "중간고사", "기말고사", "모의고사", "가정통신문", "상담", "당번",
+]
+QUERY_TERMS = ["수행평가", "현장체험학습", "가정통신문", "시험범위 제출", "모의고사 일정", "상담", "당번 일정"]
+KEYWORD_RATE = 0.02
+SYLLABLES = [chr(code) for code in range(0xAC00, 0xD7A4, 28)]  # 받침 없는 한글 음절
+
+
+def random_text(rng, words):
+    """무작위 음절 단어 사이에 KEYWORD_RATE 확률로 키워드를 섞은 문장을 만듭니다."""
+    return " ".join(
+        rng.choice(KEYWORDS + ["제출", "일정"]) if rng.random() < KEYWORD_RATE
+        else "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        for _ in range(words)
+    )
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(path, posts):
+    """스키마(FTS 포함)를 만들고 임의의 게시글 posts개를 채웁니다."""
+    config.DATABASE_PATH = path
+    database.init_db()
+    rng = random.Random(0)
+    conn = sqlite3.connect(path)
+    search.register_functions(conn)  # posts_bigram 트리거용
+    conn.execute(
+        "INSERT INTO users (userid, name, password, grade, classroom, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        ("bench", "학생", "x", "1", "1", datetime.now().isoformat())
+    )
+    author_id = conn.execute("SELECT id FROM users WHERE userid = 'bench'").fetchone()[0]
+    base = datetime(2026, 3, 2)
+    rows = (
+        (
+            rng.randint(1, config.GRADE_COUNT), rng.randint(1, config.CLASS_COUNT),
+            random_text(rng, 4),
+            random_text(rng, 60),
+            author_id,
+            (base + timedelta(minutes=i)).isoformat()
+        )
+        for i in range(posts)
+    )
+    conn.executemany(
+        "INSERT INTO posts (grade, classroom, title, content, author_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def like_search(db, query, page_size):
+    """이전 방식: 모든 게시글을 LIKE로 훑고 최신순 정렬."""
+    terms = query.split()
+    clause = " AND ".join("(p.title LIKE ? OR p.content LIKE ?)" for _ in terms)
+    params = [p for term in terms for p in (f"%{term}%", f"%{term}%")]
+    return db.execute(
+        "SELECT p.id, p.title, p.created_at FROM posts p WHERE " + clause +
+        " ORDER BY p.created_at DESC LIMIT ?",
+        params + [page_size]
+    ).fetchall()
+
+
+def measure(fn, queries):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(name, values):
+    print(
+        f"  {name:4s} n={len(values):5d} "
+        f"p50={percentile(values, 50) * 1000:.2f}ms "
+        f"p95={percentile(values, 95) * 1000:.2f}ms "
+        f"p99={percentile(values, 99) * 1000:.2f}ms"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="게시글 검색 FTS/LIKE 비교 벤치마크")
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="search-bench-")
+    try:
+        path = os.path.join(workdir, "search.db")
+        started = time.perf_counter()
+        seed(path, args.posts)
+        print(f"게시글 {args.posts}개 생성 및 색인: {time.perf_counter() - started:.1f}초")
+
+        db = database.connect(path)
+        rng = random.Random(1)
+        queries = [rng.choice(QUERY_TERMS) for _ in range(args.queries)]
+        page_size = config.SEARCH_PAGE_SIZE
+
+        fts = measure(lambda q: search.search_posts(db, q, page_size=page_size), queries)
+        like = measure(lambda q: like_search(db, q, page_size), queries)
+        print(f"posts={args.posts} queries={args.queries}")
+        report("fts", fts)
+        report("like", like)
+        print(f"like / fts p50: {percentile(like, 50) / max(percentile(fts, 50), 1e-9):.1f}x")
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import quote
+
+log = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """크기가 제한된 LRU 메모리 캐시입니다. 항목마다 만료 시각을 가집니다."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(적중 여부, 값)을 반환합니다. 만료된 항목은 제거하고 미스로 처리합니다."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, expires_at):
+        """값을 저장하고, 최대 크기를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다."""
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 키에 대한 동시 호출을 하나로 합칩니다. 나머지 호출자는 첫 호출의 결과를 기다립니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """fn()의 결과와, 다른 호출의 결과를 공유받았는지 여부를 (result, shared)로 반환합니다."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class CacheStats:
+    """캐시 적중/stale 응답/미스/병합/오류 대체 횟수를 스레드 안전하게 집계합니다."""
+
+    FIELDS = ("memory_hits", "store_hits", "stale_hits", "misses", "coalesced", "fallbacks")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        hits = counts["memory_hits"] + counts["store_hits"] + counts["stale_hits"]
+        total = hits + counts["misses"] + counts["coalesced"]
+        counts["hit_ratio"] = round(hits / total, 4) if total else 0.0
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+
+# --- 영구 캐시 저장소 (백엔드) ---
+# 항목은 {'timestamp': 저장 시각, 'ttl': 유효 시간(초), 'data': 값} 형태입니다.
+
+# 이 크기(바이트)보다 큰 값은 zlib으로 압축하여 저장
+COMPRESS_MIN_BYTES = 512
+
+def _encode(value):
+    """값을 공백 없는 JSON 바이트로 직렬화하고, 크면 압축합니다. (바이트, 압축 여부)를 반환합니다."""
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return zlib.compress(raw, 1), 1
+    return raw, 0
+
+def _decode(blob, codec):
+    if codec == 1:
+        blob = zlib.decompress(blob)
+    return json.loads(blob)
+
+
+class SQLiteBackend:
+    """하나의 SQLite 파일에 모든 캐시 항목을 저장하는 key/value 저장소입니다.
+
+    쓰기는 트랜잭션 단위로 원자적이라 여러 워커 프로세스가 같은 파일을 안전하게 공유하며,
+    cache_leases 테이블로 키마다 한 프로세스만 갱신하도록 조정합니다.
+    만료 후 retention(초)이 지난 항목은 정리되고
+    항목 수가 max_entries를 넘으면 가장 오래 전에 저장된 항목부터 제거합니다.
+    연결은 스레드마다 하나씩 열어 재사용합니다.
+    """
+
+    PURGE_EVERY = 100  # 이 횟수만큼 쓸 때마다 만료 항목 정리 및 크기 제한 적용
+
+    def __init__(self, path, max_entries=10000, retention=7 * 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.retention = retention
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=67108864")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                codec INTEGER NOT NULL, -- 0: JSON, 1: zlib 압축 JSON
+                stored_at REAL NOT NULL,
+                ttl REAL NOT NULL,
+                expires_at REAL NOT NULL -- 이 시각이 지나면 정리 대상
+            ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries (expires_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_stored_at ON cache_entries (stored_at)")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID
+            """)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value, codec, stored_at, ttl FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, codec, stored_at, ttl = row
+        return {'timestamp': stored_at, 'ttl': ttl, 'data': _decode(value, codec)}
+
+    def set(self, key, entry):
+        blob, codec = _encode(entry['data'])
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, codec, stored_at, ttl, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, codec, entry['timestamp'], entry['ttl'], entry['timestamp'] + entry['ttl'] + self.retention)
+            )
+        with self._writes_lock:
+            self._writes += 1
+            should_purge = self._writes % self.PURGE_EVERY == 0
+        if should_purge:
+            self.purge()
+
+    def delete(self, key):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def acquire_lease(self, key, owner, ttl):
+        """key에 대한 갱신 권한(lease)을 ttl초 동안 얻습니다. 다른 프로세스가 유효한 lease를 갖고 있으면 False입니다."""
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO cache_leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE cache_leases.expires_at < ?",
+                (key, owner, now + ttl, now)
+            )
+        return cur.rowcount == 1
+
+    def release_lease(self, key, owner):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache_leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def purge(self, now=None):
+        """만료된 항목을 지우고, 크기 제한을 넘는 만큼 오래된 항목을 제거합니다. 지운 개수를 반환합니다."""
+        now = now or time.time()
+        conn = self._conn()
+        with conn:
+            removed = conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,)).rowcount
+            conn.execute("DELETE FROM cache_leases WHERE expires_at < ?", (now,))
+            overflow = len(self) - self.max_entries
+            if overflow > 0:
+                removed += conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN "
+                    "(SELECT key FROM cache_entries ORDER BY stored_at LIMIT ?)",
+                    (overflow,)
+                ).rowcount
+        return removed
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+class JsonDirBackend:
+    """키마다 JSON 파일 하나를 쓰는 저장소입니다. (이전 방식과의 호환용)
+
+    파일은 임시 파일에 쓴 뒤 rename하므로 읽는 쪽이 잘린 파일을 보지 않습니다.
+    갱신 lease는 키마다 .lease 파일(소유자와 만료 시각)로 표시하고, lease를 확인하고 바꾸는 동안에는
+    .lease.lock 파일에 flock을 걸어 여러 프로세스가 만료된 lease를 동시에 가져가지 못하게 합니다.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, quote(key, safe="") + ".json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (IOError, json.JSONDecodeError) as e:
+            log.warning("캐시 파일 읽기 오류: %s", e)
+            return None
+
+    def set(self, key, entry):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except IOError as e:
+            log.warning("캐시 파일 쓰기 오류: %s", e)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _lease_lock(self, key):
+        """key의 lease 파일을 읽고 쓰는 동안 잡는 프로세스 간 배타 잠금. (잠금 파일은 지우지 않음)"""
+        with open(self._path(key) + ".lease.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_lease(self, lease_path):
+        """lease 파일의 (소유자, 만료 시각)을 반환합니다. 없거나 읽을 수 없으면 None."""
+        try:
+            with open(lease_path, 'r') as f:
+                owner, expires_at = f.read().split("\n")
+            return owner, float(expires_at)
+        except FileNotFoundError:
+            return None
+        except ValueError:  # 이전 형식(소유자만 기록)이거나 쓰다 만 파일
+            return None
+
+    def acquire_lease(self, key, owner, ttl):
+        """lease가 없거나 만료되었으면 ttl초 동안 owner의 lease로 바꾸고 True를 반환합니다."""
+        lease_path = self._path(key) + ".lease"
+        with self._lease_lock(key):
+            current = self._read_lease(lease_path)
+            if current is not None and current[1] > time.time():
+                return False
+            tmp_path = f"{lease_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(f"{owner}\n{time.time() + ttl}")
+            os.replace(tmp_path, lease_path)
+            return True
+
+    def release_lease(self, key, owner):
+        lease_path = self._path(key) + ".lease"
+        with self._lease_lock(key):
+            current = self._read_lease(lease_path)
+            if current is None or current[0] != owner:
+                return
+            try:
+                os.remove(lease_path)
+            except FileNotFoundError:
+                pass
+
+    def purge(self, now=None):
+        return 0
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+
+
+def read_json_dir(directory):
+    """이전 file_cache가 남긴 JSON 파일들을 읽어 (경로, 확장자를 뺀 파일 이름, 항목)을 차례로 돌려줍니다.
+
+    항목은 {'timestamp', 'data'}를 가진 dict이고, 읽을 수 없거나 형식이 다른 파일이면 None입니다.
+    """
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if not {'timestamp', 'data'} <= entry.keys():
+                raise KeyError("timestamp/data")
+        except (IOError, ValueError, KeyError, AttributeError) as e:
+            log.warning("캐시 파일 읽기 오류 (%s): %s", name, e)
+            entry = None
+        yield path, name[:-len(".json")], entry
@@ -0,0 +1,144 @@
+"""학급 잠금 해제 상태(비트셋)와 학급 경로 접근 검사.
+
+잠금 해제한 학급은 학급마다 1비트인 정수 하나로 저장합니다. (학년 3 × 반 10이면 30비트)
+CLASS_ACCESS_STORE가 "cookie"이면 서명된 세션 쿠키에, "server"이면 세션 ID를 키로 SQLite에 저장하여
+쿠키에는 세션 ID만 남깁니다. 어느 쪽이든 학급을 몇 개 열어도 쿠키 크기는 일정합니다.
+"""
+import time
+from functools import wraps
+
+from flask import Response, flash, g, jsonify, redirect, session, url_for
+
+import config
+import database
+
+SESSION_KEY = "unlocked"
+# 이전 형식: ["1-2", "3-10", ...] 문자열 목록 (읽을 때 비트셋으로 바꿈)
+_LEGACY_KEY = "unlocked_classes"
+
+_last_purge = 0.0
+
+
+def parse_class(grade, classroom):
+    """학년/반 문자열을 정수로 바꿉니다. 숫자가 아니면 ValueError, 없는 학급이면 None을 반환합니다."""
+    grade_num, class_num = int(grade), int(classroom)
+    if not (1 <= grade_num <= config.GRADE_COUNT and 1 <= class_num <= config.CLASS_COUNT):
+        return None
+    return grade_num, class_num
+
+
+def all_classes():
+    """(학년, 반) 문자열 튜플을 모든 학급에 대해 반환합니다."""
+    return [
+        (str(grade), str(classroom))
+        for grade in range(1, config.GRADE_COUNT + 1)
+        for classroom in range(1, config.CLASS_COUNT + 1)
+    ]
+
+
+def class_bit(grade_num, class_num):
+    return 1 << ((grade_num - 1) * config.CLASS_COUNT + (class_num - 1))
+
+
+def is_admin():
+    return bool(g.user) and g.user['userid'] == 'admin'
+
+
+def _load_server_bits(session_id):
+    row = database.get_db().execute(
+        "SELECT bits FROM class_access WHERE session_id = ?", (session_id,)
+    ).fetchone()
+    return row["bits"] if row else 0
+
+
+def _save_server_bits(session_id, bits):
+    """비트셋을 저장하고, 한 시간에 한 번 CLASS_ACCESS_RETENTION이 지난 행을 지웁니다."""
+    global _last_purge
+    now = time.time()
+    db = database.get_db()
+    db.execute(
+        "INSERT INTO class_access (session_id, bits, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(session_id) DO UPDATE SET bits = excluded.bits, updated_at = excluded.updated_at",
+        (session_id, bits, now)
+    )
+    if now - _last_purge >= 3600:
+        _last_purge = now
+        db.execute("DELETE FROM class_access WHERE updated_at < ?", (now - config.CLASS_ACCESS_RETENTION,))
+    db.commit()
+
+
+def _save_bits(bits):
+    g.unlocked_bits = bits
+    if config.CLASS_ACCESS_STORE == "server":
+        _save_server_bits(session["session_id"], bits)
+    else:
+        session[SESSION_KEY] = bits
+
+
+def unlocked_bits():
+    """현재 세션의 잠금 해제 비트셋을 반환합니다. (요청마다 한 번만 읽음)"""
+    if "unlocked_bits" in g:
+        return g.unlocked_bits
+    if config.CLASS_ACCESS_STORE == "server":
+        bits = _load_server_bits(session["session_id"])
+    else:
+        bits = session.get(SESSION_KEY, 0)
+    g.unlocked_bits = bits
+
+    legacy = session.pop(_LEGACY_KEY, None)
+    if legacy:
+        for class_identifier in legacy:
+            try:
+                parsed = parse_class(*class_identifier.split("-", 1))
+            except (TypeError, ValueError):
+                continue
+            if parsed is not None:
+                bits |= class_bit(*parsed)
+        _save_bits(bits)
+    return bits
+
+
+def has_access(grade_num, class_num):
+    """관리자이거나 이 세션에서 잠금 해제한 학급인지 확인합니다."""
+    return is_admin() or bool(unlocked_bits() & class_bit(grade_num, class_num))
+
+
+def unlock(grade_num, class_num):
+    """학급을 이 세션에서 잠금 해제합니다."""
+    bits = unlocked_bits()
+    bit = class_bit(grade_num, class_num)
+    if not bits & bit:
+        _save_bits(bits | bit)
+
+
+def _deny(kind, status, message, parsed=None):
+    if kind == "api":
+        return jsonify({"success": False, "message": message}), status
+    if kind == "stream":
+        return Response(message + "\n", status=status, mimetype="text/plain")
+    if status == 403:
+        return redirect(url_for("unlock_class", grade=parsed[0], classroom=parsed[1]))
+    flash(message)
+    return redirect(url_for("main"))
+
+
+def require_class(kind="page"):
+    """<grade>-<classroom> 경로의 학급을 한 번만 검사하는 데코레이터입니다.
+
+    학년/반을 정수로 바꿔 뷰에 넘기고, 없는 학급이거나 잠금 해제하지 않은 학급(관리자 제외)이면 kind에 맞게 거절합니다.
+      page: 메인 또는 잠금 해제 페이지로 리다이렉트, api: JSON 오류, stream: 텍스트 오류 (EventSource용)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(grade, classroom, **kwargs):
+            try:
+                parsed = parse_class(grade, classroom)
+            except ValueError:
+                return _deny(kind, 400, "유효하지 않은 학급 경로입니다.")
+            if parsed is None:
+                return _deny(kind, 404, "존재하지 않는 학급입니다.")
+            if not has_access(*parsed):
+                return _deny(kind, 403, "초대 코드로 잠금 해제가 필요합니다.", parsed)
+            return view(grade=parsed[0], classroom=parsed[1], **kwargs)
+        return wrapper
+    return decorator
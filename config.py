@@ -2,6 +2,8 @@ import os
 
 # AES 암호화 키 설정 (환경 변수)
 os.environ['APP_AES_KEY'] = 'dI0rRkx6mTZi--S97R50jDVkLcQgqB5A2dYFGVjMgCY='
+# 키 교체: APP_AES_KEYS="k2=base64키,k3=base64키"로 키를 추가하고, 새로 암호화할 키를
+# APP_AES_ACTIVE_KID로 지정합니다. (지정하지 않으면 v1, v1이 없으면 숫자 순으로 가장 큰 kid. 예: k10 > k9)
 
 # 기본 디렉토리
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,6 +14,43 @@ DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() in ('true', '1', 't')
 
 # 데이터베이스 설정
 DATABASE_PATH = os.path.join(BASE_DIR, "users.db")
+DB_BUSY_TIMEOUT = 5000  # 잠금 대기 시간 (밀리초)
+DB_CACHE_SIZE_KB = 16384  # 연결당 페이지 캐시 크기 (KiB)
+DB_MMAP_SIZE = 64 * 1024 * 1024  # 메모리 맵 크기 (바이트)
+DB_CACHED_STATEMENTS = 256  # 연결당 재사용할 prepared statement 수
+
+# 학급 게시판 페이지 크기
+POSTS_PER_PAGE = 20
+POSTS_PER_PAGE_MAX = 100  # JSON API에서 limit으로 요청할 수 있는 최대값
+
+# 게시글 검색 (SQLite FTS5). 3글자 이상 검색어는 trigram 색인, 2글자는 bigram 색인(posts_bigram)을 사용
+SEARCH_TOKENIZER = "trigram"  # 한국어 부분 일치를 위해 trigram 사용
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE = 50
+SEARCH_SHORT_SCAN_LIMIT = int(os.getenv("SEARCH_SHORT_SCAN_LIMIT", "2000"))  # 1글자 검색어만 있을 때 LIKE로 훑는 최근 글 수 (학급 범위, 관리자 전체 검색은 전체 범위)
+
+# 비밀번호 해시
+# werkzeug generate_password_hash 방식 문자열 (비용 포함). 저장된 해시가 이와 다르면 로그인 시 다시 해시합니다.
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+PASSWORD_HASH_WORKERS = 2  # 동시에 계산할 해시 수 (워커 프로세스당)
+PASSWORD_HASH_QUEUE = 16  # 대기할 수 있는 해시 작업 수. 넘으면 503으로 거절
+PASSWORD_RETRY_AFTER = 2  # 거절 응답의 Retry-After (초)
+
+# 로그인 사용자 정보 캐시 (워커 프로세스별)
+USER_CACHE_TTL = 60  # 사용자 정보 캐시 유효 시간 (초)
+USER_CACHE_SIZE = 1024  # 워커당 캐시할 최대 사용자 수
+
+# 학교 규모 (학년 수, 학년당 반 수)
+GRADE_COUNT = 3
+CLASS_COUNT = 10
+
+# 학급 초대 코드
+INVITE_CODE_LIFETIME = None  # 코드 자동 교체 주기 (초, None이면 교체하지 않음)
+INVITE_REGISTRY_REFRESH = 60  # 다른 워커에서 교체한 코드를 다시 읽는 주기 (초)
+
+# 학급 잠금 해제 상태 (class_access.py, 학급마다 1비트)
+CLASS_ACCESS_STORE = os.getenv("CLASS_ACCESS_STORE", "cookie")  # 잠금 해제 비트셋 저장 위치: "cookie"(세션 쿠키) 또는 "server"(SQLite)
+CLASS_ACCESS_RETENTION = 30 * 86400  # "server" 저장소에서 갱신되지 않은 세션 행을 지우기까지의 시간 (초)
 
 # NEIS API 정보
 # 참고: API 키는 보안을 위해 환경 변수나 별도의 시크릿 관리 도구를 사용하는 것이 가장 좋습니다.
@@ -19,7 +58,58 @@ API_KEY = os.getenv("API_KEY")
 ATPT_OFCDC_SC_CODE = os.getenv('ATPT_OFCDC_SC_CODE')
 SD_SCHUL_CODE = os.getenv('SD_SCHUL_CODE')
 SEM = os.getenv("SEM","1")
+NEIS_BASE_URL = os.getenv("NEIS_BASE_URL", "https://open.neis.go.kr/hub")  # 테스트 시 로컬 스텁 서버로 교체 가능
+NEIS_PAGE_SIZE = 1000  # 페이지당 row 수 (NEIS 최대 1000)
+NEIS_TIMEOUT = 5  # 요청당 타임아웃 (초)
+NEIS_POOL_SIZE = 10  # keep-alive 연결 풀 크기
+NEIS_MAX_RETRIES = 2  # 일시적 오류 시 추가 재시도 횟수
+NEIS_BACKOFF_BASE = 0.2  # 재시도 백오프 기본 시간 (초)
+NEIS_BACKOFF_MAX = 2.0  # 재시도 백오프 최대 시간 (초)
+NEIS_BREAKER_THRESHOLD = 5  # 서킷 브레이커를 여는 연속 실패 횟수
+NEIS_BREAKER_RESET = 30  # 서킷 브레이커가 열린 뒤 시험 호출까지 대기 시간 (초)
+NEIS_ASYNC_MAX_CONNECTIONS = 100  # ASGI(asgi.py) 경로에서 NEIS로 동시에 열 수 있는 연결 수
 
 # 캐시 설정
 CACHE_LIFETIME = 3600  # 캐시 유효 시간 (초), 1시간
 CACHE_DIR = os.path.join(BASE_DIR, "cache")
+NEGATIVE_CACHE_LIFETIME = 600  # 빈 결과(데이터 없음)의 캐시 유효 시간 (초)
+CACHE_STALE_LIFETIME = 86400  # 만료 후에도 백그라운드 갱신 동안 그대로 제공하는 시간 (초)
+MEMORY_CACHE_SIZE = 512  # 메모리(LRU) 캐시에 보관할 최대 항목 수
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")  # 영구 캐시 저장소: "sqlite" 또는 "files"(키마다 JSON 파일)
+CACHE_DB_PATH = os.path.join(CACHE_DIR, "neis_cache.db")
+CACHE_MAX_ENTRIES = 20000  # 영구 캐시에 보관할 최대 항목 수 (넘으면 오래된 항목부터 제거)
+CACHE_LEASE_TIMEOUT = 20  # 한 워커가 키를 갱신하는 동안 다른 워커가 기다리는 최대 시간 (초)
+CACHE_RETENTION = 7 * 86400  # 만료 후 마지막 값으로 보관하는 시간 (초), CACHE_STALE_LIFETIME 이상이어야 함
+TIMETABLE_DB_PATH = os.path.join(CACHE_DIR, "timetable.db")  # 학급별·날짜별 시간표 저장소
+TIMETABLE_FETCH_CHUNK_DAYS = 31  # 긴 기간을 NEIS에서 가져올 때 한 번에 조회하는 일수
+
+# 정적 파일 (내용 해시가 붙은 사본과 압축본을 만들어 오래 캐시)
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+ASSET_BUILD_DIR = os.path.join(CACHE_DIR, "assets")
+ASSET_MAX_AGE = 365 * 24 * 3600  # 해시가 붙은 파일의 캐시 유효 시간 (초)
+ASSET_COMPRESS_MIN_BYTES = 512  # 이보다 작은 파일은 압축본을 만들지 않음
+
+# NEIS 캐시 미리 채우기 (prefetch.py)
+PREFETCH_DAYS = 10  # 급식을 미리 가져올 주중 일수
+PREFETCH_WORKERS = 4  # 동시에 실행할 NEIS 호출 수
+PREFETCH_INTERVAL = 3600  # prefetch.run_forever의 기본 반복 주기 (초)
+
+# 새 글 알림 (Server-Sent Events, post_events.py)
+# 연결마다 워커 스레드를 하나씩 오래 잡으므로 기본으로 꺼 두고, 스레드 워커로 실행할 때만 켭니다.
+SSE_ENABLED = os.getenv('SSE_ENABLED', 'False').lower() in ('true', '1', 't')
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "8"))  # 워커 프로세스당 요청 처리 스레드 수 (gunicorn --threads와 같게)
+SSE_QUEUE_SIZE = 32  # 연결당 쌓아둘 수 있는 이벤트 수. 넘치면 연결을 끊음 (느린 클라이언트)
+SSE_MAX_CLIENTS = int(os.getenv("SSE_MAX_CLIENTS", max(1, SERVER_THREADS // 2)))  # 워커당 최대 SSE 연결 수. 넘으면 503 (나머지 스레드는 일반 요청용)
+SSE_IDLE_TIMEOUT = 300  # 보낼 글이 없을 때 연결을 유지하는 시간 (초, 클라이언트가 다시 연결함)
+SSE_HEARTBEAT = 15  # 끊어진 연결 확인용 주석 줄을 보내는 간격 (초)
+SSE_POLL_INTERVAL = 2  # 다른 워커에서 쓴 글을 확인하는 간격 (초, 0이면 끄기)
+SSE_RETRY_MS = 5000  # 클라이언트 재연결 대기 시간 (밀리초)
+
+# 계측 / 로그
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "json"이면 한 줄짜리 JSON 로그
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # 설정하면 /metrics에 "Authorization: Bearer <토큰>" 필요. 없으면 같은 기기(loopback)의 직접 요청만 허용
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # cProfile로 프로파일할 요청 비율 (0~1)
+PROFILE_HEADER = "X-Profile"  # 이 헤더에 PROFILE_TOKEN을 담은 요청은 항상 프로파일
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
@@ -1,8 +1,13 @@
 import os
 import base64
-from typing import Optional
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
+# 기존 단일 키(APP_AES_KEY)로 만든 토큰의 kid
+DEFAULT_KID = "v1"
+
 
 def _b64e(b: bytes) -> str:
     return base64.urlsafe_b64encode(b).decode("ascii")
@@ -12,29 +17,115 @@ def _b64d(s: str) -> bytes:
     return base64.urlsafe_b64decode(s.encode("ascii"))
 
 
-def _load_aes_key() -> bytes:
-    key_b64 = os.environ.get("APP_AES_KEY", "")
-    if not key_b64:
-        raise RuntimeError("APP_AES_KEY is not set")
+def _parse_key(kid: str, key_b64: str) -> bytes:
     key = base64.urlsafe_b64decode(key_b64)
     if len(key) not in (16, 24, 32):
-        raise RuntimeError("APP_AES_KEY must decode to 16/24/32 bytes")
+        raise RuntimeError(f"AES key {kid!r} must decode to 16/24/32 bytes")
     return key
 
 
-def aesgcm_encrypt(plaintext: bytes, aad: Optional[bytes] = None, kid: str = "v1") -> str:
-    key = _load_aes_key()
-    aesgcm = AESGCM(key)
-    nonce = os.urandom(12)
-    ct = aesgcm.encrypt(nonce, plaintext, aad)
-    return f"{kid}.{_b64e(nonce)}.{_b64e(ct)}"
+def _kid_order(kid: str) -> tuple:
+    # 정렬 키: 숫자 부분은 수로 비교 ("k9" < "k10")
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(re.split(r"([0-9]+)", kid)))
+
+
+def _load_keys() -> Dict[str, bytes]:
+    # APP_AES_KEY: 기존 단일 키 (kid v1)
+    # APP_AES_KEYS: 추가 키 목록 "kid=base64키,kid2=base64키" (키 교체용)
+    keys = {}
+    key_b64 = os.environ.get("APP_AES_KEY", "")
+    if key_b64:
+        keys[DEFAULT_KID] = _parse_key(DEFAULT_KID, key_b64)
+    for item in os.environ.get("APP_AES_KEYS", "").split(","):
+        if not item.strip():
+            continue
+        kid, sep, value = item.strip().partition("=")
+        if not sep or not kid or "." in kid:
+            raise RuntimeError("APP_AES_KEYS entries must look like kid=base64key")
+        keys[kid] = _parse_key(kid, value)
+    if not keys:
+        raise RuntimeError("APP_AES_KEY is not set")
+    return keys
+
+
+class KeyRing:
+    """kid별 AES-GCM 키 모음. 키는 한 번만 해석하고 kid마다 AESGCM 객체를 재사용합니다.
+
+    암호화는 active_kid 키로 하고, 복호화는 토큰 앞의 kid에 해당하는 키로 합니다.
+    active_kid를 주지 않으면 기존 키(v1)가 있을 때 v1을, 없으면 숫자 순으로 가장 큰 kid를 씁니다.
+    """
+
+    def __init__(self, keys: Dict[str, bytes], active_kid: Optional[str] = None):
+        if not keys:
+            raise ValueError("key ring is empty")
+        self.active_kid = active_kid or (DEFAULT_KID if DEFAULT_KID in keys else max(keys, key=_kid_order))
+        if self.active_kid not in keys:
+            raise RuntimeError(f"active AES key {self.active_kid!r} is not configured")
+        self._ciphers = {kid: AESGCM(key) for kid, key in keys.items()}
+
+    @classmethod
+    def from_env(cls) -> "KeyRing":
+        return cls(_load_keys(), os.environ.get("APP_AES_ACTIVE_KID") or None)
+
+    def _cipher(self, kid: str) -> AESGCM:
+        try:
+            return self._ciphers[kid]
+        except KeyError:
+            raise ValueError(f"unknown key id {kid!r}") from None
+
+    def encrypt(self, plaintext: bytes, aad: Optional[bytes] = None, kid: Optional[str] = None) -> str:
+        kid = kid or self.active_kid
+        nonce = os.urandom(12)
+        ct = self._cipher(kid).encrypt(nonce, plaintext, aad)
+        return f"{kid}.{_b64e(nonce)}.{_b64e(ct)}"
+
+    def decrypt(self, token: str, aad: Optional[bytes] = None) -> bytes:
+        parts = token.split(".")
+        if len(parts) != 3:
+            raise ValueError("invalid token format")
+        kid, n_s, ct_s = parts
+        nonce, ct = _b64d(n_s), _b64d(ct_s)
+        return self._cipher(kid).decrypt(nonce, ct, aad)
+
+    def encrypt_many(self, plaintexts: Iterable[bytes], aad: Optional[bytes] = None) -> List[str]:
+        cipher, kid = self._cipher(self.active_kid), self.active_kid
+        tokens = []
+        for plaintext in plaintexts:
+            nonce = os.urandom(12)
+            tokens.append(f"{kid}.{_b64e(nonce)}.{_b64e(cipher.encrypt(nonce, plaintext, aad))}")
+        return tokens
+
+    def decrypt_many(self, tokens: Iterable[str], aad: Optional[bytes] = None) -> List[bytes]:
+        return [self.decrypt(token, aad) for token in tokens]
+
+    def needs_rotation(self, token: str) -> bool:
+        # 현재 암호화 키가 아닌 키로 만든 토큰인지 확인
+        return token.split(".", 1)[0] != self.active_kid
+
+
+_keyring: Optional[KeyRing] = None
+_keyring_lock = threading.Lock()
+
+
+def get_keyring() -> KeyRing:
+    global _keyring
+    if _keyring is None:
+        with _keyring_lock:
+            if _keyring is None:
+                _keyring = KeyRing.from_env()
+    return _keyring
+
+
+def reset_keyring() -> None:
+    # 환경 변수의 키 설정을 바꾼 뒤 다시 읽게 함
+    global _keyring
+    with _keyring_lock:
+        _keyring = None
+
+
+def aesgcm_encrypt(plaintext: bytes, aad: Optional[bytes] = None, kid: Optional[str] = None) -> str:
+    return get_keyring().encrypt(plaintext, aad, kid)
 
 
 def aesgcm_decrypt(token: str, aad: Optional[bytes] = None) -> bytes:
-    parts = token.split(".")
-    if len(parts) != 3:
-        raise ValueError("invalid token format")
-    _, n_s, ct_s = parts
-    nonce, ct = _b64d(n_s), _b64d(ct_s)
-    key = _load_aes_key()
-    return AESGCM(key).decrypt(nonce, ct, aad)
+    return get_keyring().decrypt(token, aad)
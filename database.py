@@ -1,26 +1,97 @@
+import os
 import sqlite3
+import threading
+import time
 from flask import g
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
 import config
+import metrics
+import search
+
+# 워커 스레드마다 하나의 연결을 열어 두고 요청 간에 재사용합니다.
+_local = threading.local()
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """execute/executemany의 실행 시간과 횟수를 metrics에 기록하는 커서입니다. (conn.cursor()로 실행하는 경우)"""
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.record_query(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            metrics.record_query(sql, time.perf_counter() - started)
+
+class InstrumentedConnection(sqlite3.Connection):
+    """execute/executemany의 실행 시간과 횟수를 metrics에 기록하는 연결입니다."""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.record_query(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            metrics.record_query(sql, time.perf_counter() - started)
+
+def connect(path=None):
+    """튜닝된 SQLite 연결을 새로 만듭니다. (WAL, busy_timeout, 캐시/mmap 크기 설정)"""
+    conn = sqlite3.connect(
+        path or config.DATABASE_PATH,
+        timeout=config.DB_BUSY_TIMEOUT / 1000,
+        cached_statements=config.DB_CACHED_STATEMENTS,
+        factory=InstrumentedConnection,
+    )
+    conn.row_factory = sqlite3.Row
+    search.register_functions(conn)  # posts_bigram 트리거용 SQL 함수
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {int(config.DB_BUSY_TIMEOUT)}")
+    conn.execute(f"PRAGMA cache_size = -{int(config.DB_CACHE_SIZE_KB)}")
+    conn.execute(f"PRAGMA mmap_size = {int(config.DB_MMAP_SIZE)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+def _thread_connection():
+    """현재 스레드의 연결을 반환합니다. fork된 자식 프로세스에서는 새로 엽니다."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "pid", None) != os.getpid():
+        conn = connect()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
 
 def get_db():
-    """Application context에 DB 연결이 없으면 생성하고, 있으면 기존 연결을 반환합니다."""
+    """Application context에 DB 연결이 없으면 스레드의 연결을 가져오고, 있으면 기존 연결을 반환합니다."""
     if "db" not in g:
-        g.db = sqlite3.connect(config.DATABASE_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
-        g.db.row_factory = sqlite3.Row
+        g.db = _thread_connection()
     return g.db
 
 def close_db(exc=None):
-    """Application context가 teardown될 때 DB 연결을 닫습니다."""
+    """Application context가 teardown될 때 연결을 닫지 않고, 끝나지 않은 트랜잭션만 되돌립니다."""
     db = g.pop("db", None)
-    if db is not None:
-        db.close()
+    if db is not None and db.in_transaction:
+        db.rollback()
 
 def init_db():
     """데이터베이스 테이블을 초기화하고 기본 관리자 계정을 생성합니다."""
-    db = sqlite3.connect(config.DATABASE_PATH)
+    db = connect()
     cur = db.cursor()
     cur.execute("""
     CREATE TABLE IF NOT EXISTS users (
@@ -54,11 +125,44 @@ def init_db():
         content TEXT NOT NULL,
         author_id INTEGER NOT NULL, -- users 테이블의 id를 참조
         created_at TEXT NOT NULL,
+        content_html TEXT, -- 소독 후 렌더링된 본문 HTML (post_render)
+        sanitizer_version TEXT, -- content_html을 만든 소독 규칙 버전
         FOREIGN KEY (author_id) REFERENCES users (id)
     )
     """)
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_posts_grade_classroom ON posts (grade, classroom)")
+    # 이전 스키마의 posts 테이블에 렌더링 결과 열 추가 (기존 글은 flask render-posts로 채움)
+    post_columns = {row[1] for row in cur.execute("PRAGMA table_info(posts)")}
+    for column in ("content_html", "sanitizer_version"):
+        if column not in post_columns:
+            cur.execute(f"ALTER TABLE posts ADD COLUMN {column} TEXT")
+    # 학급별 초대 코드 세대와 만료 시각 (invite_codes.InviteRegistry)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS invite_codes (
+        grade TEXT NOT NULL,
+        classroom TEXT NOT NULL,
+        generation INTEGER NOT NULL DEFAULT 0, -- 코드를 교체할 때마다 1 증가
+        expires_at REAL, -- 만료 시각 (NULL이면 만료 없음)
+        PRIMARY KEY (grade, classroom)
+    ) WITHOUT ROWID
+    """)
+    # 세션별 학급 잠금 해제 비트셋 (CLASS_ACCESS_STORE = "server"일 때, class_access)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS class_access (
+        session_id TEXT PRIMARY KEY,
+        bits INTEGER NOT NULL, -- 학급마다 1비트
+        updated_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """)
+    # 학급 게시판 목록(최신순 keyset 페이지네이션)용 커버링 인덱스.
+    # 이전의 (grade, classroom) 인덱스는 이 인덱스의 접두사이므로 제거합니다.
+    cur.execute("DROP INDEX IF EXISTS idx_posts_grade_classroom")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_board "
+        "ON posts (grade, classroom, created_at DESC, id DESC, author_id, title)"
+    )
     cur.execute("CREATE INDEX IF NOT EXISTS idx_posts_author_id ON posts (author_id)")
+    # 게시글 전문 검색 색인 (posts와 트리거로 동기화)
+    search.create_fts(cur)
     # 기본 관리자 계정 (admin/1234)이 없으면 생성
     cur.execute("SELECT id FROM users WHERE userid = ?", ("admin",))
     if not cur.fetchone():
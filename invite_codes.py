@@ -0,0 +1,115 @@
+import hashlib
+import threading
+import time
+
+import class_access
+import config
+import database
+
+
+def derive_code(grade, classroom, generation=0):
+    """학년, 반, 세대와 비밀키를 조합하여 6자리 초대 코드를 만듭니다.
+
+    0세대 코드는 이전 generate_invite_code와 같으므로 이미 나눠준 코드가 그대로 유효합니다.
+    """
+    # SECRET_KEY가 None일 경우를 대비하여 기본값 제공
+    secret = config.SECRET_KEY or "default-secret-for-testing"
+    data = f"{secret}-{grade}-{classroom}"
+    if generation:
+        data += f"-{generation}"
+    return hashlib.sha256(data.encode()).hexdigest()[:6].upper()
+
+
+class InviteRegistry:
+    """초대 코드 -> 학급 색인입니다. 모든 학급의 코드를 한 번 계산해 두고 O(1)로 찾습니다.
+
+    다른 워커나 CLI에서 코드를 교체해도 INVITE_REGISTRY_REFRESH 초 안에 반영되며,
+    만료된 코드는 다시 읽을 때 다음 세대로 교체합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_code = {}
+        self._by_class = {}
+        self._loaded_at = 0.0
+
+    def load(self):
+        """DB의 세대 정보로 모든 학급의 코드를 다시 계산합니다. 만료된 코드는 먼저 교체합니다."""
+        now = time.time()
+        lifetime = config.INVITE_CODE_LIFETIME
+        db = database.connect()
+        try:
+            with db:
+                db.executemany(
+                    "INSERT OR IGNORE INTO invite_codes (grade, classroom, generation, expires_at) VALUES (?, ?, 0, ?)",
+                    [(grade, classroom, now + lifetime if lifetime else None) for grade, classroom in class_access.all_classes()]
+                )
+                # 세대 조건을 걸어 여러 워커가 동시에 교체해도 한 번만 증가
+                db.execute(
+                    "UPDATE invite_codes SET generation = generation + 1, expires_at = ? "
+                    "WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                    (now + lifetime if lifetime else None, now)
+                )
+            rows = db.execute("SELECT grade, classroom, generation, expires_at FROM invite_codes").fetchall()
+        finally:
+            db.close()
+
+        classes = set(class_access.all_classes())
+        by_code, by_class = {}, {}
+        for grade, classroom, generation, expires_at in rows:
+            if (grade, classroom) not in classes:
+                continue  # 학교 규모 설정에서 빠진 학급
+            code = derive_code(grade, classroom, generation)
+            by_code[code] = (grade, classroom)
+            by_class[(grade, classroom)] = (code, expires_at)
+        with self._lock:
+            self._by_code, self._by_class = by_code, by_class
+            self._loaded_at = now
+
+    def _ensure_loaded(self):
+        if time.time() - self._loaded_at >= config.INVITE_REGISTRY_REFRESH:
+            self.load()
+
+    def lookup(self, code):
+        """초대 코드에 해당하는 (학년, 반) 문자열 튜플을 반환합니다. 없거나 만료되었으면 None."""
+        self._ensure_loaded()
+        found = self._by_code.get(code)
+        if found is None:
+            return None
+        expires_at = self._by_class[found][1]
+        if expires_at is not None and expires_at <= time.time():
+            self.load()  # 만료된 코드를 교체
+            return None
+        return found
+
+    def code_for(self, grade, classroom):
+        """학급의 현재 초대 코드를 반환합니다."""
+        self._ensure_loaded()
+        entry = self._by_class.get((str(grade), str(classroom)))
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            self.load()
+            entry = self._by_class.get((str(grade), str(classroom)))
+        return entry[0] if entry is not None else None
+
+    def rotate(self, grade, classroom, lifetime=None):
+        """학급의 초대 코드를 다음 세대로 교체하고 새 코드를 반환합니다.
+
+        lifetime(초)을 주면 그 시간이 지난 뒤 자동으로 다시 교체되며, 주지 않으면 INVITE_CODE_LIFETIME을 따릅니다.
+        """
+        lifetime = lifetime or config.INVITE_CODE_LIFETIME
+        db = database.connect()
+        try:
+            with db:
+                db.execute(
+                    "INSERT INTO invite_codes (grade, classroom, generation, expires_at) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (grade, classroom) DO UPDATE SET generation = generation + 1, expires_at = excluded.expires_at",
+                    (str(grade), str(classroom), time.time() + lifetime if lifetime else None)
+                )
+        finally:
+            db.close()
+        self.load()
+        return self.code_for(grade, classroom)
+
+
+# 워커 프로세스마다 하나씩 사용하는 색인
+registry = InviteRegistry()
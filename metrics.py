@@ -0,0 +1,276 @@
+"""요청·SQL·NEIS 계측과 Prometheus 형식 /metrics, 구조화(JSON) 로그, 선택적 요청 프로파일링.
+
+지표는 워커 프로세스마다 따로 모이므로, 여러 워커로 실행하면 워커별로 수집해 합산합니다.
+"""
+import cProfile
+import hmac
+import io
+import ipaddress
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+import config
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """레이블별로 증가만 하는 카운터입니다."""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """레이블별 관측값 분포(누적 버킷, 합계, 개수)를 기록합니다."""
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}  # {레이블 값: [버킷별 개수..., 합계, 개수]}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', '+Inf')])} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {state[-1]}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Flask 요청 처리 시간", ("endpoint", "method", "status")
+)
+SQL_DURATION = Histogram(
+    "sql_query_duration_seconds", "SQLite 쿼리 실행 시간 (execute 단계)", ("statement",)
+)
+NEIS_DURATION = Histogram(
+    "neis_request_duration_seconds", "NEIS HTTP 호출 시간 (재시도 각각)", ("service",)
+)
+NEIS_REQUESTS = Counter(
+    "neis_requests_total", "NEIS HTTP 호출 결과 (ok, http_error, timeout, connection_error, invalid, circuit_open)",
+    ("service", "outcome")
+)
+
+_metrics = [REQUEST_DURATION, SQL_DURATION, NEIS_DURATION, NEIS_REQUESTS]
+# 수집 시점에 줄 목록을 만드는 함수 (예: 캐시 통계)
+_collectors = []
+
+
+def register_collector(fn):
+    """/metrics를 만들 때 호출되어 Prometheus 형식 줄 목록을 반환하는 함수를 등록합니다."""
+    _collectors.append(fn)
+    return fn
+
+
+def render():
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        try:
+            lines.extend(collector())
+        except Exception as e:
+            log.warning("지표 수집 오류 (%s): %s", getattr(collector, "__name__", collector), e)
+    return "\n".join(lines) + "\n"
+
+
+# --- 요청별 SQL 집계 ---
+# 요청을 처리하는 스레드에서만 켜지며, 요청 로그에 쿼리 수와 시간을 남깁니다.
+_request_stats = threading.local()
+
+
+def _statement_kind(sql):
+    word = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA") else "OTHER"
+
+
+def record_query(sql, elapsed):
+    """SQL 한 번의 실행 시간을 기록합니다. (database의 계측 연결에서 호출)"""
+    SQL_DURATION.observe(elapsed, statement=_statement_kind(sql))
+    stats = getattr(_request_stats, "current", None)
+    if stats is not None:
+        stats["sql_queries"] += 1
+        stats["sql_seconds"] += elapsed
+
+
+# --- 구조화 로그 ---
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON으로 만듭니다. extra={"fields": {...}}의 값도 포함합니다."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging():
+    """LOG_FORMAT(json|text)과 LOG_LEVEL에 맞게 루트 로거를 설정합니다."""
+    handler = logging.StreamHandler()
+    if config.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(config.LOG_LEVEL)
+
+
+# --- 요청 프로파일링 ---
+def _should_profile():
+    """PROFILE_HEADER에 PROFILE_TOKEN을 담아 보낸 요청이거나, PROFILE_SAMPLE_RATE 확률에 걸린 요청인지 확인합니다."""
+    if config.PROFILE_TOKEN and request.headers.get(config.PROFILE_HEADER) == config.PROFILE_TOKEN:
+        return True
+    return config.PROFILE_SAMPLE_RATE > 0 and random.random() < config.PROFILE_SAMPLE_RATE
+
+
+def _finish_profile(profiler, endpoint):
+    """프로파일 결과를 PROFILE_DIR에 .prof로 저장하고 누적 시간 상위 함수를 로그로 남깁니다."""
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(config.PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{endpoint}.prof")
+    profiler.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+    log.info("요청 프로파일 저장: %s\n%s", path, summary.getvalue())
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    _request_stats.current = {"sql_queries": 0, "sql_seconds": 0.0}
+    g.profiler = None
+    if _should_profile():
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # 다른 프로파일러가 이미 동작 중
+            return
+        g.profiler = profiler
+
+
+def _after_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or "unmatched"
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _finish_profile(profiler, endpoint)
+
+    stats = getattr(_request_stats, "current", None) or {"sql_queries": 0, "sql_seconds": 0.0}
+    _request_stats.current = None
+    if endpoint != "metrics":
+        REQUEST_DURATION.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    log.info(
+        "%s %s %s %.1fms", request.method, request.path, response.status_code, elapsed * 1000,
+        extra={"fields": {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": endpoint,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "sql_queries": stats["sql_queries"],
+            "sql_ms": round(stats["sql_seconds"] * 1000, 2),
+        }}
+    )
+    return response
+
+
+def _is_loopback_request():
+    """같은 기기에서 직접 온 요청인지 확인합니다. 프록시를 거친 요청(X-Forwarded-For)은 제외합니다."""
+    if request.headers.get("X-Forwarded-For") or request.headers.get("Forwarded"):
+        return False
+    try:
+        return ipaddress.ip_address(request.remote_addr or "").is_loopback
+    except ValueError:
+        return False
+
+
+def _metrics_allowed():
+    """METRICS_TOKEN이 있으면 Bearer 토큰이 맞아야 하고, 없으면 loopback 요청만 허용합니다."""
+    if config.METRICS_TOKEN:
+        expected = f"Bearer {config.METRICS_TOKEN}"
+        return hmac.compare_digest(request.headers.get("Authorization", ""), expected)
+    return _is_loopback_request()
+
+
+def _metrics_view():
+    if not _metrics_allowed():
+        return Response("forbidden\n", status=403, mimetype="text/plain")
+    return Response(render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """요청 계측 훅과 /metrics 경로를 등록하고 로그를 설정합니다."""
+    setup_logging()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule("/metrics", "metrics", _metrics_view)
@@ -1,141 +1,811 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import time
 import os
-import json
+import logging
+import random
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
 from functools import wraps
 from datetime import datetime, timedelta
 
+import cache
 import config
+import metrics
+import timetable_store
 
-# --- 파일 기반 캐시 데코레이터 ---
-def file_cache(lifetime):
-    """지정된 시간(초) 동안 결과를 파일에 캐시하는 데코레이터입니다."""
+log = logging.getLogger(__name__)
+
+# --- 2단계 캐시 (메모리 LRU -> 영구 저장소) ---
+def _create_backend():
+    """config.CACHE_BACKEND에 따라 영구 캐시 저장소를 만듭니다."""
+    if config.CACHE_BACKEND == "sqlite":
+        return cache.SQLiteBackend(config.CACHE_DB_PATH, config.CACHE_MAX_ENTRIES, config.CACHE_RETENTION)
+    if config.CACHE_BACKEND == "files":
+        return cache.JsonDirBackend(config.CACHE_DIR)
+    raise ValueError(f"알 수 없는 CACHE_BACKEND: {config.CACHE_BACKEND}")
+
+_memory_cache = cache.MemoryCache(maxsize=config.MEMORY_CACHE_SIZE)
+_backend = _create_backend()
+_single_flight = cache.SingleFlight()
+_stats = cache.CacheStats()
+
+def cache_stats():
+    """캐시 적중/미스/병합 횟수와 메모리 캐시 크기를 반환합니다."""
+    stats = _stats.snapshot()
+    stats["memory_entries"] = len(_memory_cache)
+    stats["memory_maxsize"] = _memory_cache.maxsize
+    return stats
+
+@metrics.register_collector
+def _cache_metrics():
+    """캐시 통계를 /metrics용 Prometheus 형식 줄로 만듭니다."""
+    stats = cache_stats()
+    lines = ["# HELP neis_cache_events_total NEIS 캐시 조회 결과별 횟수", "# TYPE neis_cache_events_total counter"]
+    lines += [f'neis_cache_events_total{{event="{name}"}} {stats[name]}' for name in cache.CacheStats.FIELDS]
+    lines += [
+        "# HELP neis_cache_hit_ratio NEIS 캐시 적중률 (stale 응답 포함)", "# TYPE neis_cache_hit_ratio gauge",
+        f"neis_cache_hit_ratio {stats['hit_ratio']}",
+        "# HELP neis_memory_cache_entries 메모리 캐시 항목 수", "# TYPE neis_memory_cache_entries gauge",
+        f"neis_memory_cache_entries {stats['memory_entries']}",
+    ]
+    return lines
+
+class NeisError(Exception):
+    """NEIS API 호출 또는 응답 처리에 실패했을 때 발생합니다. (데이터 없음은 오류가 아님)"""
+
+
+def make_cache_key(name, args, kwargs=None):
+    """함수명과 인자로 캐시 키를 만듭니다. kwargs는 정렬하여 순서에 상관없이 같은 키를 갖도록 합니다."""
+    key_parts = [name] + list(map(str, args)) + [f"{k}={v}" for k, v in sorted((kwargs or {}).items())]
+    return "|".join(key_parts)
+
+def _load_entry(cache_key):
+    """저장소에서 항목을 읽어 반환합니다. 저장소 오류는 캐시 미스로 처리합니다."""
+    try:
+        return _backend.get(cache_key)
+    except (sqlite3.Error, ValueError) as e:
+        log.warning("캐시 읽기 오류 (%s): %s", cache_key, e)
+        return None
+
+def _remember(cache_key, entry):
+    # 메모리에는 stale 구간까지 보관하여 만료 직후에도 즉시 응답할 수 있게 함
+    _memory_cache.set(cache_key, entry, entry['timestamp'] + entry['ttl'] + config.CACHE_STALE_LIFETIME)
+
+def _store_entry(cache_key, data, ttl):
+    """결과를 메모리와 저장소에 저장하고 저장된 항목을 반환합니다."""
+    entry = {'timestamp': time.time(), 'ttl': ttl, 'data': data}
+    _remember(cache_key, entry)
+    try:
+        _backend.set(cache_key, entry)
+    except sqlite3.Error as e:
+        log.warning("캐시 쓰기 오류 (%s): %s", cache_key, e)
+    return entry
+
+# 이전 file_cache의 날짜별 급식 파일 이름 (get_meal_YYYYMMDD)
+_LEGACY_MEAL_FILE = re.compile(r"get_meal_(\d{8})")
+
+def migrate_legacy_cache(directory=None, delete=False):
+    """이전 file_cache가 CACHE_DIR에 남긴 날짜별 급식 파일을 달별 급식 색인(get_meal_month) 항목으로 합쳐 옮깁니다.
+
+    이전 파일에는 급식이 있던 날짜만 있으므로 바로 만료된 항목(ttl 0)으로 저장합니다. 첫 조회 때 달 전체를
+    다시 가져오는 동안 stale 값으로 쓰이고, NEIS 호출이 실패하면 마지막 값으로 쓰입니다.
+    저장소에 이미 있는 달과 급식이 아닌 파일(시간표는 날짜별 저장소가 다시 채움)은 건너뜁니다.
+    (옮긴 파일 수, 건너뛴 파일 수)를 반환합니다.
+    """
+    months = {}  # {YYYYMM: {"timestamp": 가장 최근 저장 시각, "days": {날짜: 급식 목록}, "paths": [파일 경로]}}
+    skipped = 0
+    for path, stem, entry in cache.read_json_dir(directory or config.CACHE_DIR):
+        match = _LEGACY_MEAL_FILE.fullmatch(stem)
+        if match is None or entry is None or not isinstance(entry['data'], list):
+            skipped += 1
+            continue
+        date = match.group(1)
+        month = months.setdefault(date[:6], {"timestamp": 0, "days": {}, "paths": []})
+        if entry['data']:
+            month["days"][date] = entry['data']
+        month["timestamp"] = max(month["timestamp"], entry['timestamp'])
+        month["paths"].append(path)
+
+    migrated = 0
+    for month, legacy in sorted(months.items()):
+        cache_key = make_cache_key("get_meal_month", (month,))
+        if _load_entry(cache_key) is not None:
+            skipped += len(legacy["paths"])
+            continue
+        _backend.set(cache_key, {'timestamp': legacy["timestamp"], 'ttl': 0, 'data': legacy["days"]})
+        migrated += len(legacy["paths"])
+        if delete:
+            for path in legacy["paths"]:
+                os.remove(path)
+    return migrated, skipped
+
+# --- 캐시 조회 규칙 (file_cache와 neis_async가 함께 사용) ---
+# 저장소를 읽고 쓰는 함수는 블로킹이므로 비동기 경로에서는 스레드에서 호출합니다.
+
+def try_lease(key, owner):
+    """여러 워커 프로세스 중 하나만 key를 갱신하도록 저장소의 lease를 한 번 시도합니다. 저장소 오류는 실패로 봅니다."""
+    try:
+        return _backend.acquire_lease(key, owner, config.CACHE_LEASE_TIMEOUT)
+    except sqlite3.Error as e:
+        log.warning("캐시 lease 오류 (%s): %s", key, e)
+        return False
+
+def release_lease(key, owner):
+    try:
+        _backend.release_lease(key, owner)
+    except sqlite3.Error as e:
+        log.warning("캐시 lease 해제 오류 (%s): %s", key, e)
+
+# lease를 기다릴 때 다시 시도하는 간격 (초)
+LEASE_POLL_INTERVAL = 0.05
+
+@contextmanager
+def lease(key, wait=True):
+    """key의 lease를 잡습니다.
+
+    wait이면 다른 워커가 끝낼 때까지 CACHE_LEASE_TIMEOUT 동안 기다립니다. 획득 여부를 돌려주며,
+    기다려도 얻지 못하면 False입니다. (그래도 호출자는 직접 갱신을 진행할 수 있습니다)
+    """
+    owner = uuid.uuid4().hex
+    deadline = time.monotonic() + config.CACHE_LEASE_TIMEOUT
+    acquired = try_lease(key, owner)
+    while not acquired and wait and time.monotonic() < deadline:
+        time.sleep(LEASE_POLL_INTERVAL)
+        acquired = try_lease(key, owner)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            release_lease(key, owner)
+
+def is_fresh(entry):
+    return entry is not None and time.time() - entry['timestamp'] < entry['ttl']
+
+def entry_state(entry):
+    """항목 상태: "fresh"(유효), "stale"(만료되었지만 CACHE_STALE_LIFETIME 안이라 갱신하는 동안 제공), 그 밖에는 None."""
+    if entry is None:
+        return None
+    age = time.time() - entry['timestamp']
+    if age < entry['ttl']:
+        return "fresh"
+    if age < entry['ttl'] + config.CACHE_STALE_LIFETIME:
+        return "stale"
+    return None
+
+def memory_entry(cache_key):
+    """메모리 캐시의 항목 (없으면 None). 저장소는 읽지 않습니다."""
+    hit, entry = _memory_cache.get(cache_key)
+    return entry if hit else None
+
+def stored_entry(cache_key):
+    """저장소의 항목을 읽어 메모리에도 넣고 반환합니다. (없으면 None)"""
+    entry = _load_entry(cache_key)
+    if entry is not None:
+        _remember(cache_key, entry)
+    return entry
+
+def fresh_stored_entry(cache_key):
+    """lease를 기다리는 동안 다른 워커가 저장했을 수 있으므로 저장소를 다시 확인합니다. 유효한 항목만 반환합니다."""
+    entry = _load_entry(cache_key)
+    if not is_fresh(entry):
+        return None
+    _remember(cache_key, entry)
+    return entry
+
+def store_result(cache_key, result, lifetime, negative_lifetime):
+    """조회 결과를 저장합니다. 빈 결과(데이터 없음)는 더 짧은 유효 시간으로 캐시합니다."""
+    _store_entry(cache_key, result, lifetime if result else negative_lifetime)
+
+def last_value(entry):
+    return entry['data'] if entry is not None else []
+
+def fallback_value(cache_key, last_good, error):
+    """NEIS 호출이 실패했을 때 돌려줄 마지막 캐시 값 (없으면 빈 목록)."""
+    log.warning("NEIS 호출 실패, 마지막 캐시 값 사용 (%s): %s", cache_key, error)
+    if last_good is not None:
+        _stats.incr("fallbacks")
+    return last_value(last_good)
+
+def record_cache_event(name):
+    """캐시 통계(cache.CacheStats.FIELDS 중 하나)를 1 올립니다."""
+    _stats.incr(name)
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _refresh_in_background(cache_key, load):
+    """키마다 하나의 백그라운드 갱신만 실행합니다."""
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+
+    def run():
+        try:
+            _single_flight.do(cache_key, load)
+        except Exception as e:
+            log.warning("백그라운드 캐시 갱신 오류 (%s): %s", cache_key, e)
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+def file_cache(lifetime, negative_lifetime=config.NEGATIVE_CACHE_LIFETIME):
+    """지정된 시간(초) 동안 결과를 메모리와 영구 저장소에 캐시하는 데코레이터입니다.
+
+    메모리(LRU)에서 먼저 찾고, 없으면 저장소(config.CACHE_BACKEND)를 확인합니다. 둘 다 없으면 같은 키에 대한
+    동시 요청 중 하나만 실제 함수를 호출하고 나머지는 그 결과를 공유합니다.
+    만료된 항목은 CACHE_STALE_LIFETIME 동안 즉시 반환하면서 백그라운드에서 갱신하고,
+    빈 결과는 negative_lifetime 동안만 캐시합니다. 함수가 NeisError를 던지면
+    마지막으로 성공한 값을 반환합니다.
+
+    wrapper.refresh는 캐시를 건너뛰고 새로 가져오며, wrapper.refresh_stale은 유효한 항목이 없을 때만
+    가져오고 다른 워커가 갱신 중이면 건너뜁니다. (미리 채우기 작업용, 둘 다 NeisError를 그대로 던짐)
+    """
     def decorator(func):
+        def cached_call(args, kwargs, refresh=None):
+            cache_key = make_cache_key(func.__name__, args, kwargs)
+
+            # 1단계: 메모리 캐시, 2단계: 영구 저장소
+            tier = "memory_hits"
+            entry = memory_entry(cache_key)
+            if entry is None:
+                tier = "store_hits"
+                entry = stored_entry(cache_key)
+
+            def load(force=False, wait=True, raise_errors=False):
+                # 앞선 호출이 방금 갱신했을 수 있으므로 메모리 캐시를 다시 확인
+                current = memory_entry(cache_key)
+                if not force and is_fresh(current):
+                    return current['data']
+                last_good = current or entry
+
+                with lease(cache_key, wait=wait) as acquired:
+                    if not acquired and not wait:
+                        # 다른 워커가 갱신 중이므로 이번 백그라운드 갱신은 건너뜀
+                        return last_value(last_good)
+                    if not force:
+                        stored = fresh_stored_entry(cache_key)
+                        if stored is not None:
+                            return stored['data']
+
+                    try:
+                        result = func(*args, **kwargs)
+                    except NeisError as e:
+                        if raise_errors:
+                            raise
+                        return fallback_value(cache_key, last_good, e)
+
+                    store_result(cache_key, result, lifetime, negative_lifetime)
+                    return result
+
+            if refresh == "force":
+                # 캐시 상태와 관계없이 NEIS에서 다시 가져와 저장
+                result, _ = _single_flight.do(cache_key, lambda: load(force=True, raise_errors=True))
+                return result
+            if refresh == "stale":
+                # 유효한 항목이 없을 때만 가져오고, lease가 잡혀 있으면 건너뜀
+                result, _ = _single_flight.do(cache_key, lambda: load(wait=False, raise_errors=True))
+                return result
+
+            state = entry_state(entry)
+            if state == "fresh":
+                _stats.incr(tier)
+                return entry['data']
+            if state == "stale":
+                # stale-while-revalidate: 만료된 값을 즉시 반환하고 백그라운드에서 갱신
+                _stats.incr("stale_hits")
+                _refresh_in_background(cache_key, lambda: load(wait=False))
+                return entry['data']
+
+            result, shared = _single_flight.do(cache_key, load)
+            _stats.incr("coalesced" if shared else "misses")
+            return result
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # 캐시 키 생성 (함수명 + 인자)
-            # args와 kwargs를 정렬하여 순서에 상관없이 동일한 키를 갖도록 함
-            sorted_kwargs = sorted(kwargs.items())
-            key_parts = [func.__name__] + list(map(str, args)) + [f"{k}={v}" for k, v in sorted_kwargs]
-            cache_key = "_".join(key_parts)
-            cache_filename = os.path.join(config.CACHE_DIR, f"{cache_key}.json")
-
-            # 캐시 파일 확인
-            if os.path.exists(cache_filename):
-                try:
-                    with open(cache_filename, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-                        # 캐시 유효 시간 확인
-                        if time.time() - cache_data['timestamp'] < lifetime:
-                            return cache_data['data']
-                except (IOError, json.JSONDecodeError) as e:
-                    print(f"캐시 파일 읽기 오류: {e}")
-
-            # 캐시가 없거나 만료된 경우, 실제 함수 호출
-            result = func(*args, **kwargs)
-
-            # 성공적인 결과만 파일에 저장 (빈 리스트는 실패로 간주하고 캐시하지 않음)
-            if result:
-                try:
-                    with open(cache_filename, 'w', encoding='utf-8') as f:
-                        cache_content = {'timestamp': time.time(), 'data': result}
-                        json.dump(cache_content, f, ensure_ascii=False, indent=2)
-                except IOError as e:
-                    print(f"캐시 파일 쓰기 오류: {e}")
+            return cached_call(args, kwargs)
 
-            return result
+        def refresh(*args, **kwargs):
+            """캐시를 건너뛰고 NEIS에서 새로 가져와 캐시에 저장합니다."""
+            return cached_call(args, kwargs, refresh="force")
+
+        def refresh_stale(*args, **kwargs):
+            """유효한 캐시 항목이 없을 때만 NEIS에서 가져와 저장합니다. 다른 워커가 갱신 중이면 건너뜁니다."""
+            return cached_call(args, kwargs, refresh="stale")
+
+        wrapper.refresh = refresh
+        wrapper.refresh_stale = refresh_stale
+        # 같은 캐시 항목을 쓰는 비동기 버전(neis_async)이 참고하는 캐시 설정
+        wrapper.cache_name = func.__name__
+        wrapper.lifetime = lifetime
+        wrapper.negative_lifetime = negative_lifetime
         return wrapper
     return decorator
 
 
+# --- NEIS HTTP 클라이언트 (연결 풀 + 재시도 + 서킷 브레이커) ---
+class CircuitOpenError(NeisError):
+    """서킷 브레이커가 열려 있어 NEIS 호출을 건너뛸 때 발생합니다."""
+
+
+class CircuitBreaker:
+    """연속 실패가 임계값을 넘으면 일정 시간 동안 호출을 차단합니다.
+
+    차단 시간이 지나면 하나의 시험 호출(half-open)만 허용하고, 그 결과에 따라
+    다시 닫히거나(성공) 열립니다(실패).
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+def _build_session():
+    """keep-alive 연결을 재사용하는 공유 세션을 만듭니다. 재시도는 _request_json에서 직접 처리합니다."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.NEIS_POOL_SIZE, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_session = _build_session()
+_breaker = CircuitBreaker(config.NEIS_BREAKER_THRESHOLD, config.NEIS_BREAKER_RESET)
+
+# 일시적인 오류로 보고 재시도하는 HTTP 상태 코드
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+def _backoff_delay(attempt):
+    """지수 백오프에 full jitter를 적용한 대기 시간(초)을 반환합니다."""
+    return random.uniform(0, min(config.NEIS_BACKOFF_MAX, config.NEIS_BACKOFF_BASE * (2 ** attempt)))
+
+def request_target(service, params):
+    """서비스 호출 주소와 공통 인자(KEY, 학교 코드 등)를 합친 쿼리를 반환합니다."""
+    url = f"{config.NEIS_BASE_URL}/{service}"
+    query = {
+        "KEY": config.API_KEY,
+        "Type": "json",
+        "ATPT_OFCDC_SC_CODE": config.ATPT_OFCDC_SC_CODE,
+        "SD_SCHUL_CODE": config.SD_SCHUL_CODE,
+    }
+    query.update(params)
+    return url, query
+
+
+class RequestAttempts:
+    """NEIS 호출 한 번의 재시도·백오프·서킷 브레이커·계측 규칙입니다.
+
+    HTTP 클라이언트(동기 requests, 비동기 httpx)는 응답을 분류만 하고 규칙은 여기서 정합니다.
+
+        attempts = RequestAttempts(service)    # 서킷이 열려 있으면 CircuitOpenError
+        for delay in attempts:                 # 시도마다 delay초 기다린 뒤 begin()
+            ...일시적 오류면 attempts.retry(...), 영구 오류면 raise attempts.fail(...)
+            ...성공하면 attempts.succeed() 후 반환
+        raise attempts.exhausted()
+    """
+
+    def __init__(self, service):
+        if not _breaker.allow():
+            metrics.NEIS_REQUESTS.inc(service=service, outcome="circuit_open")
+            raise CircuitOpenError(f"NEIS 서킷 브레이커 열림 ({service})")
+        self.service = service
+        self.last_error = None
+        self._started = None
+
+    def __iter__(self):
+        for attempt in range(config.NEIS_MAX_RETRIES + 1):
+            yield _backoff_delay(attempt) if attempt else 0
+
+    def begin(self):
+        self._started = time.perf_counter()
+
+    def _record(self, outcome):
+        metrics.NEIS_DURATION.observe(time.perf_counter() - self._started, service=self.service)
+        metrics.NEIS_REQUESTS.inc(service=self.service, outcome=outcome)
+
+    def succeed(self):
+        self._record("ok")
+        _breaker.record_success()
+
+    def retry(self, outcome, error):
+        """일시적인 오류(타임아웃, 연결 오류, RETRY_STATUS)를 기록합니다. 다음 시도로 넘어갑니다."""
+        self._record(outcome)
+        self.last_error = error
+
+    def fail(self, outcome, error):
+        """4xx 응답이나 JSON이 아닌 응답은 재시도해도 같은 결과이므로 바로 실패로 기록하고 던질 오류를 반환합니다."""
+        self._record(outcome)
+        _breaker.record_failure()
+        return NeisError(f"API 요청 오류 ({self.service}): {error}")
+
+    def exhausted(self):
+        _breaker.record_failure()
+        return NeisError(f"API 요청 오류 ({self.service}, {config.NEIS_MAX_RETRIES + 1}회 시도): {self.last_error}")
+
+
+def _request_json(service, params):
+    """NEIS 서비스를 호출하여 JSON을 반환합니다. 실패하면 NeisError를 던집니다."""
+    url, query = request_target(service, params)
+    attempts = RequestAttempts(service)
+    for delay in attempts:
+        if delay:
+            time.sleep(delay)
+        attempts.begin()
+        try:
+            response = _session.get(url, params=query, timeout=config.NEIS_TIMEOUT)
+            if response.status_code in RETRY_STATUS:
+                attempts.retry("http_error", f"HTTP {response.status_code}")
+                continue
+            response.raise_for_status()  # 200 OK가 아니면 예외 발생
+            data = response.json()
+        except requests.exceptions.Timeout as e:
+            attempts.retry("timeout", e)
+            continue
+        except requests.exceptions.ConnectionError as e:
+            attempts.retry("connection_error", e)
+            continue
+        except (requests.exceptions.RequestException, ValueError) as e:
+            outcome = "http_error" if isinstance(e, requests.exceptions.HTTPError) else "invalid"
+            raise attempts.fail(outcome, e) from e
+        attempts.succeed()
+        return data
+    raise attempts.exhausted()
+
+
+def parse_page(service, data):
+    """한 페이지 응답에서 (전체 row 수, 이 페이지의 row 목록)을 꺼냅니다. 데이터가 없으면(INFO-200) None입니다."""
+    # API 에러 처리
+    if 'RESULT' in data:
+        error_code = data['RESULT']['CODE']
+        # 데이터가 없는 경우(INFO-200)는 정상 처리
+        if error_code == 'INFO-200':
+            return None
+        raise NeisError(f"NEIS API 오류 ({service}): {data['RESULT']['MESSAGE']}")
+
+    try:
+        return data[service][0]['head'][0]['list_total_count'], data[service][1].get('row', [])
+    except (KeyError, IndexError, TypeError) as e:
+        raise NeisError(f"API 응답 처리 오류 ({service}): {e}") from e
+
+
+def page_params(params, page):
+    """pIndex/pSize를 붙인 page번째 페이지의 조회 인자."""
+    return dict(params, pIndex=page, pSize=config.NEIS_PAGE_SIZE)
+
+
+def _iter_rows(service, params):
+    """pIndex/pSize로 모든 페이지를 순회하며 row를 하나씩 돌려줍니다.
+
+    한 번에 한 페이지만 메모리에 두므로 긴 기간을 조회해도 메모리 사용량이 일정합니다.
+    데이터가 없으면(INFO-200) 아무것도 돌려주지 않습니다.
+    """
+    seen = 0
+    page = 1
+    while True:
+        data = _request_json(service, page_params(params, page))
+        parsed = parse_page(service, data)
+        del data
+        if parsed is None:
+            return
+        total, page_rows = parsed
+
+        yield from page_rows
+        seen += len(page_rows)
+        if not page_rows or seen >= total:
+            return
+        page += 1
+
+
+def timetable_window(date_str):
+    """/api/data가 요청 날짜에 대해 조회하는 시간표 기간 (시작일, 종료일)을 반환합니다."""
+    base_date = datetime.strptime(date_str, "%Y%m%d")
+    # NEIS API가 주의 시작일(월요일 등)부터 조회하면 데이터를 못가져오는 경우가 있어, 
+    # 요청 날짜로부터 4일 이전부터 조회하여 API 제약을 우회합니다.
+    start_date = (base_date - timedelta(days=4)).strftime("%Y%m%d")
+    end_date = (base_date + timedelta(days=13)).strftime("%Y%m%d")
+    return start_date, end_date
+
+
+def meal_window(date_str, span):
+    """급식 주간(월~일) 또는 월간 조회 기간 (시작일, 종료일)을 반환합니다. span은 "week" 또는 "month"."""
+    base_date = datetime.strptime(date_str, "%Y%m%d")
+    if span == "week":
+        start = base_date - timedelta(days=base_date.weekday())
+        end = start + timedelta(days=6)
+    elif span == "month":
+        start = base_date.replace(day=1)
+        end = (start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    else:
+        raise ValueError(f"알 수 없는 기간: {span}")
+    return start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
+
+
+def months_in_range(start_date, end_date):
+    """기간에 걸친 달(YYYYMM) 목록을 순서대로 반환합니다."""
+    return sorted({date[:6] for date in timetable_store.date_range(start_date, end_date)})
+
+
 # --- NEIS API 연동 함수 ---
 
 @file_cache(lifetime=config.CACHE_LIFETIME)
-def get_meal(date):
-    """지정된 날짜의 급식 정보를 NEIS API에서 가져옵니다."""
-    url = (
-        f"https://open.neis.go.kr/hub/mealServiceDietInfo"
-        f"?KEY={config.API_KEY}&Type=json&pIndex=1&pSize=100"
-        f"&ATPT_OFCDC_SC_CODE={config.ATPT_OFCDC_SC_CODE}"
-        f"&SD_SCHUL_CODE={config.SD_SCHUL_CODE}&MLSV_YMD={date}"
-    )
+def get_meal_month(month):
+    """YYYYMM 한 달치 급식을 한 번의 조회로 가져와 {날짜: 급식 목록} 색인으로 반환합니다.
+
+    MLSV_FROM_YMD~MLSV_TO_YMD로 달 전체를 요청하고(여러 페이지면 모두 순회) 날짜별로 나눕니다.
+    급식이 없는 달(방학 등)은 빈 색인이므로 짧게 캐시됩니다.
+    """
+    return meal_index(_iter_rows("mealServiceDietInfo", meal_month_params(month)))
+
+
+def meal_month_params(month):
+    """YYYYMM 한 달치 급식 조회 인자."""
+    start_date, end_date = meal_window(month + "01", "month")
+    return {"MLSV_FROM_YMD": start_date, "MLSV_TO_YMD": end_date}
+
+
+def meal_index(rows):
+    """급식 row들을 {날짜: [{"time", "menu"}, ...]} 색인으로 만듭니다."""
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()  # 200 OK가 아니면 예외 발생
-        data = response.json()
-
-        # API 에러 처리
-        if 'RESULT' in data:
-            error_code = data['RESULT']['CODE']
-            if error_code != 'INFO-000':
-                print(f"NEIS API 오류 (급식): {data['RESULT']['MESSAGE']}")
-                return []
-
-        meal_data = []
-        rows = data.get('mealServiceDietInfo', [{}])[1].get('row', [])
+        days = {}
         for row in rows:
-            meal_data.append({
+            days.setdefault(row['MLSV_YMD'], []).append({
                 "time": row['MMEAL_SC_NM'],
                 "menu": row['DDISH_NM'].replace('<br/>', '\n')
             })
-        return meal_data
+        return days
 
-    except requests.exceptions.RequestException as e:
-        print(f"API 요청 오류 (급식): {e}")
-        return []
-    except (KeyError, IndexError, json.JSONDecodeError) as e:
-        print(f"API 응답 처리 오류 (급식): {e}")
-        return []
+    except KeyError as e:
+        raise NeisError(f"API 응답 처리 오류 (급식): {e}") from e
 
 
-@file_cache(lifetime=config.CACHE_LIFETIME)
-def get_timetable_range(grade, classroom, start_date, end_date):
-    """지정된 기간의 시간표 정보를 NEIS API에서 한 번에 가져옵니다."""
-    url = (
-        f"https://open.neis.go.kr/hub/hisTimetable"
-        f"?KEY={config.API_KEY}&Type=json&pIndex=1&pSize=100"
-        f"&ATPT_OFCDC_SC_CODE={config.ATPT_OFCDC_SC_CODE}"
-        f"&SD_SCHUL_CODE={config.SD_SCHUL_CODE}&SEM={config.SEM}"
-        f"&GRADE={grade}&CLASS_NM={classroom}"
-        f"&TI_FROM_YMD={start_date}&TI_TO_YMD={end_date}"
-    )
+def get_meal(date):
+    """지정된 날짜의 급식 정보를 반환합니다. (그 달의 급식 색인에서 찾음)"""
+    return (get_meal_month(date[:6]) or {}).get(date, [])
+
 
+def get_meal_range(start_date, end_date):
+    """기간의 급식을 [{"date": 날짜, "meals": 급식 목록}] 형태로 반환합니다. 달마다 한 번만 조회합니다."""
+    index = {}
+    for month in months_in_range(start_date, end_date):
+        index.update(get_meal_month(month) or {})
+    return meal_range(index, start_date, end_date)
+
+
+def meal_range(index, start_date, end_date):
+    """달별 급식 색인을 합친 index에서 기간의 날짜별 급식 목록을 만듭니다."""
+    return [
+        {"date": date, "meals": index[date]}
+        for date in timetable_store.date_range(start_date, end_date)
+        if index.get(date)
+    ]
+
+
+# --- 시간표: 학급별·날짜별 저장소 ---
+_timetable_store = timetable_store.TimetableStore(config.TIMETABLE_DB_PATH)
+
+# NEIS API가 주의 시작일(월요일 등)부터 조회하면 데이터를 못가져오는 경우가 있어,
+# 빠진 날짜를 가져올 때도 며칠 앞에서부터 조회합니다.
+_TIMETABLE_FETCH_LEAD_DAYS = 4
+
+def timetable_params(grade, classroom, start_date, end_date):
+    """학급의 기간 시간표 조회 인자."""
+    return {
+        "SEM": config.SEM,
+        "GRADE": grade, "CLASS_NM": classroom,
+        "TI_FROM_YMD": start_date, "TI_TO_YMD": end_date,
+    }
+
+def _timetable_days(rows):
+    """시간표 row들을 {date: [과목, ...]}로 모읍니다. 교시 순서대로 놓고 비어 있는 교시는 건너뜁니다."""
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-
-        if 'RESULT' in data:
-            error_code = data['RESULT']['CODE']
-            if error_code != 'INFO-000':
-                # 데이터가 없는 경우(INFO-200)는 정상 처리
-                if error_code == 'INFO-200':
-                    return []
-                print(f"NEIS API 오류 (시간표): {data['RESULT']['MESSAGE']}")
-                return []
-
-        weekly_schedule = {}
-        rows = data.get('hisTimetable', [{}])[1].get('row', [])
+        schedule = {}
         for row in rows:
-            day = row["ALL_TI_YMD"]
-            period = int(row["PERIO"])
-            subject = row["ITRT_CNTNT"]
-            
-            if day not in weekly_schedule:
-                weekly_schedule[day] = {}
-            weekly_schedule[day][period] = subject
-
-        result = []
-        for day, periods in sorted(weekly_schedule.items()):
-            day_timetable = [periods[p] for p in sorted(periods.keys())]
-            result.append({"date": day, "timetable": day_timetable})
-
-        return result
-
-    except requests.exceptions.RequestException as e:
-        print(f"API 요청 오류 (시간표): {e}")
-        return []
-    except (KeyError, IndexError, json.JSONDecodeError) as e:
-        print(f"API 응답 처리 오류 (시간표): {e}")
-        return []
+            slots = schedule.setdefault(row["ALL_TI_YMD"], [])
+            index = int(row["PERIO"]) - 1
+            if index < 0:
+                raise ValueError(f"잘못된 교시: {row['PERIO']}")
+            if index >= len(slots):
+                slots.extend([None] * (index + 1 - len(slots)))
+            slots[index] = row["ITRT_CNTNT"]
+
+        # 비어 있는 교시는 건너뛰고 교시 순서를 유지
+        return {day: [subject for subject in slots if subject is not None] for day, slots in schedule.items()}
+
+    except (KeyError, ValueError) as e:
+        raise NeisError(f"API 응답 처리 오류 (시간표): {e}") from e
+
+def _date_chunks(start_date, end_date, chunk_days):
+    """기간을 chunk_days일 단위의 (시작일, 종료일) 구간으로 나눕니다."""
+    current = datetime.strptime(start_date, "%Y%m%d")
+    last = datetime.strptime(end_date, "%Y%m%d")
+    while current <= last:
+        chunk_end = min(current + timedelta(days=chunk_days - 1), last)
+        yield current.strftime("%Y%m%d"), chunk_end.strftime("%Y%m%d")
+        current = chunk_end + timedelta(days=1)
+
+def timetable_chunks(grade, classroom, start_date, end_date):
+    """기간을 가져올 (저장할 시작일, 저장할 종료일, NEIS 조회 인자) 구간들을 반환합니다."""
+    for chunk_start, chunk_end in _date_chunks(start_date, end_date, config.TIMETABLE_FETCH_CHUNK_DAYS):
+        fetch_start = (datetime.strptime(chunk_start, "%Y%m%d") - timedelta(days=_TIMETABLE_FETCH_LEAD_DAYS)).strftime("%Y%m%d")
+        yield chunk_start, chunk_end, timetable_params(grade, classroom, fetch_start, chunk_end)
+
+def store_timetable_rows(grade, classroom, rows, chunk_start, chunk_end):
+    """한 구간의 시간표 row를 날짜별로 모아(row를 받는 대로 한 번에 채움) 저장소에 기록합니다."""
+    days = _timetable_days(rows)
+    _timetable_store.put_days(grade, classroom, days, chunk_start, chunk_end, time.time(), _chunk_ttl(days))
+
+def _chunk_ttl(days):
+    """조회 구간의 유효 시간. 구간 안에 수업이 하나도 없을 때만(방학 등) 짧게 캐시합니다.
+
+    수업이 있는 구간에 속한 주말·휴일(빈 목록)은 같은 응답으로 확인한 것이므로 일반 유효 시간을 씁니다.
+    """
+    return config.CACHE_LIFETIME if any(days.values()) else config.NEGATIVE_CACHE_LIFETIME
+
+def _day_ttl(record):
+    """저장된 날짜 기록의 유효 시간. ttl이 없는 이전 형식의 행은 수업 유무로 정합니다."""
+    periods, _, ttl = record
+    if ttl is not None:
+        return ttl
+    return config.CACHE_LIFETIME if periods else config.NEGATIVE_CACHE_LIFETIME
+
+def _classify_days(dates, records, now):
+    """저장된 날짜 기록을 보고 (없거나 너무 오래된 날짜, 만료되어 갱신할 날짜) 목록을 반환합니다."""
+    missing, expired = [], []
+    for date in dates:
+        record = records.get(date)
+        if record is None:
+            missing.append(date)
+            continue
+        ttl = _day_ttl(record)
+        age = now - record[1]
+        if age >= ttl + config.CACHE_STALE_LIFETIME:
+            missing.append(date)
+        elif age >= ttl:
+            expired.append(date)
+    return missing, expired
+
+def timetable_key(grade, classroom, start_date, end_date):
+    return f"timetable|{grade}|{classroom}|{start_date}|{end_date}"
+
+def timetable_records(grade, classroom, start_date, end_date):
+    """저장된 기간의 날짜별 기록 {date: (periods, fetched_at, ttl)}."""
+    return _timetable_store.get_range(grade, classroom, start_date, end_date)
+
+def timetable_status(grade, classroom, start_date, end_date):
+    """저장소에서 기간을 읽어 (날짜 목록, 날짜별 기록, 없거나 너무 오래된 날짜, 만료된 날짜)를 반환합니다."""
+    dates = timetable_store.date_range(start_date, end_date)
+    records = timetable_records(grade, classroom, start_date, end_date)
+    missing, expired = _classify_days(dates, records, time.time())
+    return dates, records, missing, expired
+
+def timetable_is_current(grade, classroom, start_date, end_date):
+    """기간의 모든 날짜가 저장되어 있고 유효한지 확인합니다."""
+    _, _, missing, expired = timetable_status(grade, classroom, start_date, end_date)
+    return not missing and not expired
+
+def timetable_items(dates, records):
+    """저장된 기록에서 수업이 있는 날만 [{"date", "timetable"}] 형태로 만듭니다."""
+    return [
+        {"date": date, "timetable": records[date][0]}
+        for date in dates
+        if date in records and records[date][0]
+    ]
+
+def timetable_fallback(grade, classroom, records, error):
+    log.warning("NEIS 호출 실패, 저장된 시간표 사용 (%s-%s): %s", grade, classroom, error)
+    if records:
+        _stats.incr("fallbacks")
+
+def refresh_timetable_range(grade, classroom, start_date, end_date, only_stale=False, wait=True):
+    """기간의 시간표를 NEIS에서 새로 가져와 저장소에 기록합니다. 실패하면 NeisError를 던집니다.
+
+    긴 기간(예: 한 학기)은 TIMETABLE_FETCH_CHUNK_DAYS 단위로 나누어 구간마다 바로 저장합니다.
+    only_stale이면 다른 워커가 이미 갱신한 경우 NEIS를 호출하지 않고, wait이 아니면
+    다른 워커가 갱신 중일 때 바로 돌아갑니다.
+    """
+    key = timetable_key(grade, classroom, start_date, end_date)
+
+    def load():
+        with lease(key, wait=wait) as acquired:
+            if not acquired and not wait:
+                return
+            if only_stale and timetable_is_current(grade, classroom, start_date, end_date):
+                return
+            for chunk_start, chunk_end, params in timetable_chunks(grade, classroom, start_date, end_date):
+                store_timetable_rows(grade, classroom, _iter_rows("hisTimetable", params), chunk_start, chunk_end)
+
+    _single_flight.do(key, load)
+
+def get_timetable_range(grade, classroom, start_date, end_date):
+    """지정된 기간의 시간표 정보를 반환합니다.
+
+    날짜별 저장소에서 기간을 조합하고, 저장되지 않은 날짜만 NEIS에서 가져옵니다.
+    만료된 날짜만 있으면 저장된 값을 즉시 반환하고 백그라운드에서 갱신하며,
+    NEIS 호출이 실패하면 저장된 마지막 값을 사용합니다.
+    """
+    dates, records, missing, expired = timetable_status(grade, classroom, start_date, end_date)
+
+    if missing:
+        _stats.incr("misses")
+        try:
+            refresh_timetable_range(grade, classroom, missing[0], missing[-1], only_stale=True)
+            records = timetable_records(grade, classroom, start_date, end_date)
+        except NeisError as e:
+            timetable_fallback(grade, classroom, records, e)
+    elif expired:
+        # stale-while-revalidate: 저장된 값을 즉시 반환하고 만료된 구간만 백그라운드에서 갱신
+        # (refresh_timetable_range가 "timetable|..." 키로 single-flight를 하므로 백그라운드 키는 따로 둠)
+        _stats.incr("stale_hits")
+        _refresh_in_background(
+            "refresh|" + timetable_key(grade, classroom, expired[0], expired[-1]),
+            lambda: refresh_timetable_range(grade, classroom, expired[0], expired[-1], only_stale=True, wait=False)
+        )
+    else:
+        _stats.incr("store_hits")
+
+    return timetable_items(dates, records)
+
+
+# --- 캐시된 데이터 버전 (HTTP 조건부 요청용) ---
+# NEIS를 호출하지 않고 캐시만 확인합니다. 데이터가 없거나 만료되었으면 None을 반환하여
+# 호출자가 실제 조회(및 갱신)를 하도록 합니다.
+
+def meal_version(date):
+    """날짜가 속한 달의 캐시된 급식 데이터의 (저장 시각, 만료 시각)을 반환합니다."""
+    return meal_range_version(date, date)
+
+def meal_range_version(start_date, end_date):
+    """기간에 걸친 달들의 급식 데이터가 모두 캐시되어 있으면 (가장 최근 저장 시각, 가장 이른 만료 시각)을 반환합니다."""
+    versions = []
+    for month in months_in_range(start_date, end_date):
+        cache_key = make_cache_key("get_meal_month", (month,))
+        entry = memory_entry(cache_key) or _load_entry(cache_key)
+        if not is_fresh(entry):
+            return None
+        versions.append((entry['timestamp'], entry['timestamp'] + entry['ttl']))
+    return max(stored for stored, _ in versions), min(expires for _, expires in versions)
+
+def timetable_version(grade, classroom, start_date, end_date):
+    """기간의 시간표가 모두 저장되어 있으면 (가장 최근 저장 시각, 가장 이른 만료 시각)을 반환합니다."""
+    _, records, missing, expired = timetable_status(grade, classroom, start_date, end_date)
+    if missing or expired:
+        return None
+    fetched = [record[1] for record in records.values()]
+    expires = [record[1] + _day_ttl(record) for record in records.values()]
+    return max(fetched), min(expires)
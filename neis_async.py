@@ -0,0 +1,252 @@
+"""NEIS 조회의 asyncio 버전 (asgi.py에서 사용).
+
+캐시 규칙(메모리 LRU -> 영구 저장소, stale-while-revalidate, 빈 결과 짧게 캐시, 실패 시 마지막 값),
+캐시 키, lease, 재시도·서킷 브레이커(neis.RequestAttempts), 시간표 저장 방식은 모두 neis의 공개 함수를
+그대로 호출하므로 Flask 경로와 ASGI 경로가 서로의 결과를 재사용합니다. 이 모듈은 그 단계들을
+이벤트 루프에서 엮기만 합니다. NEIS 호출은 httpx의 AsyncClient로 보내어 응답을 기다리는 동안
+워커 스레드를 잡지 않습니다.
+
+SQLite 저장소 읽기/쓰기는 이벤트 루프를 막지 않도록 asyncio.to_thread로 실행합니다.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+
+import config
+import neis
+
+log = logging.getLogger(__name__)
+
+_client = None
+_client_loop = None
+
+# 이벤트 루프 안의 single-flight: {키: Task}. 프로세스 간에는 neis와 같은 lease로 조정합니다.
+_inflight = {}
+# 백그라운드 갱신 중인 키: {키: Task}
+_refreshing = {}
+
+
+def _get_client():
+    """현재 이벤트 루프용 AsyncClient를 반환합니다. (연결 풀은 루프마다 하나)"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=config.NEIS_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=config.NEIS_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=config.NEIS_POOL_SIZE,
+            ),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def aclose():
+    """AsyncClient의 연결을 닫습니다. (ASGI lifespan 종료 시 호출)"""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = _client_loop = None
+
+
+async def _request_json(service, params):
+    """neis._request_json과 같은 규칙(neis.RequestAttempts)으로 NEIS를 비동기 호출합니다."""
+    url, query = neis.request_target(service, params)
+    attempts = neis.RequestAttempts(service)
+    client = _get_client()
+    for delay in attempts:
+        if delay:
+            await asyncio.sleep(delay)
+        attempts.begin()
+        try:
+            response = await client.get(url, params=query)
+            if response.status_code in neis.RETRY_STATUS:
+                attempts.retry("http_error", f"HTTP {response.status_code}")
+                continue
+            response.raise_for_status()
+            data = response.json()
+        except httpx.TimeoutException as e:
+            attempts.retry("timeout", e)
+            continue
+        except httpx.TransportError as e:
+            attempts.retry("connection_error", e)
+            continue
+        except (httpx.HTTPError, ValueError) as e:
+            outcome = "http_error" if isinstance(e, httpx.HTTPStatusError) else "invalid"
+            raise attempts.fail(outcome, e) from e
+        attempts.succeed()
+        return data
+    raise attempts.exhausted()
+
+
+async def _fetch_rows(service, params):
+    """모든 페이지의 row를 목록으로 모아 반환합니다."""
+    rows = []
+    page = 1
+    while True:
+        parsed = neis.parse_page(service, await _request_json(service, neis.page_params(params, page)))
+        if parsed is None:
+            return rows
+        total, page_rows = parsed
+        rows.extend(page_rows)
+        if not page_rows or len(rows) >= total:
+            return rows
+        page += 1
+
+
+def _single_flight(key, factory):
+    """같은 키의 동시 호출은 하나의 Task를 공유합니다. (호출자 하나가 취소되어도 Task는 계속 실행)"""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return asyncio.shield(task)
+
+
+def _refresh_in_background(key, factory):
+    """키마다 하나의 백그라운드 갱신만 실행합니다."""
+    if key in _refreshing:
+        return
+
+    def done(task):
+        _refreshing.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("백그라운드 캐시 갱신 오류 (%s): %s", key, task.exception())
+
+    task = asyncio.ensure_future(factory())
+    _refreshing[key] = task  # 실행 중인 Task의 참조 유지
+    task.add_done_callback(done)
+
+
+@asynccontextmanager
+async def _lease(key, wait=True):
+    """neis.lease의 비동기 버전. 기다리는 동안 이벤트 루프를 막지 않습니다."""
+    owner = uuid.uuid4().hex
+    deadline = time.monotonic() + config.CACHE_LEASE_TIMEOUT
+    acquired = await asyncio.to_thread(neis.try_lease, key, owner)
+    while not acquired and wait and time.monotonic() < deadline:
+        await asyncio.sleep(neis.LEASE_POLL_INTERVAL)
+        acquired = await asyncio.to_thread(neis.try_lease, key, owner)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            await asyncio.to_thread(neis.release_lease, key, owner)
+
+
+async def _cached(cached_func, args, fetch):
+    """neis.file_cache로 감싼 cached_func와 같은 캐시 항목·규칙으로 fetch()의 결과를 캐시합니다."""
+    cache_key = neis.make_cache_key(cached_func.cache_name, args)
+    tier = "memory_hits"
+    entry = neis.memory_entry(cache_key)
+    if entry is None:
+        tier = "store_hits"
+        entry = await asyncio.to_thread(neis.stored_entry, cache_key)
+
+    async def load(wait=True):
+        current = neis.memory_entry(cache_key)
+        if neis.is_fresh(current):
+            return current['data']
+        last_good = current or entry
+
+        async with _lease(cache_key, wait=wait) as acquired:
+            if not acquired and not wait:
+                return neis.last_value(last_good)
+            stored = await asyncio.to_thread(neis.fresh_stored_entry, cache_key)
+            if stored is not None:
+                return stored['data']
+
+            try:
+                result = await fetch()
+            except neis.NeisError as e:
+                return neis.fallback_value(cache_key, last_good, e)
+
+            await asyncio.to_thread(
+                neis.store_result, cache_key, result, cached_func.lifetime, cached_func.negative_lifetime
+            )
+            return result
+
+    state = neis.entry_state(entry)
+    if state == "fresh":
+        neis.record_cache_event(tier)
+        return entry['data']
+    if state == "stale":
+        neis.record_cache_event("stale_hits")
+        _refresh_in_background(cache_key, lambda: load(wait=False))
+        return entry['data']
+
+    shared = cache_key in _inflight
+    result = await _single_flight(cache_key, load)
+    neis.record_cache_event("coalesced" if shared else "misses")
+    return result
+
+
+# --- 급식 ---
+
+async def get_meal_month(month):
+    """neis.get_meal_month의 비동기 버전 (같은 캐시 항목 사용)."""
+    async def fetch():
+        return neis.meal_index(await _fetch_rows("mealServiceDietInfo", neis.meal_month_params(month)))
+    return await _cached(neis.get_meal_month, (month,), fetch)
+
+
+async def get_meal(date):
+    return (await get_meal_month(date[:6]) or {}).get(date, [])
+
+
+async def get_meal_range(start_date, end_date):
+    """기간에 걸친 달들을 동시에 조회하여 날짜별 급식 목록을 반환합니다."""
+    index = {}
+    for days in await asyncio.gather(*(get_meal_month(month) for month in neis.months_in_range(start_date, end_date))):
+        index.update(days or {})
+    return neis.meal_range(index, start_date, end_date)
+
+
+# --- 시간표 ---
+
+async def refresh_timetable_range(grade, classroom, start_date, end_date, only_stale=False, wait=True):
+    """neis.refresh_timetable_range의 비동기 버전 (같은 lease와 시간표 저장소 사용). 실패하면 NeisError."""
+    key = neis.timetable_key(grade, classroom, start_date, end_date)
+
+    async def load():
+        async with _lease(key, wait=wait) as acquired:
+            if not acquired and not wait:
+                return
+            if only_stale and await asyncio.to_thread(neis.timetable_is_current, grade, classroom, start_date, end_date):
+                return
+            for chunk_start, chunk_end, params in neis.timetable_chunks(grade, classroom, start_date, end_date):
+                rows = await _fetch_rows("hisTimetable", params)
+                await asyncio.to_thread(neis.store_timetable_rows, grade, classroom, rows, chunk_start, chunk_end)
+
+    await _single_flight(key, load)
+
+
+async def get_timetable_range(grade, classroom, start_date, end_date):
+    """neis.get_timetable_range의 비동기 버전 (같은 시간표 저장소 사용)."""
+    dates, records, missing, expired = await asyncio.to_thread(
+        neis.timetable_status, grade, classroom, start_date, end_date
+    )
+
+    if missing:
+        neis.record_cache_event("misses")
+        try:
+            await refresh_timetable_range(grade, classroom, missing[0], missing[-1], only_stale=True)
+            records = await asyncio.to_thread(neis.timetable_records, grade, classroom, start_date, end_date)
+        except neis.NeisError as e:
+            neis.timetable_fallback(grade, classroom, records, e)
+    elif expired:
+        neis.record_cache_event("stale_hits")
+        _refresh_in_background(
+            "refresh|" + neis.timetable_key(grade, classroom, expired[0], expired[-1]),
+            lambda: refresh_timetable_range(grade, classroom, expired[0], expired[-1], only_stale=True, wait=False)
+        )
+    else:
+        neis.record_cache_event("store_hits")
+
+    return neis.timetable_items(dates, records)
@@ -0,0 +1,84 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+import config
+import database
+
+log = logging.getLogger(__name__)
+
+
+class PasswordBusyError(Exception):
+    """비밀번호 해시 대기열이 가득 찼을 때 발생합니다. 요청은 503으로 바로 거절합니다."""
+
+    def __init__(self, retry_after):
+        super().__init__("비밀번호 처리 대기열이 가득 찼습니다.")
+        self.retry_after = retry_after
+
+
+# 비밀번호 해시는 CPU를 많이 쓰므로 동시에 실행되는 수를 제한합니다.
+# (hashlib의 scrypt/pbkdf2는 계산 중 GIL을 놓으므로 다른 요청은 계속 처리됨)
+_executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+# 실행 중 + 대기 중인 작업 수 제한
+_slots = threading.BoundedSemaphore(config.PASSWORD_HASH_WORKERS + config.PASSWORD_HASH_QUEUE)
+
+
+def _submit(fn, *args):
+    """fn을 해시 스레드 풀에 넣고 Future를 반환합니다. 대기열이 가득 찼으면 PasswordBusyError."""
+    if not _slots.acquire(blocking=False):
+        raise PasswordBusyError(config.PASSWORD_RETRY_AFTER)
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def hash_password(password):
+    """설정된 방식(PASSWORD_HASH_METHOD)으로 비밀번호 해시를 만듭니다."""
+    return _submit(generate_password_hash, password, config.PASSWORD_HASH_METHOD).result()
+
+
+def needs_rehash(password_hash):
+    """저장된 해시가 현재 설정과 다른 방식·비용으로 만들어졌는지 확인합니다."""
+    return password_hash.split("$", 1)[0] != config.PASSWORD_HASH_METHOD
+
+
+def verify_password(password_hash, password):
+    """저장된 해시와 비밀번호가 일치하는지 확인합니다."""
+    return _submit(check_password_hash, password_hash, password).result()
+
+
+def _rehash(userid, old_hash, password):
+    new_hash = generate_password_hash(password, config.PASSWORD_HASH_METHOD)
+    db = database.connect()
+    try:
+        with db:
+            # 그 사이 비밀번호가 바뀌었으면 덮어쓰지 않음
+            db.execute(
+                "UPDATE users SET password = ? WHERE userid = ? AND password = ?",
+                (new_hash, userid, old_hash)
+            )
+    finally:
+        db.close()
+
+
+def rehash_in_background(userid, old_hash, password):
+    """로그인에 성공한 사용자의 해시를 현재 설정으로 다시 만들어 저장합니다.
+
+    응답을 기다리게 하지 않으며, 대기열이 가득 찼으면 건너뛰고 다음 로그인에서 다시 시도합니다.
+    """
+    try:
+        future = _submit(_rehash, userid, old_hash, password)
+    except PasswordBusyError:
+        return
+
+    def report(done):
+        if done.exception() is not None:
+            log.warning("비밀번호 재해시 실패 (%s): %s", userid, done.exception())
+
+    future.add_done_callback(report)
@@ -0,0 +1,195 @@
+"""학급 게시판 새 글 알림 (Server-Sent Events).
+
+/class/<g>-<c>/events에 연결한 클라이언트에게 새 글의 요약만 보냅니다.
+    - write_post가 커밋한 뒤 hub.publish_post()로 같은 프로세스의 구독자에게 바로 전달합니다.
+    - 다른 워커 프로세스에서 쓴 글은 SSE_POLL_INTERVAL마다 posts 테이블의 새 id를 읽어 전달합니다.
+      (여러 워커 사이의 메시지 브로커 대신 쓰는 로컬 방식)
+    - 구독자마다 크기가 SSE_QUEUE_SIZE인 큐를 두고, 가득 차면(느린 클라이언트) 그 연결을 끊습니다.
+      클라이언트는 Last-Event-ID로 다시 연결하여 놓친 글을 받습니다.
+    - SSE_IDLE_TIMEOUT 동안 보낼 글이 없으면 연결을 닫고, 워커당 연결 수는 SSE_MAX_CLIENTS로 제한합니다.
+연결마다 스레드를 하나 쓰므로 스레드 워커(gunicorn --threads 등)로 실행할 때만 SSE_ENABLED로 켜고,
+SSE_MAX_CLIENTS는 워커의 스레드 수(SERVER_THREADS)보다 작게 둡니다.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+import config
+import database
+import metrics
+
+log = logging.getLogger(__name__)
+
+
+class HubFullError(Exception):
+    """워커의 SSE 연결 수가 SSE_MAX_CLIENTS에 도달했을 때 발생합니다."""
+
+
+class Subscription:
+    """한 클라이언트 연결의 이벤트 큐입니다. 큐가 넘치면 closed가 되어 연결을 끊게 합니다."""
+
+    def __init__(self, channel, maxsize):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.closed = False
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.closed = True
+
+    def get(self, timeout):
+        """다음 이벤트를 기다립니다. timeout 동안 없으면 None입니다."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def post_summary(row):
+    """게시글 행에서 SSE로 보낼 요약을 만듭니다. (본문은 보내지 않음)"""
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "author_name": row["author_name"],
+        "created_at": row["created_at"],
+    }
+
+
+_SUMMARY_SQL = (
+    "SELECT p.id, p.grade, p.classroom, p.title, p.created_at, u.name AS author_name "
+    "FROM posts p JOIN users u ON p.author_id = u.id "
+)
+
+
+class Hub:
+    """학급 채널별 구독자 목록과 새 글 전달을 관리합니다."""
+
+    def __init__(self, queue_size, max_clients, poll_interval):
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self.poll_interval = poll_interval
+        self._channels = {}  # {(학년, 반): {Subscription, ...}}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._delivered = set()  # 이 프로세스에서 이미 전달한 글 id (폴링에서 다시 보내지 않도록)
+        self._poller = None
+
+    def subscribe(self, channel):
+        with self._lock:
+            if self._count >= self.max_clients:
+                raise HubFullError()
+            subscription = Subscription(channel, self.queue_size)
+            self._channels.setdefault(channel, set()).add(subscription)
+            self._count += 1
+            if self._poller is None and self.poll_interval:
+                self._poller = threading.Thread(target=self._poll_loop, name="post-events-poller", daemon=True)
+                self._poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None and subscription in subscribers:
+                subscribers.discard(subscription)
+                self._count -= 1
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def client_count(self):
+        return self._count
+
+    def publish(self, channel, event_id, data):
+        """채널의 구독자 큐에 이벤트를 넣습니다. 큐가 가득 찬 구독자는 연결이 끊깁니다."""
+        with self._lock:
+            if self._poller is not None:
+                self._delivered.add(event_id)
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.offer((event_id, data))
+
+    def publish_post(self, row):
+        """커밋된 게시글을 같은 학급 구독자에게 알립니다. row에는 _SUMMARY_SQL의 열이 있어야 합니다."""
+        self.publish((int(row["grade"]), int(row["classroom"])), row["id"], post_summary(row))
+
+    def _poll_loop(self):
+        """다른 워커에서 쓴 글을 찾아 전달합니다. 구독자가 남아 있는 동안만 실행되고, 없으면 끝납니다.
+        (다음 subscribe가 다시 시작함)"""
+        db = database.connect()
+        try:
+            last_id = db.execute("SELECT COALESCE(MAX(id), 0) FROM posts").fetchone()[0]
+            while True:
+                time.sleep(self.poll_interval)
+                with self._lock:
+                    if not self._count:
+                        self._poller = None
+                        self._delivered.clear()
+                        return
+                try:
+                    rows = db.execute(_SUMMARY_SQL + "WHERE p.id > ? ORDER BY p.id", (last_id,)).fetchall()
+                except Exception as e:
+                    log.warning("새 글 폴링 오류: %s", e)
+                    continue
+                for row in rows:
+                    with self._lock:
+                        seen = row["id"] in self._delivered
+                    if not seen:
+                        self.publish_post(row)
+                    last_id = max(last_id, row["id"])
+                with self._lock:
+                    self._delivered = {post_id for post_id in self._delivered if post_id > last_id}
+        finally:
+            db.close()
+
+
+hub = Hub(config.SSE_QUEUE_SIZE, config.SSE_MAX_CLIENTS, config.SSE_POLL_INTERVAL)
+
+
+@metrics.register_collector
+def _sse_metrics():
+    return [
+        "# HELP sse_clients 이 워커에 연결된 SSE 클라이언트 수", "# TYPE sse_clients gauge",
+        f"sse_clients {hub.client_count()}",
+    ]
+
+
+def load_post(db, post_id):
+    """글 하나의 요약용 행을 읽습니다."""
+    return db.execute(_SUMMARY_SQL + "WHERE p.id = ?", (post_id,)).fetchone()
+
+
+def missed_posts(db, grade, classroom, last_event_id):
+    """다시 연결한 클라이언트가 놓친 글(last_event_id 이후)을 오래된 순으로 최대 SSE_QUEUE_SIZE개 반환합니다."""
+    rows = db.execute(
+        _SUMMARY_SQL + "WHERE p.grade = ? AND p.classroom = ? AND p.id > ? ORDER BY p.id DESC LIMIT ?",
+        (grade, classroom, last_event_id, config.SSE_QUEUE_SIZE)
+    ).fetchall()
+    return [(row["id"], post_summary(row)) for row in reversed(rows)]
+
+
+def _format(event_id, data):
+    return f"id: {event_id}\nevent: post\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def stream(subscription, backlog=()):
+    """SSE 본문을 만드는 생성기. 연결이 끝나면(클라이언트 종료, 큐 넘침, 유휴 시간 초과) 구독을 해제합니다."""
+    try:
+        yield f"retry: {config.SSE_RETRY_MS}\n\n"
+        for event_id, data in backlog:
+            yield _format(event_id, data)
+        last_event = time.monotonic()
+        while not subscription.closed:
+            item = subscription.get(timeout=config.SSE_HEARTBEAT)
+            if item is None:
+                if time.monotonic() - last_event >= config.SSE_IDLE_TIMEOUT:
+                    break
+                # 끊어진 연결을 알아채고 프록시의 유휴 종료를 막기 위한 주석 줄
+                yield ": ping\n\n"
+                continue
+            last_event = time.monotonic()
+            yield _format(*item)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,67 @@
+import hashlib
+
+import bleach
+
+# 렌더링 규칙을 바꾸면(줄바꿈 처리 등) 이 값을 올려 저장된 HTML을 다시 만들게 합니다.
+RENDER_FORMAT = 1
+
+
+def _sanitizer_version():
+    """bleach 버전과 허용 태그/속성/프로토콜 설정으로 소독 규칙 버전 문자열을 만듭니다."""
+    settings = "|".join([
+        str(RENDER_FORMAT),
+        bleach.__version__,
+        ",".join(sorted(bleach.ALLOWED_TAGS)),
+        ",".join(f"{tag}={sorted(attrs)}" for tag, attrs in sorted(dict(bleach.ALLOWED_ATTRIBUTES).items())),
+        ",".join(sorted(bleach.ALLOWED_PROTOCOLS)),
+    ])
+    return hashlib.sha256(settings.encode()).hexdigest()[:12]
+
+
+SANITIZER_VERSION = _sanitizer_version()
+
+
+def render_content(content):
+    """게시글 원문을 XSS 방지를 위해 bleach로 소독하고, 줄바꿈을 <br>로 변환합니다."""
+    return bleach.clean(content).replace("\n", "<br>")
+
+
+def post_html(db, post):
+    """저장된 HTML이 현재 소독 규칙으로 만든 것이면 그대로, 아니면 다시 만들어 저장한 뒤 반환합니다.
+
+    post에는 id, content, content_html, sanitizer_version 열이 있어야 합니다.
+    """
+    if post["content_html"] is not None and post["sanitizer_version"] == SANITIZER_VERSION:
+        return post["content_html"]
+    content_html = render_content(post["content"])
+    db.execute(
+        "UPDATE posts SET content_html = ?, sanitizer_version = ? WHERE id = ?",
+        (content_html, SANITIZER_VERSION, post["id"])
+    )
+    db.commit()
+    return content_html
+
+
+def backfill(db, batch_size=500, rebuild_all=False):
+    """저장된 HTML이 없거나 소독 규칙 버전이 다른 게시글을 id 순서대로 배치 단위로 다시 렌더링합니다.
+
+    rebuild_all이면 버전과 관계없이 모든 게시글을 다시 만듭니다. 갱신한 게시글 수를 반환합니다.
+    """
+    stale = "" if rebuild_all else "AND (content_html IS NULL OR sanitizer_version IS NOT ?) "
+    updated = 0
+    last_id = 0
+    while True:
+        params = [last_id] + ([] if rebuild_all else [SANITIZER_VERSION]) + [batch_size]
+        rows = db.execute(
+            "SELECT id, content FROM posts WHERE id > ? " + stale + "ORDER BY id LIMIT ?",
+            params
+        ).fetchall()
+        if not rows:
+            return updated
+        db.executemany(
+            "UPDATE posts SET content_html = ?, sanitizer_version = ? WHERE id = ?",
+            [(render_content(content), SANITIZER_VERSION, post_id) for post_id, content in rows]
+        )
+        db.commit()
+        updated += len(rows)
+        last_id = rows[-1][0]
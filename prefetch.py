@@ -0,0 +1,114 @@
+"""NEIS 데이터 미리 채우기 (warm-up) 작업.
+
+모든 학급의 시간표와 앞으로 N일(주중) 동안의 급식 중 캐시에 없거나 만료된 것만 병렬로 가져와 저장합니다.
+    python prefetch.py --days 10 --workers 4
+    python prefetch.py --start 20260302 --end 20260718   # 학기 전체 시간표
+    python prefetch.py --every 3600                      # 한 시간마다 반복 (예약 작업용 프로세스 하나에서만)
+또는 Flask CLI로 실행합니다.
+    flask --app app prefetch [--every 3600]
+
+웹 워커 프로세스는 미리 채우기를 예약하지 않습니다. 반복 실행은 위의 명령을 실행하는 프로세스 하나(cron,
+systemd 타이머, PythonAnywhere 예약 작업 등)가 맡습니다.
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import class_access
+import config
+import neis
+
+log = logging.getLogger(__name__)
+
+
+def upcoming_school_days(days, start=None):
+    """start(기본값 오늘)부터 주말을 제외한 날짜 문자열(YYYYMMDD) days개를 반환합니다."""
+    current = start or datetime.now()
+    result = []
+    while len(result) < days:
+        if current.weekday() < 5:
+            result.append(current.strftime("%Y%m%d"))
+        current += timedelta(days=1)
+    return result
+
+
+def warm_cache(days=None, workers=None, base_date=None, timetable_start=None, timetable_end=None, force=False):
+    """시간표(학급별)와 급식(달별)을 NEIS에서 가져와 캐시에 채웁니다.
+
+    캐시에 유효한 값이 있거나 다른 워커가 같은 항목을 갱신 중(lease)이면 건너뛰고,
+    force이면 모두 새로 가져옵니다. 동시에 실행되는 NEIS 호출 수는 workers로 제한합니다.
+    timetable_start/timetable_end를 주면(예: 학기 전체) 그 기간의 시간표를 채웁니다.
+    성공/실패 건수를 반환합니다.
+    """
+    days = days or config.PREFETCH_DAYS
+    workers = workers or config.PREFETCH_WORKERS
+    school_days = upcoming_school_days(days, base_date)
+    # 앞으로의 각 날짜에 대해 /api/data가 조회할 기간을 모두 덮도록 시간표 기간을 정함
+    start_date = timetable_start or neis.timetable_window(school_days[0])[0]
+    end_date = timetable_end or neis.timetable_window(school_days[-1])[1]
+
+    # 급식은 달 단위로 한 번에 가져옴
+    refresh_meal = neis.get_meal_month.refresh if force else neis.get_meal_month.refresh_stale
+    jobs = [(refresh_meal, (month,), {}) for month in sorted({day[:6] for day in school_days})]
+    timetable_options = {} if force else {"only_stale": True, "wait": False}
+    jobs += [
+        (neis.refresh_timetable_range, (grade, classroom, start_date, end_date), timetable_options)
+        for grade, classroom in class_access.all_classes()
+    ]
+
+    summary = {"ok": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fn, *args, **kwargs): args for fn, args, kwargs in jobs}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                summary["ok"] += 1
+            except Exception as e:
+                log.warning("미리 채우기 실패 %s: %s", futures[future], e)
+                summary["failed"] += 1
+    return summary
+
+
+def run_forever(interval=None, **options):
+    """interval(초)마다 warm_cache(**options)를 실행합니다. 반환하지 않으므로 전용 프로세스에서 호출합니다."""
+    interval = interval or config.PREFETCH_INTERVAL
+    while True:
+        try:
+            summary = warm_cache(**options)
+            log.info("NEIS 미리 채우기 완료: %s", summary)
+        except Exception as e:
+            log.exception("NEIS 미리 채우기 오류: %s", e)
+        time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NEIS 시간표/급식 캐시 미리 채우기")
+    parser.add_argument("--days", type=int, default=config.PREFETCH_DAYS, help="가져올 주중 일수")
+    parser.add_argument("--workers", type=int, default=config.PREFETCH_WORKERS, help="동시 NEIS 호출 수")
+    parser.add_argument("--date", help="기준 날짜 (YYYYMMDD, 기본값 오늘)")
+    parser.add_argument("--start", help="시간표 조회 시작일 (YYYYMMDD, 예: 학기 시작일)")
+    parser.add_argument("--end", help="시간표 조회 종료일 (YYYYMMDD, 예: 학기 종료일)")
+    parser.add_argument("--force", action="store_true", help="캐시가 유효해도 모두 새로 가져오기")
+    parser.add_argument("--every", type=int, help="이 간격(초)마다 계속 반복 실행")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    base_date = datetime.strptime(args.date, "%Y%m%d") if args.date else None
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    options = dict(
+        days=args.days, workers=args.workers, base_date=base_date,
+        timetable_start=args.start, timetable_end=args.end, force=args.force
+    )
+    if args.every:
+        run_forever(args.every, **options)
+    started = time.time()
+    summary = warm_cache(**options)
+    print(f"완료: 성공 {summary['ok']}건, 실패 {summary['failed']}건 ({time.time() - started:.1f}초)")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
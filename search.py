@@ -0,0 +1,238 @@
+import html
+import logging
+import re
+import sqlite3
+
+import config
+
+log = logging.getLogger(__name__)
+
+# snippet()이 검색어 앞뒤에 넣는 표시. 본문을 HTML 이스케이프한 뒤 <mark>로 바꿉니다.
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+# trigram 토크나이저는 3글자 미만의 검색어로는 색인을 찾을 수 없습니다.
+TRIGRAM_MIN_LENGTH = 3
+# 2글자 검색어(예: "수학", "숙제")는 글자 2개씩 끊어 색인한 posts_bigram에서 찾습니다.
+BIGRAM_LENGTH = 2
+
+_WORD_RUN = re.compile(r"[^\W_]+")
+
+
+def bigrams(text):
+    """text의 글자·숫자 연속 구간을 2글자씩 겹쳐 끊은 토큰을 공백으로 이어 반환합니다.
+
+    posts_bigram 트리거가 SQL 함수 search_bigrams()로 호출합니다.
+    """
+    tokens = []
+    for run in _WORD_RUN.findall((text or "").lower()):
+        tokens.extend(run[i:i + BIGRAM_LENGTH] for i in range(len(run) - BIGRAM_LENGTH + 1))
+    return " ".join(tokens)
+
+
+def register_functions(conn):
+    """posts_bigram 트리거가 쓰는 search_bigrams() 함수를 연결에 등록합니다.
+
+    posts에 글을 쓰는 연결은 모두 등록해야 합니다. (database.connect는 자동으로 등록)
+    """
+    conn.create_function("search_bigrams", 1, bigrams, deterministic=True)
+
+
+def create_fts(cur):
+    """posts_fts(trigram)와 posts_bigram 가상 테이블, 동기화 트리거를 만듭니다.
+
+    새로 만든 테이블에는 기존 게시글을 색인합니다.
+    """
+    if _create_trigram_fts(cur):
+        _create_bigram_fts(cur)
+
+
+def _table_exists(cur, name):
+    return cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def _create_trigram_fts(cur):
+    """posts_fts를 만들고, FTS5를 쓸 수 있으면 True를 반환합니다.
+
+    한국어는 조사가 붙어 띄어쓰기 단위로 나누기 어려우므로 trigram 토크나이저를 사용하고,
+    지원하지 않는 SQLite에서는 unicode61로 대신합니다.
+    """
+    if _table_exists(cur, "posts_fts"):
+        return True
+
+    for tokenizer in (config.SEARCH_TOKENIZER, "unicode61"):
+        try:
+            cur.execute(
+                "CREATE VIRTUAL TABLE posts_fts USING fts5("
+                "title, content, content='posts', content_rowid='id', "
+                f"tokenize='{tokenizer}')"
+            )
+            break
+        except sqlite3.OperationalError as e:  # 오래된 SQLite에는 trigram이 없음
+            log.warning("FTS5 토크나이저 %s 사용 불가: %s", tokenizer, e)
+    else:
+        return False
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """)
+    cur.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+    return True
+
+
+def _create_bigram_fts(cur):
+    """2글자 검색어용 posts_bigram(본문 없이 bigram 토큰만 저장)을 만듭니다.
+
+    cur의 연결에는 register_functions()로 search_bigrams()가 등록되어 있어야 합니다.
+    """
+    if _table_exists(cur, "posts_bigram"):
+        return
+
+    cur.execute(
+        "CREATE VIRTUAL TABLE posts_bigram USING fts5("
+        "title, content, content='', tokenize='unicode61')"
+    )
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS posts_bigram_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_bigram (rowid, title, content)
+        VALUES (new.id, search_bigrams(new.title), search_bigrams(new.content));
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS posts_bigram_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_bigram (posts_bigram, rowid, title, content)
+        VALUES ('delete', old.id, search_bigrams(old.title), search_bigrams(old.content));
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS posts_bigram_au AFTER UPDATE OF title, content ON posts BEGIN
+        INSERT INTO posts_bigram (posts_bigram, rowid, title, content)
+        VALUES ('delete', old.id, search_bigrams(old.title), search_bigrams(old.content));
+        INSERT INTO posts_bigram (rowid, title, content)
+        VALUES (new.id, search_bigrams(new.title), search_bigrams(new.content));
+    END
+    """)
+    cur.execute(
+        "INSERT INTO posts_bigram (rowid, title, content) "
+        "SELECT id, search_bigrams(title), search_bigrams(content) FROM posts"
+    )
+
+
+def _terms(query):
+    return [term for term in query.split() if term]
+
+
+def _fts_query(terms):
+    """검색어를 FTS5 문자열 구문으로 감싸 AND로 연결합니다. (연산자 주입 방지)"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _render_snippet(raw):
+    """snippet 텍스트를 HTML 이스케이프하고 검색어 표시를 <mark>로 바꿉니다."""
+    escaped = html.escape(raw or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _like_filter(terms):
+    """검색어마다 제목 또는 본문에 포함되어야 하는 LIKE 조건과 인자를 만듭니다."""
+    clause = "".join("AND (p.title LIKE ? ESCAPE '\\' OR p.content LIKE ? ESCAPE '\\') " for _ in terms)
+    params = []
+    for term in terms:
+        pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        params += [pattern, pattern]
+    return clause, params
+
+
+def search_posts(db, query, grade=None, classroom=None, page=1, page_size=None):
+    """게시글을 검색하여 (결과 목록, 다음 페이지 존재 여부)를 반환합니다.
+
+    grade/classroom을 주면 해당 학급으로 제한합니다. 모든 검색어가 3글자 이상이면 trigram 색인에서
+    관련도(bm25, 제목 가중)순으로 찾습니다. 2글자 검색어가 섞이면 posts_bigram 색인을 함께 쓰고,
+    1글자 검색어는 다른 검색어로 좁힌 후보 안에서 LIKE로 거른 뒤 최신순으로 정렬합니다.
+    1글자 검색어만 있으면 범위 안의 최근 글 SEARCH_SHORT_SCAN_LIMIT개만 훑습니다.
+    """
+    page_size = page_size or config.SEARCH_PAGE_SIZE
+    terms = _terms(query)
+    if not terms:
+        return [], False
+
+    scope = ""
+    scope_params = []
+    if grade is not None and classroom is not None:
+        scope = "AND p.grade = ? AND p.classroom = ? "
+        scope_params = [grade, classroom]
+    offset = (page - 1) * page_size
+
+    long_terms, bigram_terms, like_terms = [], [], []
+    for term in terms:
+        if len(term) >= TRIGRAM_MIN_LENGTH:
+            long_terms.append(term)
+        elif len(term) == BIGRAM_LENGTH and bigrams(term):
+            bigram_terms.append(bigrams(term))
+        else:  # 1글자이거나 글자·숫자가 아닌 문자가 섞인 2글자
+            like_terms.append(term)
+
+    if not bigram_terms and not like_terms:
+        rows = db.execute(
+            "SELECT p.id, p.grade, p.classroom, p.title, p.created_at, u.name AS author_name, "
+            f"snippet(posts_fts, 1, '{_MARK_START}', '{_MARK_END}', '…', 16) AS snippet "
+            "FROM posts_fts f "
+            "JOIN posts p ON p.id = f.rowid "
+            "JOIN users u ON p.author_id = u.id "
+            "WHERE posts_fts MATCH ? "
+            + scope +
+            "ORDER BY bm25(posts_fts, 10.0, 1.0) LIMIT ? OFFSET ?",
+            [_fts_query(terms)] + scope_params + [page_size + 1, offset]
+        ).fetchall()
+    else:
+        # 짧은 검색어: 색인으로 후보를 좁히고, 색인이 없는 1글자 검색어는 후보 안에서 LIKE로 거름
+        candidates = ""
+        candidate_params = []
+        if long_terms:
+            candidates += "AND p.id IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?) "
+            candidate_params.append(_fts_query(long_terms))
+        if bigram_terms:
+            candidates += "AND p.id IN (SELECT rowid FROM posts_bigram WHERE posts_bigram MATCH ?) "
+            candidate_params.append(_fts_query(bigram_terms))
+        if not candidates:
+            # 색인을 쓸 수 있는 검색어가 없으면 범위 안의 최근 글만 훑음 (전체 스캔 방지)
+            candidates = "AND p.id IN (SELECT p.id FROM posts p WHERE 1 = 1 " + scope + "ORDER BY p.id DESC LIMIT ?) "
+            candidate_params = scope_params + [config.SEARCH_SHORT_SCAN_LIMIT]
+        like_clause, like_params = _like_filter(like_terms)
+        rows = db.execute(
+            "SELECT p.id, p.grade, p.classroom, p.title, p.created_at, u.name AS author_name, "
+            "substr(p.content, 1, 80) AS snippet "
+            "FROM posts p JOIN users u ON p.author_id = u.id "
+            "WHERE 1 = 1 " + scope + candidates + like_clause +
+            "ORDER BY p.created_at DESC, p.id DESC LIMIT ? OFFSET ?",
+            scope_params + candidate_params + like_params + [page_size + 1, offset]
+        ).fetchall()
+
+    results = [
+        {
+            "id": row["id"],
+            "grade": row["grade"],
+            "classroom": row["classroom"],
+            "title": row["title"],
+            "created_at": row["created_at"],
+            "author_name": row["author_name"],
+            "snippet": _render_snippet(row["snippet"]),
+        }
+        for row in rows[:page_size]
+    ]
+    return results, len(rows) > page_size
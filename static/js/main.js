@@ -111,7 +111,7 @@
 
     /* --- API 호출 함수 --- */
     async function fetchMeal(date) {
-        const url = `/api/data?date=${date}&data_type=meal`;
+        const url = `/api/meal?date=${date}`;
         try {
             const response = await fetch(url);
             if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
@@ -124,7 +124,7 @@
     }
 
     async function fetchTimetable(date, grade, classroom) {
-        const url = `/api/data?date=${date}&grade=${grade}&classroom=${classroom}&data_type=timetable`;
+        const url = `/api/timetable?date=${date}&grade=${grade}&classroom=${classroom}`;
         try {
             const response = await fetch(url);
             if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
@@ -136,6 +136,20 @@
         }
     }
 
+    // 급식과 시간표가 모두 필요할 때는 한 번의 요청으로 가져옴
+    async function fetchMealAndTimetable(date, grade, classroom) {
+        const url = `/api/data?date=${date}&grade=${grade}&classroom=${classroom}&data_type=meal,timetable`;
+        try {
+            const response = await fetch(url);
+            if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+            const data = await response.json();
+            return { meal: data.meal || [], timetable: data.timetable || [] };
+        } catch (error) {
+            console.error('Error fetching meal/timetable:', error);
+            return { meal: [], timetable: [] };
+        }
+    }
+
     // Variables to store last fetched values
     let lastFetchedDate = '';
     let lastFetchedGrade = '';
@@ -170,6 +184,11 @@
             timetableLoading.style.visibility = 'visible'; // FIX: Use visibility
         }
 
+        // 두 섹션이 모두 필요하면 묶음 요청 하나로 처리
+        const batch = (shouldFetchMeal && shouldFetchTimetable && mealContent && timetableContainer)
+            ? fetchMealAndTimetable(date, grade, classroom)
+            : null;
+
         // A promise that resolves after a minimum delay
         // const minDelay = (duration) => new Promise(resolve => setTimeout(resolve, duration));
 
@@ -183,7 +202,7 @@
             }
 
             // Fetch data and wait for minimum delay simultaneously
-            const mealData = await fetchMeal(date);
+            const mealData = batch ? (await batch).meal : await fetchMeal(date);
             // const [mealData] = await Promise.all([
             //     fetchMeal(date),
             //     minDelay(300) // FIX: Ensure loader is visible for at least 300ms
@@ -200,7 +219,7 @@
         // 시간표 데이터 불러오기 및 렌더링
         if (shouldFetchTimetable && timetableContainer) {
             // Fetch data and wait for minimum delay simultaneously
-            const timetableData = await fetchTimetable(date, grade, classroom);
+            const timetableData = batch ? (await batch).timetable : await fetchTimetable(date, grade, classroom);
             // const [timetableData] = await Promise.all([
             //     fetchTimetable(date, grade, classroom),
             //     minDelay(300) // FIX: Ensure loader is visible for at least 300ms
@@ -227,6 +246,61 @@
 
 
 
+    /* --- 학급 게시판 새 글 알림 (SSE) --- */
+    // 최신 글 페이지에서만(서버에서 켠 경우) 연결하며, 새 글이 오면 목록 맨 위에 추가합니다.
+    // 연결이 끊기면 브라우저가 Last-Event-ID와 함께 다시 연결하여 놓친 글을 받습니다.
+    // 탭이 숨겨지면 서버 스레드를 놓아주도록 연결을 닫고, 다시 보이면 마지막 글 id부터 이어 받습니다.
+    function subscribeClassEvents() {
+        const postList = document.querySelector('.post-list[data-events-url]');
+        if (!postList || !window.EventSource) return;
+
+        let source = null;
+        let lastEventId = '';
+        const connect = () => {
+            const url = new URL(postList.dataset.eventsUrl, window.location.href);
+            if (lastEventId) url.searchParams.set('last_event_id', lastEventId);
+            source = new EventSource(url);
+            source.addEventListener('post', onPost);
+        };
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden && source) {
+                source.close();
+                source = null;
+            } else if (!document.hidden && !source) {
+                connect();
+            }
+        });
+        connect();
+
+        function onPost(event) {
+            lastEventId = event.lastEventId || lastEventId;
+            const post = JSON.parse(event.data);
+            if (postList.querySelector(`[data-post-id="${post.id}"]`)) return; // 이미 표시된 글
+
+            let list = postList.querySelector('ul');
+            if (!list) {
+                list = document.createElement('ul');
+                list.style.cssText = 'list-style: none; padding: 0;';
+                postList.prepend(list);
+                const emptyMessage = postList.querySelector('.no-posts-message');
+                if (emptyMessage) emptyMessage.remove();
+            }
+
+            const item = document.createElement('li');
+            item.dataset.postId = post.id;
+            item.style.cssText = 'border-bottom: 1px solid #eee; padding: 10px 0; background-color: white; border-radius: 8px; padding: 15px; margin-bottom: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);';
+            const link = document.createElement('a');
+            link.href = postList.dataset.postBase + post.id;
+            link.style.cssText = 'text-decoration: none; color: #333; font-weight: bold;';
+            link.textContent = post.title;
+            const meta = document.createElement('span');
+            meta.style.cssText = 'font-size: 0.8em; color: #666; margin-left: 10px;';
+            meta.textContent = `작성자: ${post.author_name} | ${post.created_at.split('T')[0]}`;
+            item.append(link, meta);
+            list.prepend(item);
+        }
+    }
+
     /* --- 유틸리티 함수 --- */
     function debounce(func, delay) {
         let timeout;
@@ -372,6 +446,8 @@
 
     // 페이지 로드 시 초기 데이터 로드
     document.addEventListener('DOMContentLoaded', async () => {
+        subscribeClassEvents();
+
         const body = document.body;
         const initialDate = body.dataset.initialDate;
         let initialGrade = body.dataset.initialGrade;
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+# neis, app 등은 import할 때 캐시 저장소와 DB를 열므로, 테스트 전체에서 임시 디렉터리를 쓰도록 먼저 바꿉니다.
+_CACHE_DIR = tempfile.mkdtemp(prefix="school-tests-")
+config.CACHE_DIR = _CACHE_DIR
+config.CACHE_DB_PATH = os.path.join(_CACHE_DIR, "neis_cache.db")
+config.TIMETABLE_DB_PATH = os.path.join(_CACHE_DIR, "timetable.db")
+config.DATABASE_PATH = os.path.join(_CACHE_DIR, "users.db")
+config.ASSET_BUILD_DIR = os.path.join(_CACHE_DIR, "assets")
+config.PROFILE_DIR = os.path.join(_CACHE_DIR, "profiles")
+config.SECRET_KEY = "test-secret-key"
+
+
+@pytest.fixture
+def neis_cache(tmp_path, monkeypatch):
+    """테스트마다 빈 NEIS 캐시(메모리, 저장소, 시간표 저장소, 통계, 서킷 브레이커)를 씁니다."""
+    pytest.importorskip("requests")
+    import cache
+    import neis
+    import timetable_store
+
+    monkeypatch.setattr(neis, "_memory_cache", cache.MemoryCache(maxsize=config.MEMORY_CACHE_SIZE))
+    monkeypatch.setattr(neis, "_backend", cache.SQLiteBackend(str(tmp_path / "neis_cache.db")))
+    monkeypatch.setattr(neis, "_stats", cache.CacheStats())
+    monkeypatch.setattr(neis, "_timetable_store", timetable_store.TimetableStore(str(tmp_path / "timetable.db")))
+    monkeypatch.setattr(neis, "_breaker", neis.CircuitBreaker(config.NEIS_BREAKER_THRESHOLD, config.NEIS_BREAKER_RESET))
+    return neis
+
+
+@pytest.fixture
+def app_module(neis_cache):
+    pytest.importorskip("flask")
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def app_db(app_module, tmp_path, monkeypatch):
+    """테스트마다 관리자 계정(admin/1234)만 있는 새 사용자 DB를 씁니다."""
+    import cache
+    import database
+    import user_cache
+
+    monkeypatch.setattr(config, "DATABASE_PATH", str(tmp_path / "users.db"))
+    monkeypatch.setattr(database, "_local", threading.local())
+    monkeypatch.setattr(user_cache, "_cache", cache.MemoryCache(config.USER_CACHE_SIZE))
+    database.init_db()
+    conn = database.connect()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def admin_client(client, app_db):
+    """관리자로 로그인한 테스트 클라이언트 (모든 학급 접근 가능)."""
+    with client.session_transaction() as sess:
+        sess["user"] = "admin"
+    return client
@@ -0,0 +1,108 @@
+import pytest
+
+pytest.importorskip("flask")
+
+MEAL_ROWS = [{"MLSV_YMD": "20240304", "MMEAL_SC_NM": "중식", "DDISH_NM": "잡곡밥"}]
+TIMETABLE_ROWS = [{"ALL_TI_YMD": "20240304", "PERIO": "1", "ITRT_CNTNT": "국어"}]
+
+
+@pytest.fixture
+def services(neis_cache, monkeypatch):
+    services = []
+
+    def fake_rows(service, params):
+        services.append(service)
+        return iter(MEAL_ROWS if service == "mealServiceDietInfo" else TIMETABLE_ROWS)
+
+    monkeypatch.setattr(neis_cache, "_iter_rows", fake_rows)
+    return services
+
+
+def test_parse_sections(app_module):
+    parse = app_module.parse_sections
+    assert parse(None) == parse("all") == ("meal", "timetable")
+    # 중복·공백은 무시하고 SECTION_BUILDERS 순서로 고정
+    assert parse(" timetable,meal,meal ") == ("meal", "timetable")
+    assert parse("meal_week") == ("meal_week",)
+    assert parse("meal,lunch") is None
+    assert parse(",") is None
+
+
+def test_data_type_builds_only_requested_sections(client, services):
+    response = client.get("/api/data?data_type=meal&date=20240304")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["meal"] == [{"time": "중식", "menu": "잡곡밥"}]
+    assert "timetable" not in body
+    assert list(body["cache"]) == ["meal"]
+    assert services == ["mealServiceDietInfo"]
+
+
+@pytest.mark.parametrize("query", ["data_type=weather", "data_type=meal,weather", "data_type=,"])
+def test_unknown_data_type_is_400(client, services, query):
+    response = client.get(f"/api/data?{query}&date=20240304")
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+    assert services == []
+
+
+def test_conditional_request_skips_section_builders(client, services, app_module, monkeypatch):
+    built = []
+
+    def counting(name, builder):
+        def build(date_str, grade, classroom):
+            built.append(name)
+            return builder(date_str, grade, classroom)
+        return build
+
+    for name, builder in list(app_module.SECTION_BUILDERS.items()):
+        monkeypatch.setitem(app_module.SECTION_BUILDERS, name, counting(name, builder))
+
+    first = client.get("/api/data?date=20240304")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    last_modified = first.headers["Last-Modified"]
+    assert first.cache_control.public
+    assert 0 < first.cache_control.max_age <= first.get_json()["cache"]["meal"]["max_age"] + 1
+    assert built == ["meal", "timetable"]
+
+    by_etag = client.get("/api/data?date=20240304", headers={"If-None-Match": etag})
+    assert by_etag.status_code == 304
+    assert by_etag.headers["ETag"] == etag
+    by_date = client.get("/api/data?date=20240304", headers={"If-Modified-Since": last_modified})
+    assert by_date.status_code == 304
+    assert built == ["meal", "timetable"]
+    assert services == ["mealServiceDietInfo", "hisTimetable"]
+
+    # 다른 학급은 ETag가 달라 다시 계산
+    other = client.get("/api/data?date=20240304&classroom=2", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["ETag"] != etag
+
+
+def test_grade_and_classroom_are_normalized(client, neis_cache, monkeypatch):
+    classes = []
+
+    def fake_rows(service, params):
+        classes.append((params["GRADE"], params["CLASS_NM"]))
+        return iter(TIMETABLE_ROWS)
+
+    monkeypatch.setattr(neis_cache, "_iter_rows", fake_rows)
+    response = client.get("/api/timetable?date=20240304&grade=01&classroom=02")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["grade"], body["classroom"]) == ("1", "2")
+    assert classes == [("1", "2")]
+
+    # 같은 학급은 같은 저장소 항목과 ETag를 씀
+    same = client.get("/api/timetable?date=20240304&grade=1&classroom=2", headers={"If-None-Match": response.headers["ETag"]})
+    assert same.status_code == 304
+    assert classes == [("1", "2")]
+
+
+@pytest.mark.parametrize("query", ["grade=x", "grade=0", "grade=4", "classroom=11", "classroom=-1", "grade=1.5"])
+def test_unknown_class_is_400(client, services, query):
+    response = client.get(f"/api/timetable?date=20240304&{query}")
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+    assert services == []
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("flask")
+
+
+def _meal_rows(start, end):
+    """start~end 주중마다 중식 row 하나."""
+    rows = []
+    day = datetime.strptime(start, "%Y%m%d")
+    while day <= datetime.strptime(end, "%Y%m%d"):
+        if day.weekday() < 5:
+            rows.append({"MLSV_YMD": day.strftime("%Y%m%d"), "MMEAL_SC_NM": "중식", "DDISH_NM": f"밥<br/>{day.day}"})
+        day += timedelta(days=1)
+    return rows
+
+
+@pytest.fixture
+def meal_calls(neis_cache, monkeypatch):
+    calls = []
+
+    def fake_rows(service, params):
+        assert service == "mealServiceDietInfo"
+        calls.append(params["MLSV_FROM_YMD"][:6])
+        return iter(_meal_rows(params["MLSV_FROM_YMD"], params["MLSV_TO_YMD"]))
+
+    monkeypatch.setattr(neis_cache, "_iter_rows", fake_rows)
+    return calls
+
+
+def _days(response, section):
+    assert response.status_code == 200
+    return {item["date"]: item["meals"] for item in response.get_json()[section]}
+
+
+def test_meal_week_across_month_boundary(client, meal_calls):
+    days = _days(client.get("/api/meals?range=week&date=20240501"), "meal_week")
+    assert list(days) == ["20240429", "20240430", "20240501", "20240502", "20240503"]
+    assert days["20240430"] == [{"time": "중식", "menu": "밥\n30"}]
+    # 두 달에 걸친 주는 달마다 한 번씩만 조회
+    assert meal_calls == ["202404", "202405"]
+
+    same = _days(client.get("/api/data?data_type=meal_week&date=20240429"), "meal_week")
+    assert same == days
+    assert meal_calls == ["202404", "202405"]
+
+
+def test_meal_month_is_one_upstream_call(client, meal_calls):
+    days = _days(client.get("/api/meals?range=month&date=20240610"), "meal_month")
+    assert len(days) == 20
+    assert all(date.startswith("202406") for date in days)
+    assert meal_calls == ["202406"]
+
+    # 같은 달의 다른 날짜와 하루치 급식도 같은 달 색인을 재사용
+    assert _days(client.get("/api/data?data_type=meal_month&date=20240628"), "meal_month") == days
+    assert client.get("/api/meal?date=20240611").get_json()["meal"] == days["20240611"]
+    assert meal_calls == ["202406"]
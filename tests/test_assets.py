@@ -0,0 +1,62 @@
+import gzip
+import os
+
+import pytest
+
+pytest.importorskip("flask")
+
+import assets  # noqa: E402
+import config  # noqa: E402
+
+SCRIPT = b"console.log('hello');\n" * 100
+
+
+@pytest.fixture
+def static_dir(app_module, tmp_path, monkeypatch):
+    static_dir = tmp_path / "static"
+    (static_dir / "js").mkdir(parents=True)
+    (static_dir / "js" / "app.js").write_bytes(SCRIPT)
+    (static_dir / "tiny.css").write_bytes(b"body{}")
+    monkeypatch.setattr(config, "ASSET_BUILD_DIR", str(tmp_path / "build"))
+    monkeypatch.setattr(assets, "_manifest", {})
+    return static_dir
+
+
+def test_build_adds_content_hash(app_module, static_dir):
+    manifest = assets.build(str(static_dir))
+    hashed = manifest["js/app.js"]
+    assert hashed.startswith("js/app.") and hashed.endswith(".js") and len(hashed) == len("js/app..js") + 12
+    assert os.path.isfile(os.path.join(config.ASSET_BUILD_DIR, hashed + ".gz"))
+    # 작은 파일은 압축본을 만들지 않음
+    assert not os.path.exists(os.path.join(config.ASSET_BUILD_DIR, manifest["tiny.css"] + ".gz"))
+    with app_module.app.test_request_context():
+        assert assets.asset_url("js/app.js") == f"/assets/{hashed}"
+        assert assets.asset_url("missing.js") == "/static/missing.js"
+
+    # 내용이 바뀌면 주소도 바뀌고, clean은 이전 버전을 지움
+    (static_dir / "js" / "app.js").write_bytes(SCRIPT + b"//v2\n")
+    assert assets.build(str(static_dir))["js/app.js"] != hashed
+    assert assets.clean() == 2  # 이전 원본과 .gz
+    assert not os.path.exists(os.path.join(config.ASSET_BUILD_DIR, hashed))
+
+
+def test_hashed_asset_is_immutable_and_compressed(client, static_dir):
+    hashed = assets.build(str(static_dir))["js/app.js"]
+
+    compressed = client.get(f"/assets/{hashed}", headers={"Accept-Encoding": "gzip"})
+    assert compressed.status_code == 200
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == SCRIPT
+    assert compressed.headers["Cache-Control"] == f"public, max-age={config.ASSET_MAX_AGE}, immutable"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert compressed.mimetype in ("application/javascript", "text/javascript")
+
+    plain = client.get(f"/assets/{hashed}", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.data == SCRIPT
+    assert "immutable" in plain.headers["Cache-Control"]
+
+
+def test_templates_link_hashed_assets(client):
+    body = client.get("/login").get_data(as_text=True)
+    assert f'/assets/{assets._manifest["style.css"]}' in body
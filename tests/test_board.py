@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("flask")
+
+
+@pytest.fixture
+def posts(app_db):
+    author_id = app_db.execute("SELECT id FROM users WHERE userid = 'admin'").fetchone()[0]
+    # 같은 시각에 쓴 글이 있어도 (created_at, id) 순서로 이어짐
+    times = ["2026-03-02T09:00:00", "2026-03-02T09:00:00", "2026-03-02T09:01:00", "2026-03-02T09:01:00", "2026-03-02T09:02:00"]
+    app_db.executemany(
+        "INSERT INTO posts (grade, classroom, title, content, author_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [(1, 1, f"글 {i}", "내용", author_id, created_at) for i, created_at in enumerate(times)]
+        + [(1, 2, "다른 반 글", "내용", author_id, times[-1])]
+    )
+    app_db.commit()
+    return [row[0] for row in app_db.execute(
+        "SELECT id FROM posts WHERE grade = 1 AND classroom = 1 ORDER BY created_at DESC, id DESC"
+    )]
+
+
+def test_cursor_walks_every_page_once(admin_client, posts):
+    seen = []
+    cursor = None
+    for _ in range(len(posts)):
+        url = "/api/class/1-1/posts?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        body = response.get_json()
+        seen += [post["id"] for post in body["posts"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == posts
+
+
+def test_cursor_matches_created_at_and_id(app_module, admin_client, posts):
+    first = admin_client.get("/api/class/1-1/posts?limit=3").get_json()
+    last = first["posts"][-1]
+    assert app_module.decode_board_cursor(first["next_cursor"]) == (last["created_at"], last["id"])
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90LWEtY3Vyc29y", "MjAyNnxhYmM"])
+def test_malformed_cursor_is_400(admin_client, posts, cursor):
+    response = admin_client.get(f"/api/class/1-1/posts?cursor={cursor}")
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_board_query_uses_covering_index(app_db, posts):
+    plan = " ".join(row[3] for row in app_db.execute(
+        "EXPLAIN QUERY PLAN SELECT id, title, created_at, author_id FROM posts "
+        "WHERE grade = 1 AND classroom = 1 AND (created_at, id) < ('2026-03-02T09:01:00', 9) "
+        "ORDER BY created_at DESC, id DESC LIMIT 3"
+    ))
+    assert "COVERING INDEX idx_posts_board" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import cache
+from bench import cache_stress
+
+
+def _try_takeover(directory, owner, start, results):
+    backend = cache.JsonDirBackend(directory)
+    while time.time() < start:
+        pass
+    results.put((owner, backend.acquire_lease("key", owner, 30)))
+
+
+def test_json_dir_stale_lease_has_one_taker(tmp_path):
+    backend = cache.JsonDirBackend(str(tmp_path))
+    assert backend.acquire_lease("key", "old", 30)
+    assert not backend.acquire_lease("key", "other", 30)
+
+    # 만료된 lease를 여러 프로세스가 동시에 가져가려 해도 하나만 성공
+    lease_path = backend._path("key") + ".lease"
+    with open(lease_path, "w") as f:
+        f.write(f"old\n{time.time() - 1}")
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    start = time.time() + 0.5
+    workers = [
+        context.Process(target=_try_takeover, args=(str(tmp_path), f"worker{i}", start, results))
+        for i in range(8)
+    ]
+    for worker in workers:
+        worker.start()
+    outcomes = dict(results.get(timeout=10) for _ in workers)
+    for worker in workers:
+        worker.join()
+    winners = [owner for owner, acquired in outcomes.items() if acquired]
+    assert len(winners) == 1
+
+    # 다른 소유자는 lease를 풀 수 없음
+    backend.release_lease("key", "old")
+    assert os.path.exists(lease_path)
+    backend.release_lease("key", winners[0])
+    assert backend.acquire_lease("key", "next", 30)
+
+
+def test_sqlite_backend_round_trip(tmp_path):
+    backend = cache.SQLiteBackend(str(tmp_path / "cache.db"), max_entries=2, retention=60)
+    now = time.time()
+    large = [{"menu": "잡곡밥 " * 200}]  # 압축되어 저장되는 큰 값
+    backend.set("small", {"timestamp": now, "ttl": 10, "data": ["a"]})
+    backend.set("large", {"timestamp": now + 1, "ttl": 10, "data": large})
+    assert backend.get("small") == {"timestamp": now, "ttl": 10, "data": ["a"]}
+    assert backend.get("large")["data"] == large
+    assert backend.get("missing") is None
+
+    # 다른 연결(다른 워커)에서도 같은 값을 읽음
+    assert cache.SQLiteBackend(backend.path).get("small")["data"] == ["a"]
+
+    backend.set("newest", {"timestamp": now + 2, "ttl": 10, "data": []})
+    assert backend.purge(now) == 1  # 크기 제한을 넘어 가장 오래 전에 저장된 항목 제거
+    assert backend.get("small") is None
+    assert len(backend) == 2
+    # 만료 후 retention이 지난 항목 정리
+    assert backend.purge(now + 1 + 10 + 60 + 1) == 1
+    assert backend.get("large") is None
+
+    backend.delete("newest")
+    assert len(backend) == 0
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "files"])
+def test_multi_process_stress(kind):
+    # bench/cache_stress.py를 짧게 실행: SQLiteBackend / JsonDirBackend를 여러 프로세스가 함께 쓸 때
+    result = cache_stress.run(kind, procs=4, seconds=1.5, keys=4)
+    assert result["refreshes"] > 0
+    assert result["corrupt_reads"] == 0
+    assert result["duplicate_refreshes"] == 0
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("flask")
+
+import class_access  # noqa: E402
+import config  # noqa: E402
+import invite_codes  # noqa: E402
+
+
+def test_legacy_list_is_migrated_to_bitset(client, app_db):
+    with client.session_transaction() as sess:
+        sess[class_access._LEGACY_KEY] = ["1-2", "3-10", "9-9", "x-1"]  # 없는 학급과 잘못된 값은 버림
+
+    assert client.get("/class/1-2").status_code == 200
+    with client.session_transaction() as sess:
+        assert class_access._LEGACY_KEY not in sess
+        assert sess[class_access.SESSION_KEY] == class_access.class_bit(1, 2) | class_access.class_bit(3, 10)
+
+    assert client.get("/class/3-10").status_code == 200
+    locked = client.get("/class/1-3")
+    assert locked.status_code == 302
+    assert "/class/unlock" in locked.headers["Location"]
+
+
+def test_unlock_with_invite_code(client, app_db, monkeypatch):
+    monkeypatch.setattr(invite_codes, "registry", invite_codes.InviteRegistry())
+    code = invite_codes.registry.code_for("2", "3")
+
+    wrong = client.post("/class/unlock?grade=2&classroom=3", data={"invite_code": "ZZZZZZ"})
+    assert wrong.status_code == 200
+    assert client.post("/class/unlock?grade=2&classroom=3", data={"invite_code": code}).status_code == 302
+    with client.session_transaction() as sess:
+        assert sess[class_access.SESSION_KEY] == class_access.class_bit(2, 3)
+    assert client.get("/class/2-3").status_code == 200
+
+
+def test_server_store_keeps_cookie_small(client, app_db, monkeypatch):
+    monkeypatch.setattr(config, "CLASS_ACCESS_STORE", "server")
+    with client.session_transaction() as sess:
+        sess[class_access._LEGACY_KEY] = [f"{grade}-{classroom}" for grade, classroom in class_access.all_classes()]
+
+    assert client.get("/class/3-10").status_code == 200
+    with client.session_transaction() as sess:
+        assert class_access.SESSION_KEY not in sess and class_access._LEGACY_KEY not in sess
+        session_id = sess["session_id"]
+    bits = app_db.execute("SELECT bits FROM class_access WHERE session_id = ?", (session_id,)).fetchone()[0]
+    assert bits == (1 << len(class_access.all_classes())) - 1
+
+
+@pytest.mark.parametrize("path, status", [("/api/class/1-x/posts", 400), ("/api/class/4-1/posts", 404), ("/api/class/1-1/posts", 403)])
+def test_require_class_rejects_by_kind(client, app_db, path, status):
+    response = client.get(path)
+    assert response.status_code == status
+    assert response.get_json()["success"] is False
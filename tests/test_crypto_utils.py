@@ -0,0 +1,28 @@
+import base64
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+import crypto_utils  # noqa: E402
+
+
+def _key(seed):
+    return bytes([seed]) * 32
+
+
+def test_default_active_kid_sorts_numerically():
+    ring = crypto_utils.KeyRing({"k9": _key(9), "k10": _key(10), "k2": _key(2)})
+    assert ring.active_kid == "k10"
+    assert ring.encrypt(b"10101").startswith("k10.")
+
+
+def test_active_kid_from_env(monkeypatch):
+    monkeypatch.setenv("APP_AES_KEY", base64.urlsafe_b64encode(_key(1)).decode())
+    keys = ",".join(f"{kid}={base64.urlsafe_b64encode(_key(n)).decode()}" for kid, n in (("k9", 9), ("k10", 10)))
+    monkeypatch.setenv("APP_AES_KEYS", keys)
+    monkeypatch.setenv("APP_AES_ACTIVE_KID", "k9")
+    ring = crypto_utils.KeyRing.from_env()
+    assert ring.active_kid == "k9"
+    old = crypto_utils.KeyRing({"v1": _key(1)}).encrypt(b"10101")
+    assert ring.needs_rotation(old) and ring.decrypt(old) == b"10101"
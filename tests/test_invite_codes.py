@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+
+import class_access  # noqa: E402
+import config  # noqa: E402
+import invite_codes  # noqa: E402
+
+
+@pytest.fixture
+def registry(app_db, monkeypatch):
+    monkeypatch.setattr(config, "INVITE_CODE_LIFETIME", 0)
+    registry = invite_codes.InviteRegistry()
+    registry.load()
+    return registry
+
+
+def test_lookup_uses_the_precomputed_index(registry, monkeypatch):
+    codes = {registry.code_for(grade, classroom): (grade, classroom) for grade, classroom in class_access.all_classes()}
+    assert len(codes) == len(class_access.all_classes())
+    # 0세대 코드는 이전 방식과 같음
+    assert registry.code_for(2, 5) == invite_codes.derive_code("2", "5")
+
+    # 색인을 읽은 뒤에는 코드를 다시 계산하거나 DB를 읽지 않음
+    def not_called(*args):
+        raise AssertionError("조회 중 코드를 다시 계산함")
+
+    monkeypatch.setattr(invite_codes, "derive_code", not_called)
+    monkeypatch.setattr(invite_codes.database, "connect", not_called)
+    for code, found in codes.items():
+        assert registry.lookup(code) == found
+    assert registry.lookup("ZZZZZZ") is None
+
+
+def test_rotate_replaces_the_code(registry):
+    old = registry.code_for("1", "3")
+    new = registry.rotate("1", "3")
+    assert new == invite_codes.derive_code("1", "3", 1)
+    assert registry.lookup(old) is None
+    assert registry.lookup(new) == ("1", "3")
+
+    # 다른 워커의 색인도 다시 읽으면 같은 코드
+    other = invite_codes.InviteRegistry()
+    assert other.code_for("1", "3") == new
+
+
+def test_expired_code_is_rotated(registry, monkeypatch):
+    code = registry.rotate("3", "10", lifetime=60)
+    assert registry.lookup(code) == ("3", "10")
+
+    now = time.time()
+    monkeypatch.setattr(invite_codes.time, "time", lambda: now + 61)
+    assert registry.lookup(code) is None
+    assert registry.code_for("3", "10") == invite_codes.derive_code("3", "10", 2)
+
+
+def test_add_class_by_code(admin_client, app_db, monkeypatch):
+    monkeypatch.setattr(invite_codes, "registry", invite_codes.InviteRegistry())
+    code = invite_codes.registry.code_for("2", "4")
+    response = admin_client.post("/api/add_class_by_code", json={"invite_code": code.lower()})
+    assert response.status_code == 200
+    assert response.get_json()["success"] is True
+    assert [tuple(row) for row in app_db.execute("SELECT grade, classroom FROM classes")] == [("2", "4")]
+
+    assert admin_client.post("/api/add_class_by_code", json={"invite_code": "ZZZZZZ"}).status_code == 404
@@ -0,0 +1,52 @@
+import pytest
+
+flask = pytest.importorskip("flask")
+
+import config  # noqa: E402
+import database  # noqa: E402
+import metrics  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    app = flask.Flask(__name__)
+    app.add_url_rule("/metrics", "metrics", metrics._metrics_view)
+    return app.test_client()
+
+
+def test_metrics_without_token_is_loopback_only(client, monkeypatch):
+    monkeypatch.setattr(config, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "10.0.0.5"}).status_code == 403
+    # 같은 기기의 리버스 프록시를 거친 요청도 외부 요청으로 봄
+    assert client.get("/metrics", headers={"X-Forwarded-For": "203.0.113.7"}).status_code == 403
+
+
+def test_metrics_token_required_when_set(client, monkeypatch):
+    monkeypatch.setattr(config, "METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 403
+    headers = {"Authorization": "Bearer secret"}
+    assert client.get("/metrics", headers=headers, environ_base={"REMOTE_ADDR": "10.0.0.5"}).status_code == 200
+
+
+def test_cursor_queries_are_recorded(tmp_path, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(metrics, "record_query", lambda sql, elapsed: recorded.append(sql))
+    conn = database.connect(str(tmp_path / "metrics.db"))
+    try:
+        recorded.clear()
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        cur = conn.cursor()
+        cur.execute("INSERT INTO t VALUES (?)", (1,))
+        cur.executemany("INSERT INTO t VALUES (?)", [(2,), (3,)])
+        # 연결의 execute는 내부 커서를 쓰지만 한 번만 기록
+        assert recorded == ["CREATE TABLE t (x INTEGER)", "INSERT INTO t VALUES (?)", "INSERT INTO t VALUES (?)"]
+    finally:
+        conn.close()
+
+    # init_db처럼 커서로 실행하는 스키마 쿼리도 기록
+    monkeypatch.setattr(config, "DATABASE_PATH", str(tmp_path / "users.db"))
+    recorded.clear()
+    database.init_db()
+    assert any("CREATE TABLE IF NOT EXISTS users" in sql for sql in recorded)
+    assert any("CREATE VIRTUAL TABLE" in sql for sql in recorded)
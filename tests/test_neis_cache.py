@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import cache  # noqa: E402
+import config  # noqa: E402
+import neis  # noqa: E402
+
+
+@pytest.fixture
+def lookup(neis_cache):
+    """NEIS 대신 calls에 호출을 기록하고 results의 값을 차례로 돌려주는 캐시 함수."""
+    calls = []
+    results = []
+
+    @neis.file_cache(lifetime=3600)
+    def lookup(name):
+        calls.append(name)
+        return results.pop(0) if results else [name]
+
+    lookup.calls = calls
+    lookup.results = results
+    return lookup
+
+
+def _stats():
+    stats = neis.cache_stats()
+    return {name: stats[name] for name in ("memory_hits", "store_hits", "stale_hits", "misses", "coalesced", "fallbacks")}
+
+
+def test_memory_then_store_hits(lookup):
+    assert lookup("a") == ["a"]
+    assert lookup("a") == ["a"]
+    # 메모리가 비어도 저장소에서 읽어 다시 메모리에 넣음
+    neis._memory_cache.clear()
+    assert lookup("a") == ["a"]
+    assert lookup("a") == ["a"]
+    assert lookup.calls == ["a"]
+    assert _stats() == dict(memory_hits=2, store_hits=1, stale_hits=0, misses=1, coalesced=0, fallbacks=0)
+
+
+def test_concurrent_misses_are_coalesced(neis_cache, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    joined = threading.Semaphore(0)
+    calls = []
+
+    class JoinEvent(threading.Event):
+        def wait(self, timeout=None):
+            joined.release()
+            return super().wait(timeout)
+
+    class Call(cache._Call):
+        def __init__(self):
+            super().__init__()
+            self.event = JoinEvent()
+
+    # 진행 중인 호출에 합류한 요청 수를 세기 위해 SingleFlight의 대기 이벤트를 바꿈
+    monkeypatch.setattr(cache, "_Call", Call)
+
+    @neis.file_cache(lifetime=3600)
+    def slow_lookup(name):
+        calls.append(name)
+        started.set()
+        release.wait(5)
+        return [name]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow_lookup("a"))) for _ in range(4)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    for _ in threads[1:]:
+        assert joined.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [["a"]] * 4
+    assert calls == ["a"]
+    assert _stats()["misses"] == 1
+    assert _stats()["coalesced"] == 3
+
+
+def _wait_for_refresh():
+    deadline = time.monotonic() + 5
+    while neis._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not neis._refreshing
+
+
+def test_stale_entry_is_served_while_refreshing(lookup):
+    key = neis.make_cache_key("lookup", ("a",))
+    neis._store_entry(key, ["old"], 0)
+
+    assert lookup("a") == ["old"]
+    _wait_for_refresh()
+    assert lookup.calls == ["a"]
+    assert lookup("a") == ["a"]
+    assert _stats() == dict(memory_hits=1, store_hits=0, stale_hits=1, misses=0, coalesced=0, fallbacks=0)
+
+
+def test_empty_results_use_negative_lifetime(lookup):
+    lookup.results.append([])
+    assert lookup("b") == []
+    assert lookup("b") == []
+    assert lookup.calls == ["b"]
+    assert neis._backend.get(neis.make_cache_key("lookup", ("b",)))["ttl"] == config.NEGATIVE_CACHE_LIFETIME
+    assert _stats()["memory_hits"] == 1
+
+
+def test_neis_error_falls_back_to_last_value(neis_cache):
+    @neis.file_cache(lifetime=3600)
+    def failing(name):
+        raise neis.NeisError("down")
+
+    key = neis.make_cache_key("failing", ("a",))
+    # stale 구간도 지났지만 보관 기간 안이라 저장소에 남아 있는 값
+    expired = time.time() - 3600 - config.CACHE_STALE_LIFETIME - 1
+    neis._backend.set(key, {"timestamp": expired, "ttl": 3600, "data": ["old"]})
+
+    assert failing("a") == ["old"]
+    assert failing("b") == []
+    assert _stats()["fallbacks"] == 1
+    assert _stats()["misses"] == 2
+
+
+def test_migrate_cache_command(app_module, tmp_path, monkeypatch):
+    legacy = cache.JsonDirBackend(str(tmp_path / "legacy"))
+    os.makedirs(legacy.directory)
+    legacy.set("get_meal_20240304", {"timestamp": 100, "data": [{"time": "중식", "menu": "잡곡밥"}]})
+    legacy.set("get_meal_20240305", {"timestamp": 200, "data": []})
+    legacy.set("get_meal_20240402", {"timestamp": 300, "data": [{"time": "중식", "menu": "국수"}]})
+    legacy.set("get_timetable_range|1|1|20240304|20240315", {"timestamp": 100, "data": []})
+    monkeypatch.setattr(config, "CACHE_DIR", legacy.directory)
+
+    result = app_module.app.test_cli_runner().invoke(args=["migrate-cache", "--delete"])
+    assert result.exit_code == 0
+    assert "3건 이전, 1건 건너뜀" in result.output
+
+    march = neis._backend.get(neis.make_cache_key("get_meal_month", ("202403",)))
+    # 바로 만료된 항목으로 옮겨 첫 조회 때 달 전체를 다시 가져옴
+    assert march == {"timestamp": 200, "ttl": 0, "data": {"20240304": [{"time": "중식", "menu": "잡곡밥"}]}}
+    assert sorted(os.listdir(legacy.directory)) == ["get_timetable_range%7C1%7C1%7C20240304%7C20240315.json"]
+
+    # 이미 옮긴 달은 다시 옮기지 않음
+    assert neis.migrate_legacy_cache() == (0, 1)
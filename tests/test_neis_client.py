@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import config  # noqa: E402
+import neis  # noqa: E402
+
+OK_BODY = {"RESULT": {"CODE": "INFO-200", "MESSAGE": "해당하는 데이터가 없습니다."}}
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return OK_BODY
+
+
+class FakeSession:
+    """statuses의 상태 코드를 차례로 응답하고 호출 횟수를 셉니다. (다 쓰면 200)"""
+
+    def __init__(self):
+        self.statuses = []
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return FakeResponse(self.statuses.pop(0) if self.statuses else 200)
+
+
+@pytest.fixture
+def session(neis_cache, monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(neis, "_session", session)
+    monkeypatch.setattr(neis, "_backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(neis, "_breaker", neis.CircuitBreaker(failure_threshold=2, reset_timeout=0.05))
+    return session
+
+
+def test_transient_errors_are_retried(session):
+    session.statuses = [503, 502]
+    assert neis._request_json("mealServiceDietInfo", {}) == OK_BODY
+    assert session.calls == 3
+    assert neis._breaker.state == "closed"
+
+
+def test_breaker_opens_fails_fast_and_recovers(session, monkeypatch):
+    monkeypatch.setattr(config, "NEIS_MAX_RETRIES", 0)
+    session.statuses = [503, 503]
+    for _ in range(2):
+        with pytest.raises(neis.NeisError):
+            neis._request_json("mealServiceDietInfo", {})
+    assert neis._breaker.state == "open"
+
+    # 열린 동안에는 NEIS를 호출하지 않고 바로 실패
+    with pytest.raises(neis.CircuitOpenError):
+        neis._request_json("mealServiceDietInfo", {})
+    assert session.calls == 2
+
+    # 대기 시간이 지나면 시험 호출 하나로 다시 닫힘
+    time.sleep(0.06)
+    assert neis._request_json("mealServiceDietInfo", {}) == OK_BODY
+    assert neis._breaker.state == "closed"
+    assert session.calls == 3
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = neis.CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    # 시험 호출이 실패하면 다시 열림
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import config  # noqa: E402
+import neis  # noqa: E402
+
+ROWS = [{"ALL_TI_YMD": "20240304", "PERIO": "1", "ITRT_CNTNT": "국어"}]
+
+
+def _run_with_timeout(fn, *args, timeout=3, **kwargs):
+    """fn을 스레드에서 실행하고 timeout 안에 끝나지 않으면 실패합니다."""
+    thread = threading.Thread(target=fn, args=args, kwargs=kwargs, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"{fn.__name__}가 {timeout}초 안에 끝나지 않음"
+
+
+def _wait_background_refresh(timeout=3):
+    deadline = time.monotonic() + timeout
+    while neis._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not neis._refreshing, "백그라운드 갱신이 끝나지 않음"
+
+
+def test_stale_timetable_refresh_returns(monkeypatch):
+    calls = []
+    monkeypatch.setattr(neis, "_iter_rows", lambda service, params: calls.append(params) or iter(ROWS))
+    grade, classroom, start, end = 2, 3, "20240301", "20240310"
+
+    # 만료된 기간을 두 번 조회: 저장된 값을 바로 돌려주고 백그라운드 갱신도 끝나야 함
+    for _ in range(2):
+        expired_at = time.time() - config.CACHE_LIFETIME - 5
+        neis._timetable_store.put_days(grade, classroom, {"20240304": ["국어"]}, start, end, expired_at, config.CACHE_LIFETIME)
+        _run_with_timeout(neis.get_timetable_range, grade, classroom, start, end)
+        _wait_background_refresh()
+    assert len(calls) == 2
+
+    # 같은 기간의 전경 갱신도 막히지 않아야 함
+    _run_with_timeout(neis.refresh_timetable_range, grade, classroom, start, end)
+    assert len(calls) == 3
+
+
+def test_empty_days_keep_chunk_ttl(monkeypatch):
+    grade, classroom = 2, 4
+    monkeypatch.setattr(neis, "_iter_rows", lambda service, params: iter(ROWS))
+    neis.refresh_timetable_range(grade, classroom, "20240301", "20240310")
+    records = neis._timetable_store.get_range(grade, classroom, "20240301", "20240310")
+    # 수업이 있는 구간의 주말(20240309)도 일반 유효 시간
+    assert records["20240309"][0] == []
+    assert neis._day_ttl(records["20240309"]) == config.CACHE_LIFETIME
+
+    # 수업이 하나도 없는 구간만 짧게 캐시
+    monkeypatch.setattr(neis, "_iter_rows", lambda service, params: iter([]))
+    neis.refresh_timetable_range(grade, classroom, "20240801", "20240810")
+    records = neis._timetable_store.get_range(grade, classroom, "20240801", "20240810")
+    assert {neis._day_ttl(record) for record in records.values()} == {config.NEGATIVE_CACHE_LIFETIME}
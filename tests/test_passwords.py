@@ -0,0 +1,47 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+
+import config  # noqa: E402
+import passwords  # noqa: E402
+
+
+def test_full_queue_is_503_with_retry_after(client, app_db, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()  # 해시 작업이 가득 찬 상태
+    monkeypatch.setattr(passwords, "_slots", slots)
+
+    response = client.post("/login", data={"userid": "admin", "password": "1234"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(config.PASSWORD_RETRY_AFTER)
+    assert "잠시 후 다시 시도" in response.get_data(as_text=True)
+
+    register = client.post("/register", data={
+        "userid": "student", "name": "학생", "password": "Passw0rd!", "password2": "Passw0rd!"
+    })
+    assert register.status_code == 503
+    assert app_db.execute("SELECT COUNT(*) FROM users WHERE userid = 'student'").fetchone()[0] == 0
+
+
+def _stored_hash(app_db):
+    return app_db.execute("SELECT password FROM users WHERE userid = 'admin'").fetchone()[0]
+
+
+def test_login_rehashes_outdated_hash(client, app_db, monkeypatch):
+    old_hash = _stored_hash(app_db)
+    monkeypatch.setattr(config, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+    assert passwords.needs_rehash(old_hash)
+
+    response = client.post("/login", data={"userid": "admin", "password": "1234"})
+    assert response.status_code == 302
+
+    deadline = time.monotonic() + 5
+    while _stored_hash(app_db) == old_hash and time.monotonic() < deadline:
+        time.sleep(0.02)
+    new_hash = _stored_hash(app_db)
+    assert new_hash.startswith("pbkdf2:sha256:1000$")
+    assert passwords.verify_password(new_hash, "1234")
+    assert not passwords.needs_rehash(new_hash)
@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("flask")
+
+import config  # noqa: E402
+import post_events  # noqa: E402
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    # 폴링 스레드 없이 같은 프로세스 안의 전달만 확인
+    hub = post_events.Hub(queue_size=2, max_clients=2, poll_interval=0)
+    monkeypatch.setattr(post_events, "hub", hub)
+    return hub
+
+
+def test_slow_subscriber_is_dropped(hub):
+    fast = hub.subscribe((1, 1))
+    slow = hub.subscribe((1, 1))
+    for event_id in range(1, 4):
+        hub.publish((1, 1), event_id, {"id": event_id})
+        assert fast.get(timeout=0) == (event_id, {"id": event_id})
+    # 큐가 넘친 구독자만 끊고, 다른 구독자와 발행자는 기다리지 않음
+    assert slow.closed and not fast.closed
+
+    events = list(post_events.stream(slow))
+    assert events == [f"retry: {config.SSE_RETRY_MS}\n\n"]
+    assert hub.client_count() == 1
+
+
+def test_hub_is_capped(admin_client, hub, monkeypatch):
+    hub.subscribe((1, 1))
+    hub.subscribe((2, 1))
+    with pytest.raises(post_events.HubFullError):
+        hub.subscribe((1, 1))
+
+    monkeypatch.setattr(config, "SSE_ENABLED", True)
+    response = admin_client.get("/class/1-1/events")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(config.SSE_RETRY_MS // 1000)
+
+
+def test_idle_stream_is_closed(hub, monkeypatch):
+    monkeypatch.setattr(config, "SSE_HEARTBEAT", 0.01)
+    monkeypatch.setattr(config, "SSE_IDLE_TIMEOUT", 0.05)
+    subscription = hub.subscribe((1, 1))
+    hub.publish((2, 1), 7, {"id": 7})  # 다른 학급의 글은 받지 않음
+    hub.publish((1, 1), 8, {"id": 8, "title": "공지"})
+
+    events = list(post_events.stream(subscription, backlog=[(5, {"id": 5})]))
+    assert events[0] == f"retry: {config.SSE_RETRY_MS}\n\n"
+    assert events[1] == 'id: 5\nevent: post\ndata: {"id": 5}\n\n'
+    assert events[2] == 'id: 8\nevent: post\ndata: {"id": 8, "title": "공지"}\n\n'
+    assert events[3:] and set(events[3:]) == {": ping\n\n"}
+    assert hub.client_count() == 0
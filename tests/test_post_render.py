@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("flask")
+
+import post_render  # noqa: E402
+
+
+def _post(app_db, post_id):
+    return app_db.execute("SELECT content_html, sanitizer_version FROM posts WHERE id = ?", (post_id,)).fetchone()
+
+
+def test_write_stores_sanitized_html(admin_client, app_db, monkeypatch):
+    response = admin_client.post("/class/1-1/write", data={"title": "공지", "content": "<script>x</script>\n둘째 줄"})
+    assert response.status_code == 302
+    post_id = app_db.execute("SELECT id FROM posts WHERE title = '공지'").fetchone()[0]
+    stored = _post(app_db, post_id)
+    assert stored["content_html"] == "&lt;script&gt;x&lt;/script&gt;<br>둘째 줄"
+    assert stored["sanitizer_version"] == post_render.SANITIZER_VERSION
+
+    # 조회할 때는 저장된 HTML을 그대로 쓰고 다시 소독하지 않음
+    def not_called(content):
+        raise AssertionError("조회 시 다시 소독함")
+
+    monkeypatch.setattr(post_render, "render_content", not_called)
+    page = admin_client.get(f"/class/1-1/post/{post_id}")
+    assert page.status_code == 200
+    assert "&lt;script&gt;x&lt;/script&gt;<br>둘째 줄" in page.get_data(as_text=True)
+
+
+def test_outdated_html_is_rerendered_once(admin_client, app_db, monkeypatch):
+    author_id = app_db.execute("SELECT id FROM users WHERE userid = 'admin'").fetchone()[0]
+    post_id = app_db.execute(
+        "INSERT INTO posts (grade, classroom, title, content, author_id, created_at, content_html, sanitizer_version) "
+        "VALUES (1, 1, '예전 글', '<b>굵게</b>', ?, '2026-03-02T09:00:00', 'old', 'old-version')",
+        (author_id,)
+    ).lastrowid
+    app_db.commit()
+
+    rendered = []
+    render = post_render.render_content
+    monkeypatch.setattr(post_render, "render_content", lambda content: rendered.append(content) or render(content))
+    for _ in range(2):
+        assert "<b>굵게</b>" in admin_client.get(f"/class/1-1/post/{post_id}").get_data(as_text=True)
+    assert rendered == ["<b>굵게</b>"]
+    assert _post(app_db, post_id)["sanitizer_version"] == post_render.SANITIZER_VERSION
+
+
+def test_backfill_renders_only_missing_or_outdated(app_db):
+    author_id = app_db.execute("SELECT id FROM users WHERE userid = 'admin'").fetchone()[0]
+    app_db.executemany(
+        "INSERT INTO posts (grade, classroom, title, content, author_id, created_at, content_html, sanitizer_version) "
+        "VALUES (1, 1, ?, ?, ?, '2026-03-02T09:00:00', ?, ?)",
+        [
+            ("없음", "a\nb", author_id, None, None),
+            ("예전", "c", author_id, "old", "old-version"),
+            ("최신", "d", author_id, "d", post_render.SANITIZER_VERSION),
+        ]
+    )
+    app_db.commit()
+    assert post_render.backfill(app_db, batch_size=1) == 2
+    htmls = [row[0] for row in app_db.execute("SELECT content_html FROM posts ORDER BY id")]
+    assert htmls == ["a<br>b", "c", "d"]
+    assert post_render.backfill(app_db) == 0
+    assert post_render.backfill(app_db, rebuild_all=True) == 3
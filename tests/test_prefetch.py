@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("requests")
+
+import class_access  # noqa: E402
+import config  # noqa: E402
+import neis  # noqa: E402
+import prefetch  # noqa: E402
+
+MEAL_ROWS = [{"MLSV_YMD": "20240304", "MMEAL_SC_NM": "중식", "DDISH_NM": "잡곡밥"}]
+TIMETABLE_ROWS = [{"ALL_TI_YMD": "20240304", "PERIO": "1", "ITRT_CNTNT": "국어"}]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_rows(service, params):
+        calls.append(service)
+        return iter(MEAL_ROWS if service == "mealServiceDietInfo" else TIMETABLE_ROWS)
+
+    monkeypatch.setattr(neis, "_iter_rows", fake_rows)
+    monkeypatch.setattr(config, "GRADE_COUNT", 1)
+    monkeypatch.setattr(config, "CLASS_COUNT", 2)
+    return calls
+
+
+def _warm(**options):
+    return prefetch.warm_cache(days=5, base_date=datetime(2024, 3, 4), **options)
+
+
+def test_warm_cache_skips_fresh_entries(calls):
+    assert _warm() == {"ok": 3, "failed": 0}
+    assert sorted(calls) == ["hisTimetable", "hisTimetable", "mealServiceDietInfo"]
+
+    calls.clear()
+    assert _warm() == {"ok": 3, "failed": 0}
+    assert calls == []
+
+    assert _warm(force=True) == {"ok": 3, "failed": 0}
+    assert len(calls) == 3
+
+
+def test_warm_cache_skips_held_leases(calls):
+    days = prefetch.upcoming_school_days(5, datetime(2024, 4, 1))
+    start, end = neis.timetable_window(days[0])[0], neis.timetable_window(days[-1])[1]
+    held = [neis.make_cache_key("get_meal_month", ("202404",))]
+    held += [neis.timetable_key(grade, classroom, start, end) for grade, classroom in class_access.all_classes()]
+    for key in held:
+        assert neis.try_lease(key, "other-worker")
+    try:
+        assert prefetch.warm_cache(days=5, base_date=datetime(2024, 4, 1)) == {"ok": 3, "failed": 0}
+    finally:
+        for key in held:
+            neis.release_lease(key, "other-worker")
+    assert calls == []
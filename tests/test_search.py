@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("flask")
+
+import config  # noqa: E402
+import database  # noqa: E402
+import search  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DATABASE_PATH", str(tmp_path / "search.db"))
+    database.init_db()
+    conn = database.connect()
+    author_id = conn.execute("SELECT id FROM users WHERE userid = 'admin'").fetchone()[0]
+    base = datetime(2026, 3, 2)
+    posts = [
+        (1, 1, "수학 숙제 안내", "내일까지 제출"),
+        (1, 2, "과학 실험", "수학 공식 정리"),
+        (1, 1, "체육대회 준비물", "운동화와 물"),
+        (1, 1, "청소 당번", "3층 복도"),
+    ]
+    conn.executemany(
+        "INSERT INTO posts (grade, classroom, title, content, author_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [(*post, author_id, (base + timedelta(minutes=i)).isoformat()) for i, post in enumerate(posts)]
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _titles(db, query, grade=None, classroom=None):
+    results, _ = search.search_posts(db, query, grade, classroom)
+    return [result["title"] for result in results]
+
+
+def test_two_letter_terms_use_bigram_index(db):
+    assert _titles(db, "수학") == ["과학 실험", "수학 숙제 안내"]
+    assert _titles(db, "수학", 1, 1) == ["수학 숙제 안내"]
+    # 2글자와 3글자 이상 검색어를 함께 쓰면 두 색인의 교집합
+    assert _titles(db, "수학 체육대회") == []
+    assert _titles(db, "준비물 대회") == ["체육대회 준비물"]
+
+
+def test_bigram_index_follows_updates_and_deletes(db):
+    db.execute("UPDATE posts SET title = '청소 구역' WHERE title = '청소 당번'")
+    db.execute("DELETE FROM posts WHERE title = '과학 실험'")
+    db.commit()
+    assert _titles(db, "당번") == []
+    assert _titles(db, "구역") == ["청소 구역"]
+    assert _titles(db, "수학") == ["수학 숙제 안내"]
+
+
+def test_single_letter_scan_is_capped(db, monkeypatch):
+    assert _titles(db, "물", 1, 1) == ["체육대회 준비물"]
+    # 최근 글 1개(청소 당번)만 훑으므로 그보다 오래된 글은 찾지 않음
+    monkeypatch.setattr(config, "SEARCH_SHORT_SCAN_LIMIT", 1)
+    assert _titles(db, "물", 1, 1) == []
+    assert _titles(db, "층") == ["청소 당번"]
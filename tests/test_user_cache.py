@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("flask")
+
+import metrics  # noqa: E402
+import user_cache  # noqa: E402
+
+
+@pytest.fixture
+def services(neis_cache, monkeypatch):
+    monkeypatch.setattr(neis_cache, "_iter_rows", lambda service, params: iter([]))
+
+
+@pytest.fixture
+def user_queries(admin_client, services, monkeypatch):
+    """users 테이블을 읽은 SQL 문을 기록합니다."""
+    queries = []
+    record_query = metrics.record_query
+
+    def recording(sql, elapsed):
+        if "FROM users" in sql:
+            queries.append(sql)
+        record_query(sql, elapsed)
+
+    monkeypatch.setattr(metrics, "record_query", recording)
+    return queries
+
+
+def test_api_data_does_not_load_the_user(admin_client, user_queries, monkeypatch):
+    loaded = []
+    get_user = user_cache.get_user
+    monkeypatch.setattr(user_cache, "get_user", lambda userid: loaded.append(userid) or get_user(userid))
+
+    assert admin_client.get("/api/data?date=20240304").status_code == 200
+    assert loaded == []
+    assert user_queries == []
+
+    # g.user를 쓰는 요청은 처음 한 번만 DB에서 읽고 이후에는 캐시 사용
+    for _ in range(2):
+        assert admin_client.get("/api/admin/cache_stats").status_code == 200
+    assert loaded == ["admin", "admin"]
+    assert len(user_queries) == 1
+
+
+def test_invalidate_reloads_the_user(admin_client, app_db, user_queries):
+    assert admin_client.get("/api/admin/cache_stats").status_code == 200
+    app_db.execute("UPDATE users SET name = '새 이름' WHERE userid = 'admin'")
+    app_db.commit()
+    user_cache.invalidate("admin")
+    with admin_client.application.test_request_context():
+        assert user_cache.get_user("admin")["name"] == "새 이름"
+    assert len(user_queries) == 2
@@ -0,0 +1,78 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+
+def date_range(start_date, end_date):
+    """start_date부터 end_date까지(포함) YYYYMMDD 문자열 목록을 반환합니다."""
+    current = datetime.strptime(start_date, "%Y%m%d")
+    last = datetime.strptime(end_date, "%Y%m%d")
+    days = []
+    while current <= last:
+        days.append(current.strftime("%Y%m%d"))
+        current += timedelta(days=1)
+    return days
+
+
+class TimetableStore:
+    """학급별·날짜별 시간표를 한 행씩 저장하는 SQLite 저장소입니다.
+
+    수업이 없는 날도 빈 목록으로 저장하여, 이미 확인한 날짜를 다시 조회하지 않도록 합니다.
+    유효 시간(ttl)은 조회 구간 단위로 정해 행마다 기록합니다.
+    연결은 스레드마다 하나씩 열어 재사용합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            # 여러 워커 프로세스가 동시에 읽고 쓰므로 WAL 모드 사용
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS timetable_days (
+                grade TEXT NOT NULL,
+                classroom TEXT NOT NULL,
+                date TEXT NOT NULL,
+                periods TEXT NOT NULL, -- 교시 순서대로 정렬된 과목명 JSON 배열
+                fetched_at REAL NOT NULL,
+                ttl REAL, -- 유효 시간 (초, NULL이면 이전 형식의 행)
+                PRIMARY KEY (grade, classroom, date)
+            ) WITHOUT ROWID
+            """)
+            # 이전 스키마의 테이블에 ttl 열 추가
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(timetable_days)")}
+            if "ttl" not in columns:
+                conn.execute("ALTER TABLE timetable_days ADD COLUMN ttl REAL")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def get_range(self, grade, classroom, start_date, end_date):
+        """기간 안에 저장된 날짜별 {date: (periods, fetched_at, ttl)}을 반환합니다."""
+        rows = self._conn().execute(
+            "SELECT date, periods, fetched_at, ttl FROM timetable_days "
+            "WHERE grade = ? AND classroom = ? AND date BETWEEN ? AND ?",
+            (str(grade), str(classroom), start_date, end_date)
+        ).fetchall()
+        return {date: (json.loads(periods), fetched_at, ttl) for date, periods, fetched_at, ttl in rows}
+
+    def put_days(self, grade, classroom, days, start_date, end_date, fetched_at, ttl):
+        """조회한 기간의 모든 날짜를 ttl과 함께 저장합니다. days에 없는 날짜는 수업 없음(빈 목록)으로 기록합니다."""
+        covered = set(date_range(start_date, end_date))
+        records = [
+            (str(grade), str(classroom), date, json.dumps(days.get(date, []), ensure_ascii=False, separators=(",", ":")), fetched_at, ttl)
+            for date in sorted(covered | set(days))
+        ]
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO timetable_days (grade, classroom, date, periods, fetched_at, ttl) VALUES (?, ?, ?, ?, ?, ?)",
+                records
+            )
@@ -0,0 +1,49 @@
+import time
+
+from flask import session
+from flask.ctx import _AppCtxGlobals
+
+import cache
+import config
+import database
+
+# 요청마다 쓰는 사용자 정보 열 (비밀번호 해시는 로그인 확인에서만 따로 조회)
+USER_COLUMNS = "id, userid, name, grade, classroom, student_no"
+
+# 워커 프로세스마다 하나씩 가지는 사용자 캐시 {userid: 사용자 dict 또는 None}
+_cache = cache.MemoryCache(config.USER_CACHE_SIZE)
+
+
+def get_user(userid):
+    """세션의 userid에 해당하는 사용자 정보를 반환합니다. USER_CACHE_TTL 동안 캐시합니다."""
+    hit, user = _cache.get(userid)
+    if hit:
+        return user
+    row = database.get_db().execute(
+        f"SELECT {USER_COLUMNS} FROM users WHERE userid = ?", (userid,)
+    ).fetchone()
+    user = dict(row) if row is not None else None
+    _cache.set(userid, user, time.time() + config.USER_CACHE_TTL)
+    return user
+
+
+def invalidate(userid):
+    """사용자 정보가 바뀌었을 때 이 워커의 캐시 항목을 지웁니다.
+
+    다른 워커 프로세스의 캐시는 USER_CACHE_TTL이 지나면 갱신됩니다.
+    """
+    _cache.delete(userid)
+
+
+class LazyUserGlobals(_AppCtxGlobals):
+    """g.user를 처음 읽을 때 사용자 정보를 불러오는 Flask g 객체입니다.
+
+    g.user를 쓰지 않는 요청(/api/data, 정적 파일 등)은 사용자 조회를 하지 않습니다.
+    """
+
+    def __getattr__(self, name):
+        if name == "user":
+            userid = session.get("user")
+            self.user = get_user(userid) if userid is not None else None
+            return self.user
+        return super().__getattr__(name)